@@ -0,0 +1,21 @@
+# --- Atomic Writes ---
+# Every generated file is written to a temporary sibling and renamed into
+# place, so a reader (the browser, a file watcher, the next run) sees
+# either the old file or the new one, never half of either. The temporary
+# name carries the pid so processes writing into the same directory at once
+# never share one.
+import os
+
+def write_atomic(path, data):
+    # data is str (written as UTF-8) or bytes
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,288 @@
+# --- Draft Score Weight Backtester ---
+# Replays archived bootstrap snapshots (anything ingest.iter_snapshots reads)
+# and measures how well a weighting ranks players by the points they go on
+# to score. Each snapshot is paired with the one `horizon` gameweeks later.
+# The target is the total_points gained in between, and a weighting's fit is
+# the Spearman rank correlation between its scores and that target, averaged
+# over the pairs. Each scoring group (the four positions for players with
+# minutes, plus 'unplayed') is fitted on its own, since its weights only
+# touch its own players.
+#
+# Every snapshot is reduced once to a matrix of normalised features (the
+# columns columnar.score_columns weights), so a candidate costs one matrix
+# product plus a ranking. Candidates are evaluated in blocks spread over a
+# fork pool. They live on the simplex (weights sum to 1, like the defaults)
+# because rank correlation ignores scale.
+#
+# Searches (SEARCHES):
+#   grid       - every weighting on a 1/steps lattice of the simplex
+#   random     - uniform (Dirichlet) samples from the simplex
+#   coordinate - from the current weights and `restarts` random points, move
+#                one feature by +-step, keep the best improvement, halve the
+#                step when nothing improves
+# The current weights are always a candidate, so the fit never loses to them
+# on the training pairs; --holdout keeps the newest pairs out of the search
+# to check that.
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import columnar
+import ingest
+import leagues
+import parallel
+import scoring
+from atomic import write_atomic
+from columnar import np
+
+GROUPS = ['GKP', 'DEF', 'MID', 'FWD', 'unplayed']
+SEARCHES = ['grid', 'random', 'coordinate']
+BLOCK_SIZE = 256
+
+# --- Snapshot Matrices ---
+def reduce_snapshot(snapshot):
+    # {'event', 'ids', 'points', 'matrix' (players x WEIGHT_FEATURES), 'groups': {group: row mask}}
+    elements = snapshot['elements']
+    columns = columnar.load_columns(elements)
+    feature = columnar.feature_columns(columns, columnar.column_stats_context(columns)['max'])
+    played = columns['minutes'] != 0
+    groups = {position: played & (columns['element_type'] == element_type) for element_type, position in scoring.positions.items()}
+    groups['unplayed'] = ~played
+    return {
+        'event': snapshot.event if hasattr(snapshot, 'event') else ingest.current_event(snapshot.get('events', [])),
+        'ids': columns['id'],
+        'points': np.fromiter((p.get('total_points', 0) for p in elements), dtype=np.int32, count=len(elements)),
+        'matrix': np.column_stack([feature(name) for name in scoring.WEIGHT_FEATURES]),
+        'groups': groups,
+    }
+
+def load_pairs(paths, horizon=1):
+    # [(reduced snapshot, points gained per row over the next `horizon` gameweeks)]
+    # for every snapshot whose event + horizon is also in the archive; rows
+    # missing from the later snapshot gain NaN
+    reduced = {}
+    for path in paths:
+        for snapshot in ingest.iter_snapshots(path):
+            current = reduce_snapshot(snapshot)
+            if current['event'] is not None:
+                reduced[current['event']] = current
+    pairs = []
+    for event in sorted(reduced):
+        later = reduced.get(event + horizon)
+        if later is None:
+            continue
+        current = reduced[event]
+        later_points = dict(zip(later['ids'].tolist(), later['points'].tolist()))
+        gained = np.array([later_points.get(pid, np.nan) for pid in current['ids'].tolist()], dtype=np.float64) - current['points']
+        pairs.append((current, gained))
+    return pairs
+
+def average_ranks(values):
+    # 1-based ranks along axis 0, tied values sharing their average rank
+    n = values.shape[0]
+    order = np.argsort(values, axis=0, kind='stable')
+    ordered = np.take_along_axis(values, order, axis=0)
+    position = np.arange(n, dtype=np.float64).reshape((n,) + (1,) * (values.ndim - 1))
+    starts = np.ones(values.shape, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    ends = np.ones(values.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+    first = np.maximum.accumulate(np.where(starts, position, 0), axis=0)
+    last = np.flip(np.minimum.accumulate(np.flip(np.where(ends, position, n), axis=0), axis=0), axis=0)
+    ranks = np.empty(values.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=0)
+    return ranks
+
+def group_samples(pairs, group, features):
+    # [(feature matrix, centred unit-length target ranks)] per pair; pairs
+    # where the group is too small or nobody's points moved are dropped
+    columns = [scoring.WEIGHT_FEATURES.index(feature) for feature in features]
+    samples = []
+    for current, gained in pairs:
+        rows = current['groups'][group] & ~np.isnan(gained)
+        if rows.sum() < 3:
+            continue
+        target = average_ranks(gained[rows])
+        target -= target.mean()
+        norm = math.sqrt(float(target @ target))
+        if norm == 0:
+            continue
+        samples.append((np.ascontiguousarray(current['matrix'][rows][:, columns]), target / norm))
+    return samples
+
+# --- Evaluation ---
+def evaluate(samples, candidates):
+    # Mean Spearman correlation per candidate row (weights over the sample features)
+    if not samples:
+        return np.zeros(len(candidates))
+    total = np.zeros(len(candidates))
+    for matrix, target in samples:
+        # Rounded so players with identical stats tie despite float noise
+        ranks = average_ranks(np.round(matrix @ candidates.T, 12))
+        ranks -= ranks.mean(axis=0)
+        norms = np.sqrt((ranks ** 2).sum(axis=0))
+        total += np.divide(target @ ranks, norms, out=np.zeros(len(candidates)), where=norms > 0)
+    return total / len(samples)
+
+def simplex(weights):
+    weights = np.clip(np.asarray(weights, dtype=np.float64), 0, None)
+    total = weights.sum()
+    return weights / total if total > 0 else np.full(len(weights), 1 / len(weights))
+
+def grid_candidates(dims, steps):
+    # Every composition of `steps` into `dims` parts, divided by steps
+    points = []
+
+    def compose(prefix, remaining, slots):
+        if slots == 1:
+            points.append(prefix + [remaining])
+            return
+        for value in range(remaining + 1):
+            compose(prefix + [value], remaining - value, slots - 1)
+    compose([], steps, dims)
+    return np.asarray(points, dtype=np.float64) / steps
+
+def coordinate_descent(samples, start, step=0.1, min_step=0.01):
+    # (weights, fit, candidates evaluated)
+    current = simplex(start)
+    best = evaluate(samples, current[None, :])[0]
+    evaluated = 1
+    while step >= min_step:
+        moves = []
+        for j in range(len(current)):
+            for delta in (step, -step):
+                moved = current.copy()
+                moved[j] = max(moved[j] + delta, 0.0)
+                if moved.sum() > 0:
+                    moves.append(simplex(moved))
+        fits = evaluate(samples, np.asarray(moves))
+        evaluated += len(moves)
+        i = int(np.argmax(fits))
+        if fits[i] > best + 1e-12:
+            current, best = moves[i], fits[i]
+        else:
+            step /= 2
+    return current, best, evaluated
+
+# --- Parallel Search ---
+def _evaluate_block(task):
+    group, block = task
+    return evaluate(parallel.state['samples'][group], block)
+
+def _descend(task):
+    group, start, step, min_step = task
+    return coordinate_descent(parallel.state['samples'][group], start, step, min_step)
+
+def search(samples, baselines, method='random', candidates=2000, steps=10, restarts=4, step=0.1, min_step=0.01,
+           seed=0, workers=None):
+    # {group: (best weights, fit, candidates evaluated)}; baselines: {group: weight vector}
+    rng = np.random.default_rng(seed)
+    workers = workers or os.cpu_count() or 1
+    with parallel.mapper(workers, samples=samples) as run:
+        if method == 'coordinate':
+            tasks = []
+            for group, baseline in baselines.items():
+                starts = [baseline] + list(rng.dirichlet(np.ones(len(baseline)), size=restarts))
+                tasks.extend((group, start, step, min_step) for start in starts)
+            results = {}
+            for (group, *_), (weights, fit, evaluated) in zip(tasks, run(_descend, tasks)):
+                best_weights, best_fit, total = results.get(group, (None, -np.inf, 0))
+                if fit > best_fit:
+                    best_weights, best_fit = weights, fit
+                results[group] = (best_weights, best_fit, total + evaluated)
+            return results
+
+        grids = {}
+        tasks = []
+        for group, baseline in baselines.items():
+            if method == 'grid':
+                generated = grid_candidates(len(baseline), steps)
+            else:
+                generated = rng.dirichlet(np.ones(len(baseline)), size=candidates)
+            grids[group] = np.vstack([baseline[None, :], generated])
+            tasks.extend((group, grids[group][i:i + BLOCK_SIZE]) for i in range(0, len(grids[group]), BLOCK_SIZE))
+        fits = {group: [] for group in baselines}
+        for (group, _), block_fits in zip(tasks, run(_evaluate_block, tasks)):
+            fits[group].append(block_fits)
+        results = {}
+        for group, grid in grids.items():
+            group_fits = np.concatenate(fits[group])
+            best = int(np.argmax(group_fits))
+            results[group] = (grid[best], group_fits[best], len(grid))
+        return results
+
+# --- Reporting ---
+def fitted_weights(features, weights):
+    return {feature: round(float(weight), 4) for feature, weight in zip(features, weights)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fit draft score weights to the points players went on to score.')
+    parser.add_argument('archives', nargs='+', help='bootstrap snapshots: files, JSON-lines archives or directories (one per gameweek)')
+    parser.add_argument('--horizon', type=int, default=1, help='gameweeks of realised points each snapshot is scored against')
+    parser.add_argument('--search', choices=SEARCHES, default='random', help='how to explore the weight simplex')
+    parser.add_argument('--candidates', type=int, default=2000, help='random weightings per group for --search random')
+    parser.add_argument('--steps', type=int, default=10, help='lattice divisions for --search grid (weights in 1/steps)')
+    parser.add_argument('--restarts', type=int, default=4, help='random starting points besides the current weights for --search coordinate')
+    parser.add_argument('--step', type=float, default=0.1, help='initial move for --search coordinate')
+    parser.add_argument('--min-step', type=float, default=0.01, help='stop --search coordinate once the move falls below this')
+    parser.add_argument('--groups', nargs='+', choices=GROUPS, default=GROUPS, help='scoring groups to fit')
+    parser.add_argument('--all-features', action='store_true', help='search every weightable feature, not only those the group already uses')
+    parser.add_argument('--weights', metavar='CONFIG', help='league config whose weights are the starting point (default: the built-in weights)')
+    parser.add_argument('--holdout', type=int, default=0, help='keep the newest N snapshot pairs out of the search and report the fit on them')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--workers', type=int, help='processes (default: all cores)')
+    parser.add_argument('--output', metavar='PATH', help='write the fitted weights as a league config (for --weights / --leagues)')
+    parser.add_argument('--name', default='backtest', help='league name in the --output config')
+    args = parser.parse_args(argv)
+
+    columnar.require_numpy()
+    try:
+        base = leagues.load_weights(args.weights) if args.weights else scoring.DEFAULT_WEIGHTS
+    except (OSError, ValueError) as e:
+        print(f"Invalid league config: {e}", file=sys.stderr)
+        return 2
+
+    pairs = load_pairs(args.archives, args.horizon)
+    train, holdout = (pairs[:-args.holdout], pairs[-args.holdout:]) if args.holdout > 0 else (pairs, [])
+    if not train:
+        print(f"No snapshot pairs {args.horizon} gameweek(s) apart to train on ({len(pairs)} pairs in total).", file=sys.stderr)
+        return 1
+
+    features, baselines, samples = {}, {}, {}
+    for group in args.groups:
+        features[group] = list(scoring.WEIGHT_FEATURES if args.all_features else base[group])
+        baselines[group] = simplex([base[group].get(feature, 0) for feature in features[group]])
+        samples[group] = group_samples(train, group, features[group])
+
+    start = time.perf_counter()
+    results = search(samples, baselines, args.search, args.candidates, args.steps, args.restarts, args.step,
+                     args.min_step, args.seed, args.workers)
+    seconds = time.perf_counter() - start
+
+    fitted = {}
+    for group in args.groups:
+        weights, fit, _ = results[group]
+        baseline = evaluate(samples[group], baselines[group][None, :])[0]
+        line = f"{group:>8}  fit {baseline:.3f} -> {fit:.3f} ({fit - baseline:+.3f}) on {len(samples[group])} pairs"
+        if holdout:
+            held = group_samples(holdout, group, features[group])
+            before, after = evaluate(held, np.vstack([baselines[group], weights]))
+            line += f"  holdout {before:.3f} -> {after:.3f}"
+        fitted[group] = fitted_weights(features[group], weights)
+        print(line)
+        print(f"{'':>10}" + ', '.join(f"{feature} {weight:g}" for feature, weight in fitted[group].items()))
+
+    evaluated = sum(result[2] for result in results.values())
+    print(f"Evaluated {evaluated} weightings in {seconds:.2f} s ({evaluated / max(seconds, 1e-9) * 60:,.0f} per minute) "
+          f"over {len(train)} snapshot pairs.")
+    if args.output:
+        write_atomic(args.output, json.dumps({'name': args.name, 'weights': fitted}, indent=2) + '\n')
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# --- Build Pipeline Benchmark ---
+# Times each generator stage in isolation (load, team mapping, scoring, row
+# construction, HTML rendering, file write) against the real snapshot and
+# against synthetic bootstrap files with the elements replicated 10x/100x/...
+# Per stage: best-of-N wall time, tracemalloc allocation (still held by the
+# stage's result, and peak, from a separate traced run) and the process peak
+# RSS after the stage. Each scale runs in a fresh worker process so RSS peaks
+# do not carry over between scales.
+# Results are written as JSON; --compare prints per-stage ratios against an
+# earlier results file.
+import argparse
+import copy
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import create_ultimate_tool_v2 as tool
+from atomic import write_atomic
+
+STAGES = ['load', 'map_teams', 'score', 'build_rows', 'render', 'write']
+
+# --- Synthetic Snapshots ---
+def synthetic_bootstrap(data, factor):
+    # The snapshot with its elements repeated `factor` times under fresh ids
+    scaled = copy.copy(data)
+    elements = data['elements']
+    id_step = max(p['id'] for p in elements) if elements else 0
+    scaled['elements'] = []
+    for copy_index in range(factor):
+        for p in elements:
+            clone = dict(p)
+            clone['id'] = p['id'] + copy_index * id_step
+            scaled['elements'].append(clone)
+    return scaled
+
+def write_synthetic(path, factor, directory):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    target = os.path.join(directory, f"bootstrap_x{factor}.json")
+    write_atomic(target, json.dumps(synthetic_bootstrap(data, factor), separators=(',', ':')))
+    return target
+
+# --- Measurement ---
+def _peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, {
+        'seconds': min(timings),
+        'mean_seconds': sum(timings) / len(timings),
+        'rss_peak_kb': _peak_rss_kb(),
+    }
+
+def trace_allocations(fn):
+    tracemalloc.start()
+    kept = fn()
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return {'alloc_kb': round(allocated / 1024, 1), 'alloc_peak_kb': round(peak / 1024, 1)}
+
+def run_stages(path, engine='python', stream=False, repeat=3):
+    # Timed pass first (RSS high-water marks stay free of tracing), then one
+    # traced run per stage on the same inputs
+    stages = {}
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'page.html')
+        steps = {
+            'load': lambda: tool.load_data(path, stream=stream),
+            'map_teams': lambda: tool.map_teams(data),
+            'score': lambda: tool.score_elements(data['elements'], engine),
+            'build_rows': lambda: tool.build_rows(data['elements'], teams, draft_scores),
+            'render': lambda: tool.generate_html(players),
+            'write': lambda: tool.write_output(output, html_content),
+        }
+        data, stages['load'] = measure(steps['load'], repeat)
+        teams, stages['map_teams'] = measure(steps['map_teams'], repeat)
+        draft_scores, stages['score'] = measure(steps['score'], repeat)
+        players, stages['build_rows'] = measure(steps['build_rows'], repeat)
+        html_content, stages['render'] = measure(steps['render'], repeat)
+        _, stages['write'] = measure(steps['write'], repeat)
+        for name in STAGES:
+            stages[name].update(trace_allocations(steps[name]))
+    return {
+        'elements': len(data['elements']),
+        'input_bytes': os.path.getsize(path),
+        'output_bytes': len(html_content.encode('utf-8')),
+        'stages': stages,
+        'total_seconds': sum(stage['seconds'] for stage in stages.values()),
+    }
+
+def run_scale(path, factor, engine, stream, repeat):
+    # One scale in a fresh process; synthetic input is written to a temp dir
+    with ProcessPoolExecutor(1) as pool:
+        if factor == 1:
+            return pool.submit(run_stages, path, engine, stream, repeat).result()
+        with tempfile.TemporaryDirectory() as directory:
+            scaled = write_synthetic(path, factor, directory)
+            return pool.submit(run_stages, scaled, engine, stream, repeat).result()
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(path, scales=(1, 10, 100), engine='python', stream=False, repeat=3):
+    results = {
+        'revision': _git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'input': os.path.basename(path),
+        'engine': engine,
+        'stream': stream,
+        'repeat': repeat,
+        'scales': [],
+    }
+    for factor in scales:
+        result = run_scale(path, factor, engine, stream, repeat)
+        result['scale'] = factor
+        results['scales'].append(result)
+        print_scale(result)
+    return results
+
+# --- Reporting ---
+def print_scale(result):
+    print(f"x{result['scale']}: {result['elements']} elements, {result['input_bytes'] / 1e6:.1f} MB in, {result['output_bytes'] / 1e6:.1f} MB out")
+    for name in STAGES:
+        stage = result['stages'][name]
+        print(f"  {name:<11}{stage['seconds'] * 1000:>11.2f} ms{stage['alloc_kb']:>12.0f} KB net{stage['alloc_peak_kb']:>12.0f} KB peak{stage['rss_peak_kb'] / 1024:>9.0f} MB rss")
+    print(f"  {'total':<11}{result['total_seconds'] * 1000:>11.2f} ms")
+
+def compare(baseline, current):
+    # Per-stage current/baseline wall-time ratios for the scales both runs have
+    old = {result['scale']: result for result in baseline['scales']}
+    print(f"vs {baseline.get('revision') or 'baseline'} ({baseline.get('timestamp')})")
+    for result in current['scales']:
+        if result['scale'] not in old:
+            continue
+        ratios = []
+        for name in STAGES:
+            before = old[result['scale']]['stages'][name]['seconds']
+            ratios.append(f"{name} {result['stages'][name]['seconds'] / before:.2f}x" if before else f"{name} n/a")
+        print(f"  x{result['scale']}: " + ', '.join(ratios))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the draft tool build stages.')
+    parser.add_argument('--input', default='FPL_Bootstrap_static.json', help='bootstrap-static JSON file')
+    parser.add_argument('--scales', default='1,10,100', help='comma-separated element multipliers (1000 needs several GB of RAM)')
+    parser.add_argument('--engine', choices=sorted(tool.ENGINES), default='python', help='draft score engine')
+    parser.add_argument('--stream', action='store_true', help='load through the streaming reader')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage (best is reported)')
+    parser.add_argument('--output', default='benchmark_results.json', help='results JSON file')
+    parser.add_argument('--compare', metavar='RESULTS', help='earlier results JSON to compare against')
+    args = parser.parse_args(argv)
+
+    scales = [int(factor) for factor in args.scales.split(',') if factor]
+    results = run_benchmark(args.input, scales, args.engine, args.stream, args.repeat)
+    write_atomic(args.output, json.dumps(results, indent=2))
+    print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
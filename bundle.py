@@ -0,0 +1,249 @@
+# --- Static Bundle Output ---
+# Splits the generated page into long-cacheable static files plus a small
+# shell:
+#   <page>.html                  shell: markup, the PLAYER_DATA / DERIVED
+#                                constants and links to the assets below
+#   <page>_static/app.<hash>.css minified CSS
+#   <page>_static/app.<hash>.js  minified JS (no data in it, so its hash only
+#                                changes when the code does)
+#   <page>_static/manifest.<hash>.json, players-<position>.<hash>.json
+#                                the external-mode payload (payload.py)
+# Asset names carry a hash of their content, so they can be served with
+# "Cache-Control: public, max-age=31536000, immutable"; only the shell needs
+# revalidating. A regeneration that changes one position's numbers gives a
+# new shell, manifest and chunk for that position; everything else is reused
+# by name, both on disk and in browser caches.
+#
+# Every file gets .gz (and .br when the brotli module is installed) siblings
+# for servers that send precompressed files. All writes go to a temporary
+# file renamed into place. The shell is written last, and the previous
+# build's assets are kept until the next build, so a reader holding either
+# shell always finds its files.
+import gzip
+import hashlib
+import json
+import os
+import re
+
+import payload
+from atomic import write_atomic
+
+try:
+    import brotli
+except ImportError:  # optional; without it only .gz siblings are written
+    brotli = None
+
+INDEX_FILE = 'bundle.json'
+HASHED_NAME = re.compile(r'^[\w-]+\.[0-9a-f]{16}\.(css|js|json)(\.gz|\.br)?$')
+PAGE_CONSTANTS = re.compile(r'^[ \t]*const (PLAYER_DATA|DERIVED) = .*;[ \t]*\n', re.MULTILINE)
+
+# --- Minifiers ---
+# Conservative: comments and whitespace only. Strings, template literals and
+# regex literals are copied verbatim, and line breaks between statements are
+# kept so automatic semicolon insertion behaves as before.
+REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw', 'instanceof', 'yield', 'await'}
+
+def _is_word(ch):
+    return ch.isalnum() or ch in '_$' or ord(ch) > 127
+
+def _string_end(source, i):
+    quote = source[i]
+    i += 1
+    while source[i] != quote:
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+def _template_end(source, i):
+    i += 1
+    while source[i] != '`':
+        if source[i] == '\\':
+            i += 2
+        elif source.startswith('${', i):
+            i = _expression_end(source, i + 2)
+        else:
+            i += 1
+    return i + 1
+
+def _expression_end(source, i):
+    # Index after the '}' closing a template ${...}
+    depth = 0
+    while True:
+        ch = source[i]
+        if ch in '\'"':
+            i = _string_end(source, i)
+            continue
+        if ch == '`':
+            i = _template_end(source, i)
+            continue
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            if depth == 0:
+                return i + 1
+            depth -= 1
+        i += 1
+
+def _regex_end(source, i):
+    i += 1
+    in_class = False
+    while in_class or source[i] != '/':
+        if source[i] == '\\':
+            i += 1
+        elif source[i] == '[':
+            in_class = True
+        elif source[i] == ']':
+            in_class = False
+        i += 1
+    i += 1
+    while i < len(source) and _is_word(source[i]):
+        i += 1
+    return i
+
+def minify_js(source):
+    out = []
+    last = ''        # last character emitted
+    last_word = ''   # last identifier emitted, for regex / division
+    gap = ''         # pending whitespace: '', ' ' or '\n'
+    i, n = 0, len(source)
+    while i < n:
+        ch = source[i]
+        if ch in ' \t\r\n':
+            gap = '\n' if ch == '\n' or gap == '\n' else ' '
+            i += 1
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end < 0 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.index('*/', i + 2) + 2
+            if '\n' in source[i:end]:
+                gap = '\n'
+            elif not gap:
+                gap = ' '
+            i = end
+            continue
+
+        if ch in '\'"':
+            end = _string_end(source, i)
+        elif ch == '`':
+            end = _template_end(source, i)
+        elif ch == '/' and (not last or last in REGEX_AFTER or (_is_word(last) and last_word in REGEX_KEYWORDS)):
+            end = _regex_end(source, i)
+        elif _is_word(ch):
+            end = i + 1
+            while end < n and _is_word(source[end]):
+                end += 1
+        else:
+            end = i + 1
+        token = source[i:end]
+
+        if gap and out:
+            if gap == '\n' and last not in '{;,([' and token[0] not in ')]}':
+                out.append('\n')
+            elif _is_word(last) and _is_word(token[0]):
+                out.append(' ')
+            elif last in '+-/' and token[0] in '+-/':
+                out.append(' ')
+        out.append(token)
+        last = token[-1]
+        last_word = token if _is_word(token[0]) else ''
+        gap = ''
+        i = end
+    return ''.join(out)
+
+def minify_css(source):
+    parts = re.split(r'("[^"]*"|\'[^\']*\')', source)
+    for j in range(0, len(parts), 2):
+        text = re.sub(r'/\*.*?\*/', '', parts[j], flags=re.DOTALL)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+        text = re.sub(r':\s+', ':', text)
+        parts[j] = text.replace(';}', '}')
+    return ''.join(parts).strip()
+
+# --- Page Split ---
+def _between(html, start, end):
+    i = html.index(start)
+    j = html.index(end, i)
+    return html[:i], html[i + len(start):j], html[j + len(end):]
+
+def split_page(html):
+    # (shell with {css_link} / {scripts} placeholders, css, js, page constants script)
+    head, css, rest = _between(html, '<style>', '</style>')
+    middle, js, tail = _between(rest, '<script>', '</script>')
+    constants = ''.join(m.group(0).strip() + '\n' for m in PAGE_CONSTANTS.finditer(js))
+    js = PAGE_CONSTANTS.sub('', js)
+    return head + '{css_link}' + middle + '{scripts}' + tail, css, js, constants
+
+# --- Writing ---
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def compressed_siblings(data):
+    # {suffix: bytes}; deterministic, so unchanged files compress identically
+    siblings = {'.gz': gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        siblings['.br'] = brotli.compress(data)
+    return siblings
+
+def write_file(path, data):
+    # Compressed siblings first, so the plain file never points at stale ones
+    for suffix, compressed in compressed_siblings(data).items():
+        write_atomic(path + suffix, compressed)
+    write_atomic(path, data)
+
+def _load_index(static_dir):
+    try:
+        with open(os.path.join(static_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'files': []}
+
+def write_bundle(players, html_path, render):
+    # render(players, manifest_url) -> page HTML. Returns a summary dict.
+    static_dir = os.path.splitext(html_path)[0] + '_static'
+    static_url = os.path.basename(static_dir)
+    os.makedirs(static_dir, exist_ok=True)
+    assets = {}
+
+    def add(stem, extension, data):
+        name = f"{stem}.{_digest(data)}.{extension}"
+        assets[name] = data
+        return name
+
+    manifest, chunks = payload.encode_chunks(players)
+    manifest['chunks'] = [{'key': key, 'file': add(f"players-{key}", 'json', text.encode('utf-8')), 'count': count}
+                          for key, text, count in chunks]
+    manifest_name = add('manifest', 'json', json.dumps(manifest, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
+    shell, css, js, constants = split_page(render(players, f"{static_url}/{manifest_name}"))
+    css_name = add('app', 'css', minify_css(css).encode('utf-8'))
+    js_name = add('app', 'js', minify_js(js).encode('utf-8'))
+    shell = shell.replace('{css_link}', f'<link rel="stylesheet" href="{static_url}/{css_name}">').replace(
+        '{scripts}', f'<script>\n{constants}</script>\n    <script src="{static_url}/{js_name}"></script>').encode('utf-8')
+
+    written = 0
+    for name, data in assets.items():
+        path = os.path.join(static_dir, name)
+        if not os.path.exists(path):
+            write_file(path, data)
+            written += 1
+    write_file(html_path, shell)
+
+    # Keep this build's and the previous build's assets, drop older ones
+    previous = _load_index(static_dir).get('files', [])
+    keep = set(assets) | set(previous)
+    removed = 0
+    for name in os.listdir(static_dir):
+        match = HASHED_NAME.match(name)
+        if match and name[:len(name) - len(match.group(2) or '')] not in keep:
+            os.remove(os.path.join(static_dir, name))
+            removed += 1
+    write_atomic(os.path.join(static_dir, INDEX_FILE), json.dumps({'files': sorted(assets)}, indent=1).encode('utf-8'))
+    return {
+        'shell': html_path, 'static_dir': static_dir, 'assets': len(assets), 'written': written,
+        'reused': len(assets) - written, 'removed': removed, 'shell_bytes': len(shell),
+        'bytes': {name: len(data) for name, data in assets.items()},
+    }
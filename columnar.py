@@ -0,0 +1,126 @@
+# --- Columnar (NumPy) Draft Score Engine ---
+# Loads the elements into typed columns once and evaluates the weighted
+# position formulas as masked array expressions. Produces the same
+# rounded scores as scoring.calculate_draft_score for any weights.
+from scoring import DEFAULT_WEIGHTS, PRICE_SCALE, positions
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the python engine needs nothing extra
+    np = None
+
+# Integer counters from the bootstrap elements
+INT_COLUMNS = {
+    'id': 'id',
+    'element_type': 'element_type',
+    'now_cost': 'now_cost',
+    'minutes': 'minutes',
+    'saves': 'saves',
+    'clean_sheets': 'clean_sheets',
+    'goals_conceded': 'goals_conceded',
+    'bps': 'bps',
+    'bonus': 'bonus',
+}
+
+# Decimal-string fields ("1.23"). Kept as float64 so that every product and
+# sum matches the python engine exactly before rounding; float32 would drift
+# on .5 boundaries.
+FLOAT_COLUMNS = {
+    'ppg': 'points_per_game',
+    'ict_index': 'ict_index',
+    'xg': 'expected_goals',
+    'xa': 'expected_assists',
+    'xGC': 'expected_goals_conceded',
+}
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("The numpy engine requires numpy (pip install numpy)")
+
+def load_columns(all_players_elements):
+    require_numpy()
+    columns = {}
+    for column, field in INT_COLUMNS.items():
+        columns[column] = np.fromiter((p.get(field, 0) for p in all_players_elements), dtype=np.int32, count=len(all_players_elements))
+    for column, field in FLOAT_COLUMNS.items():
+        columns[column] = np.fromiter((float(p.get(field, 0)) for p in all_players_elements), dtype=np.float64, count=len(all_players_elements))
+    return columns
+
+def load_cached_columns(columns):
+    # Zero-copy views over a snapshot_cache memory map (int32 / float64 blocks)
+    require_numpy()
+    loaded = {column: np.frombuffer(columns[field], dtype=np.int32) for column, field in INT_COLUMNS.items()}
+    loaded.update({column: np.frombuffer(columns[field], dtype=np.float64) for column, field in FLOAT_COLUMNS.items()})
+    return loaded
+
+def _column_max(values, default=1):
+    return values.max().item() if values.size else default
+
+def column_stats_context(columns):
+    pos = columns['element_type']
+    return {'max': {
+        'saves': _column_max(columns['saves'][pos == 1]),
+        'clean_sheets': _column_max(columns['clean_sheets']),
+        'bps': _column_max(columns['bps']),
+        'ppg': _column_max(columns['ppg']),
+        'bonus': _column_max(columns['bonus']),
+        'ict_index': _column_max(columns['ict_index']),
+        'xg': _column_max(columns['xg']),
+        'xa': _column_max(columns['xa']),
+        'xGC': _column_max(columns['xGC']),
+        'xGC_diff': _column_max(columns['xGC'] - columns['goals_conceded']),
+    }}
+
+def _norm(values, max_value):
+    # Same as normalize_stat: a zero maximum scores 0
+    if max_value == 0:
+        return np.zeros(values.shape, dtype=np.float64)
+    return values / max_value
+
+def feature_columns(columns, m):
+    # Lazily normalised feature columns, keyed like scoring.WEIGHT_FEATURES
+    builders = {
+        'saves': lambda: _norm(columns['saves'], m['saves']),
+        'xg_xa': lambda: _norm(columns['xg'] + columns['xa'], m['xg'] + m['xa']),
+        'xGC_diff': lambda: _norm(columns['xGC'] - columns['goals_conceded'], m['xGC_diff']),
+        'price': lambda: _norm(columns['now_cost'], PRICE_SCALE),
+    }
+    built = {}
+
+    def feature(name):
+        if name not in built:
+            built[name] = builders[name]() if name in builders else _norm(columns[name], m[name])
+        return built[name]
+    return feature
+
+def score_columns(columns, context=None, weights=None):
+    require_numpy()
+    if context is None:
+        context = column_stats_context(columns)
+    weights = weights or DEFAULT_WEIGHTS
+    feature = feature_columns(columns, context['max'])
+    pos = columns['element_type']
+    played = columns['minutes'] != 0
+
+    # Summed term by term in weight order, as calculate_draft_score does
+    score = np.zeros(pos.shape, dtype=np.float64)
+    for element_type, position in positions.items():
+        mask = played & (pos == element_type)
+        if not mask.any():
+            continue
+        total = np.zeros(int(mask.sum()), dtype=np.float64)
+        for name, weight in weights.get(position, {}).items():
+            total += feature(name)[mask] * weight
+        score[mask] = total
+
+    # Players without minutes: 0-50 scale
+    unplayed = ~played
+    result = np.rint(score * 100)
+    total = np.zeros(int(unplayed.sum()), dtype=np.float64)
+    for name, weight in weights['unplayed'].items():
+        total += feature(name)[unplayed] * weight
+    result[unplayed] = np.rint(total * 50)
+    return result.astype(np.int32)
+
+def score_players(all_players_elements, context=None, weights=None):
+    return [int(s) for s in score_columns(load_columns(all_players_elements), context, weights)]
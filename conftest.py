@@ -0,0 +1,52 @@
+# --- Shared Test Fixtures ---
+# run_page runs a generated page's script under node with a stub DOM, then a
+# probe script in the same scope (so it sees the page's top-level functions
+# and constants), and returns what the probe printed. Tests using it are
+# skipped when node is not installed.
+import shutil
+import subprocess
+
+import pytest
+
+HARNESS = r"""
+const fs = require('fs'); const vm = require('vm');
+const source = fs.readFileSync(process.argv[2], 'utf8');
+function el(id) {
+  return { id, innerHTML: '', textContent: '', value: '', style: {}, dataset: {}, children: [], length: 1,
+    classList: { s: new Set(), add(c) { this.s.add(c); }, remove(c) { this.s.delete(c); }, contains(c) { return this.s.has(c); },
+                 toggle(c, on) { on ? this.s.add(c) : this.s.delete(c); } },
+    addEventListener() {}, add() {}, querySelector() { return el('x'); }, insertBefore() {},
+    scrollTop: 0, clientHeight: 700, offsetHeight: 30, firstChild: null, lastChild: null, cells: [] };
+}
+const els = {}; const store = {};
+const ctx = {
+  console, JSON, Math, Map, Set, Object, Array, Number, String, RegExp, parseInt, parseFloat, Uint32Array, Promise,
+  setTimeout, clearTimeout, Option: function() {}, requestAnimationFrame: f => f(), alert() {}, confirm: () => true,
+  localStorage: { getItem: k => store[k] ?? null, setItem: (k, v) => { store[k] = v; } },
+  window: { addEventListener() {} },
+  document: { getElementById: id => els[id] || (els[id] = el(id)), querySelector: () => el('q'), querySelectorAll: () => [],
+              addEventListener() {}, createElement: () => el('c') },
+};
+vm.createContext(ctx);
+vm.runInContext(source, ctx);
+"""
+
+def page_script(html):
+    # The inline script of a generated page (the generator emits one block)
+    start = html.index('<script>') + len('<script>')
+    return html[start:html.index('</script>', start)]
+
+@pytest.fixture
+def run_page(tmp_path):
+    if shutil.which('node') is None:
+        pytest.skip('node is not installed')
+
+    def run(js, probe):
+        (tmp_path / 'harness.js').write_text(HARNESS, encoding='utf-8')
+        (tmp_path / 'page.js').write_text(js + '\n;' + probe, encoding='utf-8')
+        result = subprocess.run(['node', str(tmp_path / 'harness.js'), str(tmp_path / 'page.js')],
+                                capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0, result.stderr
+        return result.stdout.strip()
+
+    return run
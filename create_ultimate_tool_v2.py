@@ -1,84 +1,74 @@
+import argparse
+import functools
 import json
+import os
+import sys
+
+import bundle
+import columnar
+import derived
+import fixtures
+import history
+import incremental
+import ingest
+import leagues
+import momentum
+import payload
+import profiling
+import projection
+import scoring
+import similarity
+import snapshot_cache
+import squad_solver
+from atomic import write_atomic
+from scoring import positions
 
 # Read data from the FPL JSON file
-with open('FPL_Bootstrap_static.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
-
-# Team and position mappings
-teams = {team['id']: team['name'] for team in data['teams']}
-positions = {1: 'GKP', 2: 'DEF', 3: 'MID', 4: 'FWD'}
-
-# --- Normalization and Position-Specific Draft Score ---
-def normalize_stat(value, max_value, reverse=False):
-    if max_value == 0: return 0
-    score = value / max_value
-    return (1 - score) if reverse else score
-
-def calculate_draft_score(player, all_players_elements):
-    pos = player.get('element_type')
-    
-    max_stats = {
-        'saves': max((p.get('saves', 0) for p in all_players_elements if p.get('element_type') == 1), default=1),
-        'clean_sheets': max((p.get('clean_sheets', 0) for p in all_players_elements), default=1),
-        'bps': max((p.get('bps', 0) for p in all_players_elements), default=1),
-        'ppg': max((float(p.get('points_per_game', 0)) for p in all_players_elements), default=1),
-        'bonus': max((p.get('bonus', 0) for p in all_players_elements), default=1),
-        'ict_index': max((float(p.get('ict_index', 0)) for p in all_players_elements), default=1),
-        'xg': max((float(p.get('expected_goals', 0)) for p in all_players_elements), default=1),
-        'xa': max((float(p.get('expected_assists', 0)) for p in all_players_elements), default=1),
-        'xGC': max((float(p.get('expected_goals_conceded', 0)) for p in all_players_elements), default=1),
-    }
-
-    score = 0
-    minutes = player.get('minutes', 0)
-    if minutes == 0:
-        price_score = normalize_stat(player.get('now_cost', 0), 130) * 0.7
-        ict_score = normalize_stat(float(player.get('ict_index', 0)), max_stats['ict_index']) * 0.3
-        return round((price_score + ict_score) * 50)
-
-    if pos == 1: # GKP
-        saves_score = normalize_stat(player.get('saves', 0), max_stats['saves']) * 0.30
-        cs_score = normalize_stat(player.get('clean_sheets', 0), max_stats['clean_sheets']) * 0.25
-        bps_score = normalize_stat(player.get('bps', 0), max_stats['bps']) * 0.15
-        ppg_score = normalize_stat(float(player.get('points_per_game', 0)), max_stats['ppg']) * 0.10
-        bonus_score = normalize_stat(player.get('bonus', 0), max_stats['bonus']) * 0.05
-        xGC_val = float(player.get('expected_goals_conceded', 0))
-        actual_gc = player.get('goals_conceded', 0)
-        xGC_diff_score = normalize_stat(xGC_val - actual_gc, max((float(p.get('expected_goals_conceded', 0)) - p.get('goals_conceded', 0) for p in all_players_elements), default=1)) * 0.15
-        score = (saves_score + cs_score + bps_score + ppg_score + bonus_score + xGC_diff_score)
-        
-    elif pos == 2: # DEF
-        ict_score = normalize_stat(float(player.get('ict_index', 0)), max_stats['ict_index']) * 0.20
-        cs_score = normalize_stat(player.get('clean_sheets', 0), max_stats['clean_sheets']) * 0.40
-        xga_score = normalize_stat(float(player.get('expected_goals', 0)) + float(player.get('expected_assists', 0)), max_stats['xg'] + max_stats['xa']) * 0.30
-        bps_score = normalize_stat(player.get('bps', 0), max_stats['bps']) * 0.10
-        bonus_score = 0 # Explicitly set to 0 as per user request
-        score = (ict_score + cs_score + xga_score + bps_score + bonus_score)
-
-    elif pos == 3: # MID
-        ict_score = normalize_stat(float(player.get('ict_index', 0)), max_stats['ict_index']) * 0.10
-        xga_score = normalize_stat(float(player.get('expected_goals', 0)) + float(player.get('expected_assists', 0)), max_stats['xg'] + max_stats['xa']) * 0.40
-        bps_score = normalize_stat(player.get('bps', 0), max_stats['bps']) * 0.15
-        ppg_score = normalize_stat(float(player.get('points_per_game', 0)), max_stats['ppg']) * 0.25
-        bonus_score = normalize_stat(player.get('bonus', 0), max_stats['bonus']) * 0.10
-        score = (ict_score + xga_score + bps_score + ppg_score + bonus_score)
-        
-    elif pos == 4: # FWD
-        xg_score = normalize_stat(float(player.get('expected_goals', 0)), max_stats['xg']) * 0.30
-        ict_score = normalize_stat(float(player.get('ict_index', 0)), max_stats['ict_index']) * 0.15
-        bps_score = normalize_stat(player.get('bps', 0), max_stats['bps']) * 0.15
-        ppg_score = normalize_stat(float(player.get('points_per_game', 0)), max_stats['ppg']) * 0.40
-        score = (xg_score + ict_score + bps_score + ppg_score)
+def load_data(path='FPL_Bootstrap_static.json', stream=False, cache=False, rebuild_cache=False):
+    if cache or rebuild_cache:
+        return snapshot_cache.load_snapshot(path, rebuild=rebuild_cache)[0]
+    if stream:
+        return ingest.read_snapshot(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
-    return round(score * 100)
+# Team mapping
+def map_teams(data):
+    return {team['id']: team['name'] for team in data['teams']}
 
-# --- Main Data Processing Loop ---
-processed_players = []
-all_players_elements = data['elements']
-for player in all_players_elements:
-    draft_score = calculate_draft_score(player, all_players_elements)
+# --- Draft Score Engines ---
+ENGINES = {
+    'python': scoring.score_players,
+    'numpy': columnar.score_players,
+}
+
+def score_elements(all_players_elements, engine='python', weights=None):
+    return ENGINES[engine](all_players_elements, weights=weights)
+
+def score_snapshot(data, engine='python', weights=None):
+    # Cached snapshots hand their memory-mapped columns straight to numpy
+    columns = getattr(data, 'columns', None)
+    if engine == 'numpy' and columns:
+        return [int(s) for s in columnar.score_columns(columnar.load_cached_columns(columns), weights=weights)]
+    return score_elements(data['elements'], engine, weights)
 
-    processed_players.append({
+def snapshot_scorer(data, engine='python'):
+    # callable(weights=...) -> draft scores, with the columns and league
+    # maxima prepared once for scoring under many weightings
+    if engine == 'numpy':
+        columns = getattr(data, 'columns', None)
+        columns = columnar.load_cached_columns(columns) if columns else columnar.load_columns(data['elements'])
+        return functools.partial(columnar.score_columns, columns, columnar.column_stats_context(columns))
+    return functools.partial(scoring.score_players, data['elements'], scoring.build_stats_context(data['elements']))
+
+def verify_engines(all_players_elements):
+    expected = scoring.score_players(all_players_elements)
+    actual = columnar.score_players(all_players_elements)
+    return [p['id'] for p, a, b in zip(all_players_elements, expected, actual) if a != b]
+
+# --- Main Data Processing Loop ---
+def build_processed_player(player, teams, draft_score):
+    return derived.add_derived_fields({
         'id': player['id'],
         'name': f"{player.get('first_name', '')} {player.get('web_name', '')}",
         'team': teams.get(player['team'], 'Unknown'),
@@ -102,9 +92,18 @@ for player in all_players_elements:
         'rotation_risk': player.get('minutes', 0) < 1500 and (player.get('now_cost', 0) / 10) > 5.0
     })
 
+def build_rows(all_players_elements, teams, draft_scores):
+    return [build_processed_player(player, teams, draft_score) for player, draft_score in zip(all_players_elements, draft_scores)]
+
+def build_processed_players(data, engine='python', weights=None):
+    teams = map_teams(data)
+    draft_scores = score_snapshot(data, engine, weights)
+    return build_rows(data['elements'], teams, draft_scores)
+
 # --- HTML Generation ---
-def generate_html(players):
-    players_json = json.dumps(players)
+def generate_html(players, manifest_url=None):
+    player_data = payload.page_data_script(players, manifest_url)
+    derived_constants = json.dumps(derived.page_constants(), ensure_ascii=False)
 
     html_template = """
 <!DOCTYPE html>
@@ -114,69 +113,85 @@ def generate_html(players):
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>FPL Ultimate Draft Tool</title>
     <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
             min-height: 100vh; padding: 15px; line-height: 1.4; max-width: 1400px; margin: 0 auto;
-        }}
-        .header {{ text-align: center; margin-bottom: 20px; background: white; padding: 15px; border-radius: 12px; box-shadow: 0 6px 20px rgba(0,0,0,0.1); }}
-        h1 {{ color: #2c3e50; font-size: 1.8em; margin-bottom: 8px; font-weight: 700; }}
-        .subtitle {{ color: #7f8c8d; font-size: 1em; font-weight: 500; }}
-        .legend {{
+        }
+        .header { text-align: center; margin-bottom: 20px; background: white; padding: 15px; border-radius: 12px; box-shadow: 0 6px 20px rgba(0,0,0,0.1); }
+        h1 { color: #2c3e50; font-size: 1.8em; margin-bottom: 8px; font-weight: 700; }
+        .subtitle { color: #7f8c8d; font-size: 1em; font-weight: 500; }
+        .legend {
             background: #fff; padding: 12px; border-radius: 8px; text-align: center;
             margin-bottom: 20px; font-size: 0.9em; box-shadow: 0 4px 15px rgba(0,0,0,0.05);
-        }}
-        .legend-item {{ display: inline-block; margin: 0 10px; }}
-        .legend-title {{ font-weight: 600; cursor: help; border-bottom: 1px dotted #2c3e50; }}
-        .filters {{ background: white; padding: 15px; margin-bottom: 15px; border-radius: 12px; box-shadow: 0 6px 20px rgba(0,0,0,0.1); display: grid; grid-template-columns: repeat(auto-fit, minmax(160px, 1fr)); gap: 12px; align-items: end; }}
-        .filter-group {{ display: flex; flex-direction: column; }}
-        label {{ font-weight: 600; margin-bottom: 4px; color: #2c3e50; font-size: 0.85em; }}
-        select, input {{ padding: 8px; border: 2px solid #ecf0f1; border-radius: 6px; font-size: 12px; transition: all 0.3s ease; }}
-        select:focus, input:focus {{ outline: none; border-color: #a1c4fd; box-shadow: 0 0 0 3px rgba(161, 196, 253, 0.2); }}
-        .controls {{ display: flex; gap: 10px; margin-bottom: 15px; justify-content: center; flex-wrap: wrap; }}
-        .control-button {{
+        }
+        .legend-item { display: inline-block; margin: 0 10px; }
+        .legend-title { font-weight: 600; cursor: help; border-bottom: 1px dotted #2c3e50; }
+        .filters { background: white; padding: 15px; margin-bottom: 15px; border-radius: 12px; box-shadow: 0 6px 20px rgba(0,0,0,0.1); display: grid; grid-template-columns: repeat(auto-fit, minmax(160px, 1fr)); gap: 12px; align-items: end; }
+        .filter-group { display: flex; flex-direction: column; }
+        label { font-weight: 600; margin-bottom: 4px; color: #2c3e50; font-size: 0.85em; }
+        select, input { padding: 8px; border: 2px solid #ecf0f1; border-radius: 6px; font-size: 12px; transition: all 0.3s ease; }
+        select:focus, input:focus { outline: none; border-color: #a1c4fd; box-shadow: 0 0 0 3px rgba(161, 196, 253, 0.2); }
+        .controls { display: flex; gap: 10px; margin-bottom: 15px; justify-content: center; flex-wrap: wrap; }
+        .control-button {
             background: linear-gradient(135deg, #e2e8f0 0%, #f1f5f9 100%); color: #475569;
             border: 1px solid #cbd5e1; padding: 8px 16px; border-radius: 8px; cursor: pointer;
             font-weight: 600; transition: all 0.3s ease; font-size: 0.85em;
-        }}
-        .control-button:hover {{ transform: translateY(-2px); box-shadow: 0 4px 12px rgba(0,0,0,0.1); background: linear-gradient(135deg, #f1f5f9 0%, #e2e8f0 100%); }}
-        .control-button.active {{ background: linear-gradient(135deg, #a1c4fd 0%, #c2e9fb 100%); color: #333; border-color: #a1c4fd; }}
-        .table-container {{ background: white; border-radius: 12px; overflow: hidden; box-shadow: 0 6px 20px rgba(0,0,0,0.1); overflow-x: auto; }}
-        table {{ width: 100%; border-collapse: collapse; font-size: 0.8em; }}
-        th {{ background: linear-gradient(135deg, #a1c4fd 0%, #c2e9fb 100%); color: #333; padding: 10px 6px; text-align: center; font-weight: 600; white-space: nowrap; cursor: pointer; user-select: none; transition: all 0.3s ease; position: sticky; top: 0; z-index: 10; font-size: 0.75em; }}
-        th:hover {{ background: linear-gradient(135deg, #8ab2f2 0%, #a1c4fd 100%); }}
-        th.sorted {{ background: linear-gradient(135deg, #8ab2f2 0%, #a1c4fd 100%); }}
-        td {{ padding: 8px 6px; border-bottom: 1px solid #f8f9fa; white-space: nowrap; font-size: 0.8em; text-align: center; }}
-        tr:hover {{ background: #f1f5f9; }}
-        .name-cell {{ font-weight: 600; color: #2c3e50; min-width: 100px; text-align:right; }}
-        .player-name-icon {{ margin-right: 5px; font-size: 0.9em; }}
-        .verbal-insights-cell {{ white-space: normal; font-size: 0.75em; line-height: 1.2; color: #5a6c7d; min-width: 150px; text-align: right;}}
-        .position-gkp {{ background-color: #fff3cd !important; }}
-        .position-def {{ background-color: #d1ecf1 !important; }}
-        .position-mid {{ background-color: #d4edda !important; }}
-        .position-fwd {{ background-color: #f8d7da !important; }}
-        .xdiff-positive {{ color: #27ae60; font-weight: 600; }}
-        .xdiff-negative {{ color: #e74c3c; font-weight: 600; }}
-        .sort-indicator {{ display: inline-block; margin-left: 3px; }}
-        .modal {{
+        }
+        .control-button:hover { transform: translateY(-2px); box-shadow: 0 4px 12px rgba(0,0,0,0.1); background: linear-gradient(135deg, #f1f5f9 0%, #e2e8f0 100%); }
+        .control-button.active, .control-button.draft-on { background: linear-gradient(135deg, #a1c4fd 0%, #c2e9fb 100%); color: #333; border-color: #a1c4fd; }
+        .table-container { background: white; border-radius: 12px; overflow: hidden; box-shadow: 0 6px 20px rgba(0,0,0,0.1); overflow-x: auto; }
+        table { width: 100%; border-collapse: collapse; font-size: 0.8em; }
+        th { background: linear-gradient(135deg, #a1c4fd 0%, #c2e9fb 100%); color: #333; padding: 10px 6px; text-align: center; font-weight: 600; white-space: nowrap; cursor: pointer; user-select: none; transition: all 0.3s ease; position: sticky; top: 0; z-index: 10; font-size: 0.75em; }
+        th:hover { background: linear-gradient(135deg, #8ab2f2 0%, #a1c4fd 100%); }
+        th.sorted { background: linear-gradient(135deg, #8ab2f2 0%, #a1c4fd 100%); }
+        td { padding: 8px 6px; border-bottom: 1px solid #f8f9fa; white-space: nowrap; font-size: 0.8em; text-align: center; }
+        #tableScroll { max-height: 75vh; overflow-y: auto; }
+        .player-row td { height: 36px; }
+        .spacer-row td { padding: 0; border: none; }
+        .bold-cell { font-weight: 700; }
+        tr:hover { background: #f1f5f9; }
+        .name-cell { font-weight: 600; color: #2c3e50; min-width: 100px; text-align:right; }
+        .player-name-icon { margin-right: 5px; font-size: 0.9em; }
+        #playersTable:not(.with-momentum) .momentum-col { display: none; }
+        .verbal-insights-cell { white-space: nowrap; overflow: hidden; text-overflow: ellipsis; max-width: 260px; font-size: 0.75em; line-height: 1.2; color: #5a6c7d; min-width: 150px; text-align: right;}
+        .position-gkp { background-color: #fff3cd !important; }
+        .position-def { background-color: #d1ecf1 !important; }
+        .position-mid { background-color: #d4edda !important; }
+        .position-fwd { background-color: #f8d7da !important; }
+        .xdiff-positive { color: #27ae60; font-weight: 600; }
+        .xdiff-negative { color: #e74c3c; font-weight: 600; }
+        .sort-indicator { display: inline-block; margin-left: 3px; }
+        .modal {
             display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%;
             overflow: auto; background-color: rgba(0,0,0,0.4);
-        }}
-        .modal-content {{
+        }
+        .modal-content {
             background-color: #fefefe; margin: 5% auto; padding: 20px; border: 1px solid #888;
             width: 90%; max-width: 1200px; border-radius: 12px;
-        }}
-        .close {{ color: #aaa; float: right; font-size: 28px; font-weight: bold; cursor: pointer; }}
-        #compareTable th {{ background: linear-gradient(135deg, #c2e9fb 0%, #a1c4fd 100%); }}
-        #compareTable {{ width: auto; margin: 0 auto; border-collapse: separate; border-spacing: 0; }}
-        #compareTable th, #compareTable td {{ border: 1px solid #ddd; padding: 8px; }}
-        #compareTable td {{ font-size: 1.1em; }}
-        .value-best {{ background-color: #d4edda; }}
-        .value-good {{ background-color: #e2f0d9; }}
-        .value-mid {{ background-color: #fff2cc; }}
-        .value-bad {{ background-color: #f8d7da; }}
-        .value-worst {{ background-color: #f5c6cb; }}
+        }
+        .close { color: #aaa; float: right; font-size: 28px; font-weight: bold; cursor: pointer; }
+        #compareTable th { background: linear-gradient(135deg, #c2e9fb 0%, #a1c4fd 100%); }
+        #compareTable { width: auto; margin: 0 auto; border-collapse: separate; border-spacing: 0; }
+        #compareTable th, #compareTable td { border: 1px solid #ddd; padding: 8px; }
+        #compareTable td { font-size: 1.1em; }
+        .value-best { background-color: #d4edda; }
+        .value-good { background-color: #e2f0d9; }
+        .value-mid { background-color: #fff2cc; }
+        .value-bad { background-color: #f8d7da; }
+        .value-worst { background-color: #f5c6cb; }
+        .draft-panel { display: none; background: white; padding: 15px; margin-bottom: 15px; border-radius: 12px; box-shadow: 0 6px 20px rgba(0,0,0,0.1); }
+        .draft-panel.active { display: block; }
+        .draft-toolbar { display: flex; gap: 10px; align-items: center; flex-wrap: wrap; margin-bottom: 8px; }
+        .draft-hint { color: #7f8c8d; font-size: 0.8em; margin-bottom: 10px; }
+        .draft-columns { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 12px; }
+        .draft-columns h3 { font-size: 0.9em; color: #2c3e50; margin-bottom: 6px; }
+        .draft-list { list-style: none; font-size: 0.8em; }
+        .draft-list li { display: flex; justify-content: space-between; align-items: center; gap: 6px; padding: 3px 0; border-bottom: 1px solid #f1f5f9; }
+        .draft-list button { padding: 1px 6px; font-size: 0.9em; cursor: pointer; border: 1px solid #cbd5e1; border-radius: 4px; background: #f8fafc; }
+        .player-row.draft-taken td { opacity: 0.35; text-decoration: line-through; }
+        .player-row.draft-mine td { background-color: #b9f6ca !important; }
     </style>
 </head>
 <body>
@@ -193,18 +208,19 @@ def generate_html(players):
             </p>
     </div>
     <div class="filters">
-            <div class="filter-group"><label>🔍 חיפוש שחקן:</label><input type="text" id="searchName" onkeyup="processChange()" placeholder="שם שחקן..."></div>
+            <div class="filter-group"><label>🔍 חיפוש שחקן:</label><input type="text" id="searchName" oninput="scheduleProcessChange()" placeholder="שם שחקן..."></div>
             <div class="filter-group"><label>⚽ עמדה:</label><select id="positionFilter" onchange="processChange()"><option value="">כל העמדות</option><option value="GKP">🥅 שוערים</option><option value="DEF">🛡️ מגנים</option><option value="MID">⚽ קשרים</option><option value="FWD">🎯 חלוצים</option></select></div>
             <div class="filter-group"><label>🏟️ קבוצה:</label><select id="teamFilter" onchange="processChange()"><option value="">כל הקבוצות</option></select></div>
-            <div class="filter-group"><label>💰 מחיר טווח:</label><input type="text" id="priceRange" onkeyup="processChange()" placeholder="4.0-15.0"></div>
-            <div class="filter-group"><label>🏆 נקודות מינימום:</label><input type="number" id="minPoints" onkeyup="processChange()" placeholder="0"></div>
-            <div class="filter-group"><label>📊 % בחירה מינימלי:</label><input type="number" id="minSelected" step="0.0001" onkeyup="processChange()" placeholder="0.0001" value="0.0001"></div>
+            <div class="filter-group"><label>💰 מחיר טווח:</label><input type="text" id="priceRange" oninput="scheduleProcessChange()" placeholder="4.0-15.0"></div>
+            <div class="filter-group"><label>🏆 נקודות מינימום:</label><input type="number" id="minPoints" oninput="scheduleProcessChange()" placeholder="0"></div>
+            <div class="filter-group"><label>📊 % בחירה מינימלי:</label><input type="number" id="minSelected" step="0.0001" oninput="scheduleProcessChange()" placeholder="0.0001" value="0.0001"></div>
             <div class="filter-group"><label>🎯 טווח xDiff:</label><select id="xDiffFilter" onchange="processChange()"><option value="">כל הטווח</option><option value="positive">חיובי (ביצועי יתר)</option><option value="negative">שלילי (ביצועי חסר)</option></select></div>
             <div class="filter-group"><label>הצג:</label><select id="showEntries" onchange="processChange()"><option value="50">50</option><option value="100">100</option><option value="200">200</option><option value="all" selected>הכל</option></select></div>
         </div>
     <div class="controls">
             <button class="control-button active" onclick="showAllPlayers(this)">כל השחקנים</button>
             <button class="control-button" id="compareBtn" onclick="compareSelectedPlayers()">השווה שחקנים נבחרים</button>
+            <button class="control-button" id="similarBtn" onclick="showReplacements()" style="display: none">🔁 תחליפים זולים לנבחרים</button>
             <button class="control-button" data-filter-name="differentials" onclick="quickFilter(this, 'differentials')">💎 Differentials</button>
             <button class="control-button" data-filter-name="penalties" onclick="quickFilter(this, 'penalties')">🎯 בועטי פנדלים</button>
             <button class="control-button" data-filter-name="corners" onclick="quickFilter(this, 'corners')">⚽ מרימי קרנות</button>
@@ -213,9 +229,27 @@ def generate_html(players):
             <button class="control-button" data-filter-name="overperforming" onclick="quickFilter(this, 'overperforming')">📈 ביצועי יתר</button>
             <button class="control-button" data-filter-name="bonus_magnets" onclick="quickFilter(this, 'bonus_magnets')">🎖️ מגנטי בונוס</button>
             <button class="control-button" data-filter-name="value" onclick="quickFilter(this, 'value')">💰 ערך מצוין</button>
+            <button class="control-button momentum-filter" data-filter-name="price_risers" onclick="quickFilter(this, 'price_risers')" style="display: none">💹 צפויים לעלות במחיר</button>
+            <button class="control-button momentum-filter" data-filter-name="price_fallers" onclick="quickFilter(this, 'price_fallers')" style="display: none">🔻 צפויים לרדת במחיר</button>
         <button class="control-button" onclick="exportToCsv()">📁 יצוא CSV</button>
+            <button class="control-button" id="draftBtn" onclick="toggleDraftMode()">🏁 מצב דראפט</button>
+    </div>
+    <div class="draft-panel" id="draftPanel">
+        <div class="draft-toolbar">
+            <label for="draftKey">דירוג לפי:</label>
+            <select id="draftKey" onchange="setDraftKey(this.value)"></select>
+            <span id="draftStatus"></span>
+            <button class="control-button" onclick="undoDraftPick()">↩ ביטול בחירה אחרונה</button>
+            <button class="control-button" onclick="resetDraft()">🔄 איפוס דראפט</button>
+        </div>
+        <p class="draft-hint">לחיצה על שורה בטבלה מסמנת שחקן שנבחר ע"י אחרים, Shift+לחיצה מסמנת אותו לקבוצה שלי, לחיצה נוספת מחזירה אותו למאגר.</p>
+        <div class="draft-columns">
+            <div><h3>⭐ הטובים ביותר שנותרו (לפי צורך בעמדה)</h3><ol class="draft-list" id="draftBest"></ol></div>
+            <div id="draftPositions" class="draft-columns"></div>
+            <div><h3>👕 הקבוצה שלי</h3><ul class="draft-list" id="draftMine"></ul></div>
+        </div>
     </div>
-    <div class="table-container">
+    <div class="table-container" id="tableScroll">
         <table id="playersTable">
             <thead>
                 <tr>
@@ -236,7 +270,9 @@ def generate_html(players):
                         <th onclick="sortTable(14)">ICT<span class="sort-indicator"></span></th>
                         <th onclick="sortTable(15)">בונוס<span class="sort-indicator"></span></th>
                         <th onclick="sortTable(16)">שער נקי<span class="sort-indicator"></span></th>
-                        <th onclick="sortTable(17)">תובנות<span class="sort-indicator"></span></th>
+                        <th class="momentum-col" onclick="sortTable(17)">העברות נטו<span class="sort-indicator"></span></th>
+                        <th class="momentum-col" onclick="sortTable(18)">לשינוי מחיר %<span class="sort-indicator"></span></th>
+                        <th onclick="sortTable(19)">תובנות<span class="sort-indicator"></span></th>
                         <th>בחר</th>
                 </tr>
             </thead>
@@ -256,292 +292,492 @@ def generate_html(players):
 
     </div>
     <script>
-        const allPlayers = {players_json};
+        const PLAYER_DATA = __PLAYER_DATA__;
+        const DERIVED = __DERIVED__;
+        let allPlayers = [];
+        const playersById = new Map();
+        let playerOrders = {};
+        let expectedPlayerCount = 0;
         let displayedData = [];
         let sortColumn = 2;
         let sortDirection = 'desc';
         let activeQuickFilterName = null;
+        const selectedForComparison = new Set();
 
-        const quickFilterFunctions = {{
-            'differentials': p => p.selected_percent < 5 && p.total_points > 30,
-            'penalties': p => p.penalty_taker,
-            'corners': p => p.corners_taker,
-            'underperforming': p => parseFloat(calculateXDiff(p)) <= -4,
-            'overperforming': p => parseFloat(calculateXDiff(p)) >= 4,
-            'bonus_magnets': p => p.bps > 20,
-            'value': p => (p.price > 0 && (p.ppg / p.price) > 0.8 && p.total_points > 50),
-            'clean_sheets': p => p.clean_sheets > 8
-        }};
-
-        const calculateXDiff = p => ((p.goals + p.assists) - (p.xg + p.xa)).toFixed(2);
-
-        function generatePlayerIcons(p) {{
-            const icons = [];
-            if (p.penalty_taker) icons.push(`<span class='player-name-icon'>🎯</span>`);
-            if (p.corners_taker) icons.push(`<span class='player-name-icon'>⚽</span>`);
-            if (p.selected_percent < 5) icons.push(`<span class='player-name-icon'>💎</span>`);
-            if (p.rotation_risk) icons.push(`<span class='player-name-icon'>⚠️</span>`);
-            if (parseFloat(calculateXDiff(p)) > 1) icons.push(`<span class='player-name-icon'>📈</span>`); // Overperforming
-            if (parseFloat(calculateXDiff(p)) < -1) icons.push(`<span class='player-name-icon'>📉</span>`); // Underperforming
-            if (p.price > 0 && (p.ppg / p.price) > 0.8 && p.total_points > 50) icons.push(`<span class='player-name-icon'>💰</span>`);
-            if (p.bps > 500) icons.push(`<span class='player-name-icon'>🎖️</span>`);
-            return icons.join("");
-        }}
-
-        function generateVerbalInsights(p) {{
-            const insights = [];
-            if (p.penalty_taker) insights.push("בועט פנדלים");
-            if (p.corners_taker) insights.push("לוקח קרנות");
-            if (p.selected_percent < 5) insights.push("דיפרנציאל");
-            if (p.rotation_risk) insights.push("סיכון רוטציה");
-            if (parseFloat(calculateXDiff(p)) > 1) insights.push("במימוש יתר");
-            if (parseFloat(calculateXDiff(p)) < -1) insights.push("בביצועי חסר, צפוי להשתפר");
-            if (p.price > 0 && (p.ppg / p.price) > 0.8 && p.total_points > 50) insights.push("תמורה מעולה למחיר");
-            if (p.bps > 500) insights.push("מגנט בונוסים");
-            return insights.join(', ');
-        }}
-        
-        function populateTeamFilter() {{
+        // --- Virtualized table: only the rows in view (plus overscan) exist in the DOM ---
+        const ROW_HEIGHT = 36; // px, matches .player-row td
+        const OVERSCAN = 10;
+        const COLUMN_COUNT = 21;
+        const BOLD_COLUMNS = new Set([2, 4, 5, 6, 9, 10, 12]);
+        let rowsToRender = [];
+        let rowPool = [];
+        let renderedRange = [-1, -1];
+        let scrollScheduled = false;
+
+        function generatePlayerIcons(p) {
+            return DERIVED.insights.filter(i => p.insight_flags & i.bit).map(i => `<span class='player-name-icon'>${i.icon}</span>`).join('');
+        }
+
+        // Columnar payload -> player objects (see payload.py)
+        function decodeColumns(payload) {
+            const { fields, count, columns } = payload;
+            const dictionaries = payload.dictionaries || {};
+            const booleans = new Set(payload.booleans || []);
+            const players = new Array(count);
+            for (let i = 0; i < count; i++) {
+                const p = {};
+                for (const field of fields) {
+                    const value = columns[field][i];
+                    if (dictionaries[field]) p[field] = dictionaries[field][value];
+                    else if (booleans.has(field)) p[field] = !!value;
+                    else p[field] = value;
+                }
+                players[i] = p;
+            }
+            return players;
+        }
+
+        // Inline payload, or a manifest plus one chunk per position fetched in parallel
+        async function loadPlayers(onChunk) {
+            if (PLAYER_DATA.payload) {
+                playerOrders = PLAYER_DATA.payload.orders || {};
+                expectedPlayerCount = PLAYER_DATA.payload.count;
+                onChunk(decodeColumns(PLAYER_DATA.payload));
+                return;
+            }
+            const base = PLAYER_DATA.manifest.replace(/[^/]*$/, '');
+            const manifest = await (await fetch(PLAYER_DATA.manifest)).json();
+            playerOrders = manifest.orders || {};
+            expectedPlayerCount = manifest.count;
+            await Promise.all(manifest.chunks.map(async chunk => {
+                const columns = await (await fetch(base + chunk.file)).json();
+                onChunk(decodeColumns({ ...manifest, ...columns }));
+            }));
+        }
+
+        // Display strings, computed once per player at load
+        function prepareRow(p) {
+            p.view = {
+                xDiffClass: p.xdiff > 0 ? 'xdiff-positive' : (p.xdiff < 0 ? 'xdiff-negative' : ''),
+                rowClass: `player-row position-${p.position.toLowerCase()}`,
+                nameHtml: generatePlayerIcons(p) + p.name,
+                cells: [
+                    null, null, String(p.draft_score), p.team, p.position, `£${p.price.toFixed(1)}${p.price_trend > 0 ? ' ▲' : p.price_trend < 0 ? ' ▼' : ''}`,
+                    String(p.total_points), p.ppg.toFixed(1), `${p.selected_percent.toFixed(1)}%`,
+                    String(p.goals_assists), p.xg_xa.toFixed(2), String(p.minutes), p.xdiff.toFixed(2),
+                    String(p.bps), p.ict_index.toFixed(1), String(p.bonus), String(p.clean_sheets),
+                    // Tracker columns, hidden unless the generator ran with --momentum
+                    'price_trend' in p ? String(p.net_transfers) : '', 'price_trend' in p ? `${p.price_progress.toFixed(1)}%` : '',
+                ],
+            };
+        }
+
+        function addPlayers(players) {
+            players.forEach(prepareRow);
+            players.forEach(p => playersById.set(p.id, p));
+            allPlayers = allPlayers.concat(players);
+            if (players.length && 'similar' in players[0]) document.getElementById('similarBtn').style.display = '';
+            if (players.length && 'price_trend' in players[0]) {
+                document.querySelectorAll('.momentum-filter').forEach(b => b.style.display = '');
+                document.getElementById('playersTable').classList.add('with-momentum');
+            }
+            sortOrders = {};
+            buildFilterIndex();
+            populateTeamFilter();
+            if (draft.active) rebuildDraft();
+            processChange();
+        }
+
+        function populateTeamFilter() {
             const teamFilter = document.getElementById('teamFilter');
+            const selected = teamFilter.value;
+            teamFilter.length = 1;
             const uniqueTeams = [...new Set(allPlayers.map(p => p.team))].sort();
             uniqueTeams.forEach(team => teamFilter.add(new Option(team, team)));
-        }}
+            teamFilter.value = selected;
+        }
         
-        function renderTable() {{
-            const tbody = document.getElementById('playersTableBody');
+        function renderTable() {
             const showCount = document.getElementById('showEntries').value;
-            const dataToRender = showCount === 'all' ? displayedData : displayedData.slice(0, parseInt(showCount));
-            tbody.innerHTML = '';
-            
-            dataToRender.forEach((p, index) => {{
-                const row = tbody.insertRow();
-                row.className = `position-${{p.position.toLowerCase()}}`;
-                const xDiff = calculateXDiff(p);
-                let xDiffClass = '';
-                if (parseFloat(xDiff) > 0) xDiffClass = 'xdiff-positive';
-                else if (parseFloat(xDiff) < 0) xDiffClass = 'xdiff-negative';
-
-                row.innerHTML = `
-                    <td>${{index + 1}}</td>
-                    <td class="name-cell">${{generatePlayerIcons(p)}}${{p.name}}</td>
-                    <td><b>${{p.draft_score}}</b></td>
-                    <td>${{p.team}}</td>
-                    <td><b>${{p.position}}</b></td>
-                    <td><b>£${{p.price.toFixed(1)}}</b></td>
-                    <td><b>${{p.total_points}}</b></td>
-                    <td>${{p.ppg.toFixed(1)}}</td>
-                    <td>${{p.selected_percent.toFixed(1)}}%</td>
-                    <td><b>${{p.goals + p.assists}}</b></td>
-                    <td><b>${{(p.xg + p.xa).toFixed(2)}}</b></td>
-                    <td>${{p.minutes}}</td>
-                    <td class="${{xDiffClass}}"><b>${{xDiff}}</b></td>
-                    <td>${{p.bps}}</td>
-                    <td>${{p.ict_index.toFixed(1)}}</td>
-                    <td>${{p.bonus}}</td>
-                    <td>${{p.clean_sheets}}</td>
-                    <td class="verbal-insights-cell">${{generateVerbalInsights(p)}}</td>
-                    <td><input type="checkbox" class="compare-checkbox" data-player-id="${{p.id}}"></td>
-                `;
-            }});
-        }}
-        
-        function processChange() {{
-            const searchName = document.getElementById('searchName').value.toLowerCase();
+            rowsToRender = showCount === 'all' ? displayedData : displayedData.slice(0, parseInt(showCount));
+            renderedRange = [-1, -1];
+            document.getElementById('tableScroll').scrollTop = 0;
+            renderWindow();
+        }
+
+        function createPooledRow() {
+            const row = document.createElement('tr');
+            for (let c = 0; c < COLUMN_COUNT; c++) {
+                const cell = row.insertCell();
+                if (BOLD_COLUMNS.has(c)) cell.className = 'bold-cell';
+            }
+            row.cells[1].className = 'name-cell';
+            row.cells[17].className = row.cells[18].className = 'momentum-col';
+            row.cells[19].className = 'verbal-insights-cell';
+            row.cells[20].innerHTML = '<input type="checkbox" class="compare-checkbox">';
+            return row;
+        }
+
+        function fillRow(row, p, index) {
+            const view = p.view;
+            const cells = row.cells;
+            const draftState = draft.active && draftStatus.get(p.id);
+            row.className = draftState ? `${view.rowClass} draft-${draftState}` : view.rowClass;
+            row.dataset.playerId = p.id;
+            cells[0].textContent = index + 1;
+            cells[1].innerHTML = view.nameHtml;
+            for (let c = 2; c < 19; c++) cells[c].textContent = view.cells[c];
+            cells[12].className = `bold-cell ${view.xDiffClass}`;
+            cells[19].textContent = p.insights;
+            cells[19].title = p.insights;
+            const checkbox = cells[20].firstChild;
+            checkbox.dataset.playerId = p.id;
+            checkbox.checked = selectedForComparison.has(p.id);
+        }
+
+        function renderWindow() {
+            const container = document.getElementById('tableScroll');
+            const tbody = document.getElementById('playersTableBody');
+            const total = rowsToRender.length;
+            const headerHeight = document.querySelector('#playersTable thead').offsetHeight;
+            const windowSize = Math.ceil(container.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN;
+            const first = Math.max(0, Math.min(total - windowSize, Math.floor((container.scrollTop - headerHeight) / ROW_HEIGHT) - OVERSCAN));
+            const last = Math.min(total, first + windowSize);
+            if (first === renderedRange[0] && last === renderedRange[1]) return;
+            renderedRange = [first, last];
+
+            if (!tbody.firstChild || !tbody.firstChild.classList.contains('spacer-row')) {
+                tbody.innerHTML = `<tr class="spacer-row"><td colspan="${COLUMN_COUNT}"></td></tr><tr class="spacer-row"><td colspan="${COLUMN_COUNT}"></td></tr>`;
+                rowPool = [];
+            }
+            const topSpacer = tbody.firstChild;
+            const bottomSpacer = tbody.lastChild;
+            topSpacer.firstChild.style.height = `${first * ROW_HEIGHT}px`;
+            bottomSpacer.firstChild.style.height = `${(total - last) * ROW_HEIGHT}px`;
+
+            while (rowPool.length < last - first) {
+                const row = createPooledRow();
+                tbody.insertBefore(row, bottomSpacer);
+                rowPool.push(row);
+            }
+            rowPool.forEach((row, i) => {
+                const index = first + i;
+                if (index < last) {
+                    row.style.display = '';
+                    fillRow(row, rowsToRender[index], index);
+                } else {
+                    row.style.display = 'none';
+                }
+            });
+        }
+
+        function scheduleRenderWindow() {
+            if (scrollScheduled) return;
+            scrollScheduled = true;
+            requestAnimationFrame(() => {
+                scrollScheduled = false;
+                renderWindow();
+            });
+        }
+
+        // --- Filtering engine ---
+        // Names are normalized once into an index; position, team, xDiff sign and quick
+        // filters are bitsets over allPlayers that get intersected instead of scanned.
+        // A query that extends the previous one only re-checks the previous result.
+        const FILTER_DEBOUNCE_MS = 120;
+        const LETTER_FOLDS = DERIVED.letterFolds;
+        const FOLDED_LETTERS = new RegExp(`[${Object.keys(LETTER_FOLDS).join('')}]`, 'g');
+        let filterIndex = null;
+        let lastFilter = null;
+        let processTimer = null;
+
+        // Case, Latin diacritics, Hebrew niqqud and final letter forms are ignored
+        function normalizeText(text) {
+            return text.normalize('NFD').replace(/[\\u0300-\\u036f\\u0591-\\u05c7]/g, '').toLowerCase()
+                .replace(FOLDED_LETTERS, ch => LETTER_FOLDS[ch]);
+        }
+
+        const newBitset = () => new Uint32Array((allPlayers.length + 31) >>> 5);
+        const setBit = (bits, i) => { bits[i >>> 5] |= 1 << (i & 31); };
+
+        function bitsetFor(groups, key) {
+            if (!groups.has(key)) groups.set(key, newBitset());
+            return groups.get(key);
+        }
+
+        function buildFilterIndex() {
+            const all = newBitset();
+            filterIndex = { names: new Array(allPlayers.length), all, positions: new Map(), teams: new Map(), xdiff: new Map(), quick: new Map() };
+            allPlayers.forEach((p, i) => {
+                filterIndex.names[i] = normalizeText(p.name);
+                setBit(all, i);
+                setBit(bitsetFor(filterIndex.positions, p.position), i);
+                setBit(bitsetFor(filterIndex.teams, p.team), i);
+                if (p.xdiff > 0) setBit(bitsetFor(filterIndex.xdiff, 'positive'), i);
+                if (p.xdiff < 0) setBit(bitsetFor(filterIndex.xdiff, 'negative'), i);
+                for (const [name, bit] of Object.entries(DERIVED.quickFilters)) {
+                    if (p.quick_filters & bit) setBit(bitsetFor(filterIndex.quick, name), i);
+                }
+            });
+            lastFilter = null;
+        }
+
+        function intersectInto(bits, groups, key) {
+            const other = groups.get(key);
+            if (!other) bits.fill(0);
+            else for (let w = 0; w < bits.length; w++) bits[w] &= other[w];
+        }
+
+        function scheduleProcessChange() {
+            clearTimeout(processTimer);
+            processTimer = setTimeout(processChange, FILTER_DEBOUNCE_MS);
+        }
+
+        function processChange() {
+            clearTimeout(processTimer);
+            if (!filterIndex) buildFilterIndex();
+            const query = normalizeText(document.getElementById('searchName').value);
             const position = document.getElementById('positionFilter').value;
             const team = document.getElementById('teamFilter').value;
             const priceRange = document.getElementById('priceRange').value;
             const minPoints = parseInt(document.getElementById('minPoints').value, 10) || 0;
             const minSelected = parseFloat(document.getElementById('minSelected').value) || 0;
             const xDiffFilter = document.getElementById('xDiffFilter').value;
-            
+
             let [minPrice, maxPrice] = [0, 99];
-            if (priceRange && priceRange.includes('-')) {{
+            if (priceRange && priceRange.includes('-')) {
                 [minPrice, maxPrice] = priceRange.split('-').map(p => parseFloat(p.trim())).filter(v => !isNaN(v));
                 if (typeof maxPrice === 'undefined') maxPrice = 99;
-            }}
-            
-            let filtered = allPlayers.filter(p => {{
-                const xDiff = parseFloat(calculateXDiff(p));
-                const xDiffMatch = !xDiffFilter || (xDiffFilter === 'positive' && xDiff > 0) || (xDiffFilter === 'negative' && xDiff < 0);
-                return p.name.toLowerCase().includes(searchName) && (!position || p.position === position) && (!team || p.team === team) && p.price >= (minPrice || 0) && p.price <= (maxPrice || 99) && p.total_points >= minPoints && p.selected_percent >= minSelected && xDiffMatch;
-            }});
-            
-            if (activeQuickFilterName && quickFilterFunctions[activeQuickFilterName]) {{
-                filtered = filtered.filter(quickFilterFunctions[activeQuickFilterName]);
-            }}
+            }
+            minPrice = minPrice || 0;
+            maxPrice = maxPrice || 99;
 
-            sortAndDisplay(filtered);
-        }}
+            const names = filterIndex.names;
+            const key = [position, team, minPrice, maxPrice, minPoints, minSelected, xDiffFilter, activeQuickFilterName, allPlayers.length].join('|');
+            let result;
+            if (lastFilter && lastFilter.key === key && query.includes(lastFilter.query)) {
+                result = lastFilter.result.filter(i => names[i].includes(query));
+            } else {
+                const bits = filterIndex.all.slice();
+                if (position) intersectInto(bits, filterIndex.positions, position);
+                if (team) intersectInto(bits, filterIndex.teams, team);
+                if (xDiffFilter) intersectInto(bits, filterIndex.xdiff, xDiffFilter);
+                if (activeQuickFilterName) intersectInto(bits, filterIndex.quick, activeQuickFilterName);
+                result = [];
+                for (let w = 0; w < bits.length; w++) {
+                    let word = bits[w];
+                    while (word) {
+                        const low = word & -word;
+                        const i = (w << 5) + 31 - Math.clz32(low);
+                        word ^= low;
+                        const p = allPlayers[i];
+                        if (p.price >= minPrice && p.price <= maxPrice && p.total_points >= minPoints && p.selected_percent >= minSelected && names[i].includes(query)) result.push(i);
+                    }
+                }
+            }
+            lastFilter = { key, query, result };
 
-        function sortAndDisplay(data) {{
-            const fields = ['rank', 'name', 'draft_score', 'team', 'position', 'price', 'total_points', 'ppg', 'selected_percent', 'goals_assists', 'xg_xa', 'minutes', 'xDiff', 'bps', 'ict_index', 'bonus', 'clean_sheets', 'verbal_insights'];
-            const sortField = fields[sortColumn];
-            
-            data.sort((a, b) => {{
-                let valA, valB;
-
-                if (sortField === 'goals_assists') {{ valA = a.goals + a.assists; valB = b.goals + b.assists; }}
-                else if (sortField === 'xg_xa') {{ valA = a.xg + a.xa; valB = b.xg + b.xa; }}
-                else if (sortField === 'xDiff') {{ valA = parseFloat(calculateXDiff(a)); valB = parseFloat(calculateXDiff(b)); }}
-                else if (sortField === 'verbal_insights') {{ valA = generateVerbalInsights(a); valB = generateVerbalInsights(b); }}
-                else {{ valA = a[sortField]; valB = b[sortField]; }}
-
-                if (typeof valA === 'string') {{
-                    // For string comparison, we'll let the user decide on ascending/descending later if needed
-                    return valA.localeCompare(valB, 'he');
-                }}
-                
-                // For numbers, always sort descending
-                return (valB || 0) - (valA || 0);
-            }});
-
-            displayedData = data;
+            sortAndDisplay(result.map(i => allPlayers[i]));
+        }
+
+        // --- Sorting: walk a per-column permutation of allPlayers instead of re-sorting ---
+        const SORT_FIELDS = ['rank', 'name', 'draft_score', 'team', 'position', 'price', 'total_points', 'ppg', 'selected_percent', 'goals_assists', 'xg_xa', 'minutes', 'xdiff', 'bps', 'ict_index', 'bonus', 'clean_sheets', 'net_transfers', 'price_progress', 'insights'];
+        let sortOrders = {};
+        let filterStamp = 0;
+
+        function getSortOrder(field) {
+            if (!sortOrders[field]) {
+                if (playerOrders[field] && allPlayers.length === expectedPlayerCount) {
+                    // Precomputed by the generator (numeric columns, descending)
+                    const byId = new Map(allPlayers.map(p => [p.id, p]));
+                    sortOrders[field] = playerOrders[field].map(id => byId.get(id));
+                } else if (typeof (allPlayers[0] || {})[field] === 'string') {
+                    sortOrders[field] = allPlayers.slice().sort((a, b) => a[field].localeCompare(b[field], 'he'));
+                } else {
+                    sortOrders[field] = allPlayers.slice().sort((a, b) => (b[field] || 0) - (a[field] || 0));
+                }
+            }
+            return sortOrders[field];
+        }
+
+        function sortAndDisplay(data) {
+            const sortField = SORT_FIELDS[sortColumn];
+            if (sortField === 'rank') {
+                displayedData = data;
+            } else if (data.length === allPlayers.length) {
+                displayedData = getSortOrder(sortField).slice();
+            } else {
+                const stamp = ++filterStamp;
+                data.forEach(p => { p.filterStamp = stamp; });
+                displayedData = getSortOrder(sortField).filter(p => p.filterStamp === stamp);
+            }
             renderTable();
-        }}
+        }
 
-        function sortTable(columnIndex) {{
+        function sortTable(columnIndex) {
             sortColumn = columnIndex;
             processChange();
             
-            document.querySelectorAll('th').forEach((th, i) => {{
+            document.querySelectorAll('th').forEach((th, i) => {
                 th.classList.remove('sorted');
                 const indicator = th.querySelector('.sort-indicator');
+                if (!indicator) return;
                 indicator.textContent = '';
-                if (i === columnIndex) {{
+                if (i === columnIndex) {
                     th.classList.add('sorted');
                     indicator.textContent = '▼'; 
-                }}
-            }});
-        }}
+                }
+            });
+        }
 
-        function setActiveButton(button) {{
+        function setActiveButton(button) {
             document.querySelectorAll('.control-button').forEach(btn => btn.classList.remove('active'));
             button.classList.add('active');
-        }}
+        }
 
-        function showAllPlayers(btn) {{
+        function showAllPlayers(btn) {
             setActiveButton(btn);
             activeQuickFilterName = null;
-            document.querySelectorAll('.filters input, .filters select').forEach(el => {{
+            document.querySelectorAll('.filters input, .filters select').forEach(el => {
                 if (el.id !== 'showEntries' && el.id !== 'minSelected') el.value = '';
-            }});
+            });
             document.getElementById('minSelected').value = '0.0001';
             processChange();
-        }}
+        }
         
-        function quickFilter(btn, filterName) {{
+        function quickFilter(btn, filterName) {
             const wasActive = btn.classList.contains('active');
             
             document.querySelectorAll('.control-button').forEach(b => b.classList.remove('active'));
 
-            if (wasActive) {{
+            if (wasActive) {
                 activeQuickFilterName = null;
                 document.querySelector('.control-button[onclick^="showAllPlayers"]').classList.add('active');
-            }} else {{
+            } else {
                 activeQuickFilterName = filterName;
                 btn.classList.add('active');
-            }}
+            }
             processChange();
-        }}
+        }
 
-        function exportToCsv() {{
+        function exportToCsv() {
             const headers = ['Rank','Player','Draft Score','Team','Position','Price','Points','PPG','Selected %','G+A','xG+xA','Minutes','xDiff','BPS','ICT','Bonus','Clean Sheets','Insights'];
+            const withMomentum = displayedData.length > 0 && 'price_trend' in displayedData[0];
+            if (withMomentum) headers.push('Net Transfers', 'Price Progress %');
             let csvContent = headers.join(',') + '\\n';
-            displayedData.forEach((p, i) => {{
-                const row = [i + 1, p.name.replace(/,/g, ''), p.draft_score, p.team, p.position, p.price, p.total_points, p.ppg, p.selected_percent, p.goals + p.assists, (p.xg + p.xa).toFixed(2), p.minutes, calculateXDiff(p), p.bps, p.ict_index, p.bonus, p.clean_sheets, `"${{generateVerbalInsights(p)}}"`];
+            displayedData.forEach((p, i) => {
+                const row = [i + 1, p.name.replace(/,/g, ''), p.draft_score, p.team, p.position, p.price, p.total_points, p.ppg, p.selected_percent, p.goals_assists, p.xg_xa.toFixed(2), p.minutes, p.xdiff.toFixed(2), p.bps, p.ict_index, p.bonus, p.clean_sheets, `"${p.insights}"`];
+                if (withMomentum) row.push(p.net_transfers, p.price_progress);
                 csvContent += row.join(',') + '\\n';
-            }});
-            const blob = new Blob([`\uFEFF${{csvContent}}`], {{ type: 'text/csv;charset=utf-8;' }});
+            });
+            const blob = new Blob([`\uFEFF${csvContent}`], { type: 'text/csv;charset=utf-8;' });
             const link = document.createElement("a");
             link.setAttribute("href", URL.createObjectURL(blob));
             link.setAttribute("download", "fpl_draft_data.csv");
             link.click();
-        }}
+        }
         
-        function compareSelectedPlayers() {{
-            const selectedIds = [...document.querySelectorAll('.compare-checkbox:checked')].map(cb => parseInt(cb.dataset.playerId));
-            if (selectedIds.length < 2) {{
+        function compareSelectedPlayers() {
+            if (selectedForComparison.size < 2) {
                 alert('יש לבחור לפחות שני שחקנים להשוואה.');
                 return;
-            }}
-            const playersToCompare = allPlayers.filter(p => selectedIds.includes(p.id));
+            }
+            const playersToCompare = [...selectedForComparison].map(id => playersById.get(id)).filter(Boolean);
 
             const modal = document.getElementById('compareModal');
             const table = document.getElementById('compareTable');
             table.innerHTML = ''; // Clear previous comparison
 
-            if (playersToCompare.length > 0) {{
+            if (playersToCompare.length > 0) {
                 const headers = ['Metric', ...playersToCompare.map(p => p.name)];
                 let headerHtml = '<thead><tr>';
-                headers.forEach(h => headerHtml += `<th>${{h}}</th>`);
+                headers.forEach(h => headerHtml += `<th>${h}</th>`);
                 headerHtml += '</tr></thead>';
                 table.innerHTML = headerHtml;
 
                 const metrics = [
-                    {{key: 'position', label: 'עמדה', type: 'string'}},
-                    {{key: 'draft_score', label: 'ציון דראפט', type: 'number'}},
-                    {{key: 'price', label: 'מחיר', type: 'number', reverse: true}},
-                    {{key: 'total_points', label: 'סה"כ נקודות', type: 'number'}},
-                    {{key: 'ppg', label: 'נק/משחק', type: 'number'}},
-                    {{key: 'goals_assists', label: 'שערים+בישולים', type: 'number'}},
-                    {{key: 'xg_xa', label: 'xG+xA', type: 'number'}},
-                    {{key: 'xDiff', label: 'xDiff', type: 'number'}},
-                    {{key: 'clean_sheets', label: 'שער נקי', type: 'number'}},
-                    {{key: 'bps', label: 'BPS', type: 'number'}},
-                    {{key: 'ict_index', label: 'ICT', type: 'number'}},
-                    {{key: 'penalty_taker', label: 'בועט פנדלים', type: 'boolean'}},
-                    {{key: 'corners_taker', label: 'מרים קרנות', type: 'boolean'}},
-                    {{key: 'minutes', label: 'דקות', type: 'number'}},
+                    {key: 'position', label: 'עמדה', type: 'string'},
+                    {key: 'draft_score', label: 'ציון דראפט', type: 'number'},
+                    {key: 'price', label: 'מחיר', type: 'number', reverse: true},
+                    {key: 'total_points', label: 'סה"כ נקודות', type: 'number'},
+                    {key: 'ppg', label: 'נק/משחק', type: 'number'},
+                    {key: 'goals_assists', label: 'שערים+בישולים', type: 'number'},
+                    {key: 'xg_xa', label: 'xG+xA', type: 'number'},
+                    {key: 'xdiff', label: 'xDiff', type: 'number'},
+                    {key: 'clean_sheets', label: 'שער נקי', type: 'number'},
+                    {key: 'bps', label: 'BPS', type: 'number'},
+                    {key: 'ict_index', label: 'ICT', type: 'number'},
+                    {key: 'penalty_taker', label: 'בועט פנדלים', type: 'boolean'},
+                    {key: 'corners_taker', label: 'מרים קרנות', type: 'boolean'},
+                    {key: 'minutes', label: 'דקות', type: 'number'},
                 ];
+                // Tracker columns (generator --momentum)
+                if ('price_trend' in playersToCompare[0]) metrics.push(
+                    {key: 'net_transfers', label: 'העברות נטו במחזור', type: 'number'},
+                    {key: 'transfer_momentum', label: 'מומנטום העברות', type: 'number'},
+                    {key: 'ownership_change', label: 'שינוי בעלות (%)', type: 'number'},
+                    {key: 'price_progress', label: 'התקדמות לשינוי מחיר (%)', type: 'number'},
+                );
 
                 let bodyHtml = '<tbody>';
 
-                // Pre-calculate combined values
-                playersToCompare.forEach(p => {{
-                    p.goals_assists = p.goals + p.assists;
-                    p.xg_xa = p.xg + p.xa;
-                    p.xDiff = parseFloat(calculateXDiff(p));
-                }});
-
-                metrics.forEach(metric => {{
-                    bodyHtml += `<tr><td><strong>${{metric.label}}</strong></td>`;
-
-                    if (metric.type === 'string') {{
-                        playersToCompare.forEach(p => {{
-                            bodyHtml += `<td>${{p[metric.key]}}</td>`;
-                        }});
-                    }} else if (metric.type === 'boolean') {{
-                         playersToCompare.forEach(p => {{
+                metrics.forEach(metric => {
+                    bodyHtml += `<tr><td><strong>${metric.label}</strong></td>`;
+
+                    if (metric.type === 'string') {
+                        playersToCompare.forEach(p => {
+                            bodyHtml += `<td>${p[metric.key]}</td>`;
+                        });
+                    } else if (metric.type === 'boolean') {
+                         playersToCompare.forEach(p => {
                             const displayValue = p[metric.key] ? 'כן' : 'לא';
                             const colorClass = p[metric.key] ? 'value-best' : '';
-                            bodyHtml += `<td class="${{colorClass}}">${{displayValue}}</td>`;
-                        }});
-                    }} else {{
+                            bodyHtml += `<td class="${colorClass}">${displayValue}</td>`;
+                        });
+                    } else {
                         const metricValues = playersToCompare.map(p => p[metric.key]).filter(v => typeof v === 'number');
                         const min = Math.min(...metricValues);
                         const max = Math.max(...metricValues);
 
-                        playersToCompare.forEach(p => {{
+                        playersToCompare.forEach(p => {
                             const value = p[metric.key];
                             let displayValue = value;
-                            if (typeof value === 'number' && !Number.isInteger(value)) {{
+                            if (typeof value === 'number' && !Number.isInteger(value)) {
                                displayValue = value.toFixed(2);
-                            }}
+                            }
                             
                             const colorClass = getColorClass(value, min, max, !!metric.reverse);
-                            bodyHtml += `<td class="${{colorClass}}">${{displayValue}}</td>`;
-                        }});
-                    }}
+                            bodyHtml += `<td class="${colorClass}">${displayValue}</td>`;
+                        });
+                    }
                     bodyHtml += '</tr>';
-                }});
+                });
                 bodyHtml += '</tbody>';
                 table.innerHTML += bodyHtml;
 
                 modal.style.display = 'block';
-            }}
-        }}
+            }
+        }
 
-        function getColorClass(value, min, max, reverse = false) {{
+        // Precomputed like-for-like replacements (generator --similar)
+        function showReplacements() {
+            const players = [...selectedForComparison].map(id => playersById.get(id)).filter(Boolean);
+            if (!players.length) {
+                alert('יש לבחור לפחות שחקן אחד.');
+                return;
+            }
+            let html = '<thead><tr><th>שחקן</th><th colspan="' + Math.max(...players.map(p => p.similar.length), 1) + '">תחליפים דומים וזולים יותר</th></tr></thead><tbody>';
+            players.forEach(p => {
+                html += `<tr><td><strong>${p.name}</strong><br>${p.position} · £${p.price.toFixed(1)} · ${p.draft_score}</td>`;
+                html += p.similar.map(id => playersById.get(id)).filter(Boolean)
+                    .map(r => `<td>${r.name}<br>${r.team} · £${r.price.toFixed(1)} · ${r.draft_score}</td>`).join('') || '<td>אין תחליף זול יותר</td>';
+                html += '</tr>';
+            });
+            document.getElementById('compareTable').innerHTML = html + '</tbody>';
+            document.getElementById('compareModal').style.display = 'block';
+        }
+
+        function getColorClass(value, min, max, reverse = false) {
             if (typeof value !== 'number' || min === max) return '';
             
             const range = max - min;
@@ -554,26 +790,457 @@ def generate_html(players):
             if (effectiveNormalized > 0.35) return 'value-mid';
             if (effectiveNormalized > 0.05) return 'value-bad';
             return 'value-worst';
-        }}
+        }
 
-        function closeModal() {{
+        function closeModal() {
             document.getElementById('compareModal').style.display = 'none';
-        }}
+        }
 
-        document.addEventListener('DOMContentLoaded', () => {{
-            populateTeamFilter();
+        // --- Draft mode ---
+        // One indexed max-heap of available players per position, keyed by the
+        // chosen column. A pick removes the player from its heap and an undo
+        // pushes it back, both O(log n); "best available" reads the top of each
+        // heap without sorting the pool. Picks are saved to localStorage and
+        // replayed (one O(n) heapify) when the page loads again.
+        const DRAFT_STORAGE_KEY = 'fplDraftState';
+        const DRAFT_TOP = 5;
+        const DRAFT_BEST = 10;
+        const DRAFT_NEED_BONUS = 0.25;
+        const DRAFT_KEY_LABELS = { draft_score: 'ציון דראפט', proj_mean: 'תחזית נקודות', fixture_score: 'ציון לוח משחקים', form_score: 'ציון כושר' };
+        let draft = { active: false, key: 'draft_score', picks: [] };
+        let draftStatus = new Map();
+        let draftHeaps = {};
+
+        const draftValue = p => p[draft.key] || 0;
+        const draftBefore = (a, b) => draftValue(a) > draftValue(b) || (draftValue(a) === draftValue(b) && a.id < b.id);
+
+        function heapSwap(heap, i, j) {
+            [heap[i], heap[j]] = [heap[j], heap[i]];
+            heap[i].draftSlot = i;
+            heap[j].draftSlot = j;
+        }
+
+        function heapUp(heap, i) {
+            while (i > 0) {
+                const parent = (i - 1) >> 1;
+                if (!draftBefore(heap[i], heap[parent])) break;
+                heapSwap(heap, i, parent);
+                i = parent;
+            }
+        }
+
+        function heapDown(heap, i) {
+            for (;;) {
+                let best = i;
+                for (const child of [2 * i + 1, 2 * i + 2]) {
+                    if (child < heap.length && draftBefore(heap[child], heap[best])) best = child;
+                }
+                if (best === i) return;
+                heapSwap(heap, i, best);
+                i = best;
+            }
+        }
+
+        function heapPush(heap, p) {
+            p.draftSlot = heap.length;
+            heap.push(p);
+            heapUp(heap, p.draftSlot);
+        }
+
+        function heapRemove(heap, p) {
+            const i = p.draftSlot;
+            const last = heap.pop();
+            p.draftSlot = -1;
+            if (last === p) return;
+            heap[i] = last;
+            last.draftSlot = i;
+            heapUp(heap, i);
+            heapDown(heap, last.draftSlot);
+        }
+
+        // Best k entries without popping: expand a small frontier from the root
+        function heapTop(heap, k) {
+            const top = [];
+            const frontier = heap.length ? [0] : [];
+            while (top.length < k && frontier.length) {
+                let best = 0;
+                for (let f = 1; f < frontier.length; f++) {
+                    if (draftBefore(heap[frontier[f]], heap[frontier[best]])) best = f;
+                }
+                const i = frontier.splice(best, 1)[0];
+                top.push(heap[i]);
+                for (const child of [2 * i + 1, 2 * i + 2]) if (child < heap.length) frontier.push(child);
+            }
+            return top;
+        }
+
+        function saveDraft() {
+            try {
+                localStorage.setItem(DRAFT_STORAGE_KEY, JSON.stringify(draft));
+            } catch (e) { /* storage disabled or full: the draft still works for this session */ }
+        }
+
+        function loadDraft() {
+            try {
+                const saved = JSON.parse(localStorage.getItem(DRAFT_STORAGE_KEY));
+                if (saved && Array.isArray(saved.picks)) draft = { active: !!saved.active, key: saved.key || 'draft_score', picks: saved.picks };
+            } catch (e) { /* unreadable state: start a fresh draft */ }
+        }
+
+        function rebuildDraft() {
+            const keys = DERIVED.draftKeys.filter(key => allPlayers.length && key in allPlayers[0]);
+            if (keys.length && !keys.includes(draft.key)) draft.key = keys[0];
+            const keySelect = document.getElementById('draftKey');
+            keySelect.innerHTML = keys.map(key => `<option value="${key}">${DRAFT_KEY_LABELS[key] || key}</option>`).join('');
+            keySelect.value = draft.key;
+            draftStatus = new Map();
+            draft.picks.forEach(pick => { if (playersById.has(pick.id)) draftStatus.set(pick.id, pick.mine ? 'mine' : 'taken'); });
+            draftHeaps = {};
+            Object.keys(DERIVED.squadQuotas).forEach(position => { draftHeaps[position] = []; });
+            allPlayers.forEach(p => {
+                p.draftSlot = -1;
+                const heap = draftHeaps[p.position];
+                if (heap && !draftStatus.has(p.id)) {
+                    p.draftSlot = heap.length;
+                    heap.push(p);
+                }
+            });
+            Object.values(draftHeaps).forEach(heap => { for (let i = (heap.length >> 1) - 1; i >= 0; i--) heapDown(heap, i); });
+            renderDraftPanel();
+        }
+
+        function myDraftPlayers() {
+            return draft.picks.filter(pick => draftStatus.get(pick.id) === 'mine').map(pick => playersById.get(pick.id));
+        }
+
+        function renderDraftPanel() {
+            const mine = myDraftPlayers();
+            const quotas = DERIVED.squadQuotas;
+            const needs = { ...quotas };
+            mine.forEach(p => { if (p.position in needs) needs[p.position] -= 1; });
+            const item = (p, value) => `<li><span>${p.name} <small>${p.team} · ${value}</small></span>`
+                + `<span><button onclick="markDraftPick(${p.id}, true)" title="לקבוצה שלי">✔</button> <button onclick="markDraftPick(${p.id}, false)" title="נבחר ע&quot;י אחרים">✖</button></span></li>`;
+            const round = value => Number.isInteger(value) ? value : value.toFixed(1);
+
+            let candidates = [];
+            let positionsHtml = '';
+            for (const [position, heap] of Object.entries(draftHeaps)) {
+                const top = heapTop(heap, Math.max(DRAFT_TOP, DRAFT_BEST));
+                const remaining = Math.max(needs[position], 0);
+                const weight = remaining ? 1 + DRAFT_NEED_BONUS * remaining / quotas[position] : 0;
+                top.forEach(p => candidates.push({ p, score: draftValue(p) * weight, weight }));
+                positionsHtml += `<div><h3>${position} (${quotas[position] - remaining}/${quotas[position]})</h3><ol class="draft-list">`
+                    + top.slice(0, DRAFT_TOP).map(p => item(p, round(draftValue(p)))).join('') + '</ol></div>';
+            }
+            candidates = candidates.filter(c => c.weight > 0).sort((a, b) => b.score - a.score || a.p.id - b.p.id).slice(0, DRAFT_BEST);
+            document.getElementById('draftBest').innerHTML = candidates.map(c => item(c.p, round(c.score))).join('');
+            document.getElementById('draftPositions').innerHTML = positionsHtml;
+            document.getElementById('draftMine').innerHTML = mine.map(p => `<li><span>${p.position} ${p.name}</span><button onclick="releaseDraftPick(${p.id})">↩</button></li>`).join('');
+            document.getElementById('draftStatus').textContent = `${draft.picks.length} נבחרו`;
+        }
+
+        function refreshDraftViews() {
+            saveDraft();
+            renderDraftPanel();
+            renderedRange = [-1, -1];
+            renderWindow();
+        }
+
+        function markDraftPick(id, mine) {
+            const p = playersById.get(id);
+            if (!p || draftStatus.has(id)) return;
+            draft.picks.push({ id, mine });
+            draftStatus.set(id, mine ? 'mine' : 'taken');
+            if (p.draftSlot >= 0) heapRemove(draftHeaps[p.position], p);
+            refreshDraftViews();
+        }
+
+        function releaseDraftPick(id) {
+            const p = playersById.get(id);
+            if (!p || !draftStatus.has(id)) return;
+            draft.picks = draft.picks.filter(pick => pick.id !== id);
+            draftStatus.delete(id);
+            if (draftHeaps[p.position]) heapPush(draftHeaps[p.position], p);
+            refreshDraftViews();
+        }
+
+        function undoDraftPick() {
+            if (draft.picks.length) releaseDraftPick(draft.picks[draft.picks.length - 1].id);
+        }
+
+        function resetDraft() {
+            if (draft.picks.length && !confirm('לאפס את כל הבחירות בדראפט?')) return;
+            draft.picks = [];
+            rebuildDraft();
+            refreshDraftViews();
+        }
+
+        function setDraftKey(key) {
+            draft.key = key;
+            rebuildDraft();
+            saveDraft();
+        }
+
+        function toggleDraftMode() {
+            draft.active = !draft.active;
+            document.getElementById('draftBtn').classList.toggle('draft-on', draft.active);
+            document.getElementById('draftPanel').classList.toggle('active', draft.active);
+            if (draft.active) rebuildDraft();
+            saveDraft();
+            renderedRange = [-1, -1];
+            renderWindow();
+        }
+
+        document.addEventListener('DOMContentLoaded', () => {
+            document.getElementById('tableScroll').addEventListener('scroll', scheduleRenderWindow, { passive: true });
+            window.addEventListener('resize', scheduleRenderWindow);
+            document.getElementById('playersTableBody').addEventListener('change', e => {
+                if (!e.target.classList.contains('compare-checkbox')) return;
+                const id = parseInt(e.target.dataset.playerId);
+                if (e.target.checked) selectedForComparison.add(id);
+                else selectedForComparison.delete(id);
+            });
+            document.getElementById('playersTableBody').addEventListener('click', e => {
+                if (!draft.active || e.target.classList.contains('compare-checkbox')) return;
+                const row = e.target.closest('.player-row');
+                if (!row) return;
+                const id = parseInt(row.dataset.playerId);
+                if (draftStatus.has(id)) releaseDraftPick(id);
+                else markDraftPick(id, e.shiftKey || e.ctrlKey || e.metaKey);
+            });
+            loadDraft();
+            if (draft.active) {
+                draft.active = false;
+                toggleDraftMode();
+            }
             sortTable(2); // Initial sort by draft score, descending
-        }});
+            loadPlayers(addPlayers).catch(err => {
+                console.error(err);
+                document.getElementById('playersTableBody').innerHTML = `<tr><td colspan="${COLUMN_COUNT}">טעינת נתוני השחקנים נכשלה</td></tr>`;
+            });
+        });
     </script>
 </body>
 </html>
     """
-    return html_template.format(players_json=players_json)
+    return html_template.replace('__DERIVED__', derived_constants).replace('__PLAYER_DATA__', player_data)
+
+
+def write_output(path, html_content):
+    # Renamed into place, so a reader never sees a half-written page
+    write_atomic(path, html_content)
+
+# --- Squad Solver Output ---
+def print_squads(data, processed_players, args):
+    try:
+        model = squad_solver.prepare(processed_players, squad_solver.squad_rules(data), args.objective)
+    except ValueError as e:
+        print(f"Invalid --objective: {e}", file=sys.stderr)
+        return 2
+    try:
+        result = squad_solver.solve(model, args.lock, args.exclude, args.top_k, args.solver, args.time_limit)
+    except ValueError as e:
+        print(f"Cannot build a squad: {e}", file=sys.stderr)
+        return 1
+    by_id = {p['id']: p for p in processed_players}
+    for rank, squad in enumerate(result['squads'], 1):
+        print(f"Squad {rank}: {args.objective} {squad['score']:g}, cost {squad['cost'] / 10:.1f}")
+        for player_id in squad['players']:
+            p = by_id[player_id]
+            print(f"  {p['position']:<4}{p['name']:<32}{p['team']:<16}{p['price']:>5.1f}{p.get(args.objective) or 0:>8g}")
+    if not result['squads']:
+        print("No legal squad fits the budget and limits.", file=sys.stderr)
+    print(f"{result['method']} search: {result['candidates']} candidates, {result['nodes']} nodes, {result['seconds'] * 1000:.1f} ms")
+    return 0 if result['squads'] else 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the FPL Ultimate Draft Tool page.')
+    parser.add_argument('--input', default='FPL_Bootstrap_static.json', help='bootstrap-static JSON file')
+    parser.add_argument('--output', default='FPL_Ultimate_Draft_Tool.html', help='HTML file to write')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='python', help='draft score engine')
+    parser.add_argument('--weights', metavar='CONFIG', help='score with the weights of a league config JSON (see leagues.py)')
+    parser.add_argument('--leagues', metavar='PATH', help='league config file or directory: write one page per league from a single parse, then exit')
+    parser.add_argument('--leagues-dir', default='league_tools', help='output directory for --leagues pages')
+    parser.add_argument('--verify-engine', action='store_true', help='check the numpy engine against the python engine and exit')
+    parser.add_argument('--stream', action='store_true', help='stream the bootstrap file and keep only the fields the tool uses')
+    parser.add_argument('--data-mode', choices=['inline', 'external', 'bundle'], default='inline', help='embed the player data in the page, write it as per-position files the page fetches, or write a minified content-hashed static bundle (see bundle.py)')
+    parser.add_argument('--cache', action='store_true', help='load the input through its binary column cache (written on first use)')
+    parser.add_argument('--rebuild-cache', action='store_true', help='discard and rewrite the binary cache for the input (implies --cache)')
+    parser.add_argument('--benchmark-load', action='store_true', help='time cold JSON parsing against a warm cache load and exit')
+    parser.add_argument('--incremental', action='store_true', help='reuse the previous build state and only rebuild players that changed')
+    parser.add_argument('--state', help='incremental build state file (default: <output>.state.json)')
+    parser.add_argument('--history', default='fpl_history', help='gameweek history store directory')
+    parser.add_argument('--history-ingest', nargs='+', metavar='PATH', help='append bootstrap snapshots (files, JSON-lines archives or directories) to the history store and exit')
+    parser.add_argument('--form-window', type=int, metavar='N', help='add form_score: the draft score over the last N stored gameweeks')
+    parser.add_argument('--fixtures', metavar='PATH', help="fixtures JSON (the API's fixtures/ list) or a fetcher.py cache directory")
+    parser.add_argument('--fixture-horizon', type=int, default=5, metavar='N', help='with --fixtures, add fixture_difficulty and fixture_score over the next N gameweeks')
+    parser.add_argument('--similar', type=int, metavar='K', help='add similar: the K most similar cheaper players in the same position')
+    parser.add_argument('--similar-max-price', type=float, metavar='PRICE', help='only suggest replacements costing at most PRICE')
+    parser.add_argument('--similar-backend', choices=sorted(similarity.BACKENDS), default='exact', help='nearest-neighbour index for --similar (lsh: approximate, for multi-season pools)')
+    parser.add_argument('--momentum', metavar='JOURNAL', help='add transfer / ownership momentum and predicted price changes from a momentum.py journal')
+    parser.add_argument('--project', type=int, metavar='GAMEWEEKS', help='add Monte Carlo projected points (proj_mean, proj_p10/p50/p90) over the next GAMEWEEKS (requires numpy)')
+    parser.add_argument('--simulations', type=int, default=100000, help='Monte Carlo runs for --project')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for --project')
+    parser.add_argument('--workers', type=int, help='processes for --project and --leagues (default: all cores)')
+    parser.add_argument('--solve-squad', action='store_true', help='print the best legal squads instead of writing the page')
+    parser.add_argument('--objective', default='draft_score', help='player column the squad solver maximizes')
+    parser.add_argument('--top-k', type=int, default=1, help='number of distinct squads to return')
+    parser.add_argument('--lock', type=int, action='append', default=[], metavar='ID', help='player id every squad must include (repeatable)')
+    parser.add_argument('--exclude', type=int, action='append', default=[], metavar='ID', help='player id no squad may include (repeatable)')
+    parser.add_argument('--solver', choices=['auto', 'exact', 'beam'], default='auto', help='exact branch and bound, beam search, or exact with a beam fallback after --time-limit')
+    parser.add_argument('--time-limit', type=float, default=1.0, help='seconds before --solver auto falls back to beam search')
+    parser.add_argument('--timings', nargs='?', const='-', metavar='PATH', help='record per-stage timings and per-position counts; JSON to stderr, or to PATH')
+    parser.add_argument('--profile', metavar='PATH', help='run under cProfile and dump pstats to PATH')
+    parser.add_argument('--collapsed-stacks', metavar='PATH', help='write flamegraph collapsed stacks from the cProfile run to PATH')
+    args = parser.parse_args(argv)
+
+    timer = profiling.StageTimer(input=args.input, output=args.output, engine=args.engine) if args.timings else profiling.NullTimer()
+    profiler = profiling.start_profiler() if args.profile or args.collapsed_stacks else None
+    try:
+        status = run(args, timer)
+    finally:
+        if profiler:
+            profiling.write_profile(profiler, args.profile, args.collapsed_stacks)
+    if timer.enabled:
+        profiling.write_summary(timer.summary(status=status), args.timings)
+    return status
+
+def run(args, timer):
+    if args.benchmark_load:
+        for stage, millis in snapshot_cache.benchmark(args.input).items():
+            print(f"{stage:>14}: {millis:8.3f} ms")
+        return 0
+
+    if args.history_ingest:
+        try:
+            events = history.ingest_paths(args.history, args.history_ingest)
+        except (OSError, ValueError) as e:
+            print(f"Could not ingest into {args.history}: {e}", file=sys.stderr)
+            return 2
+        for event, stored in events:
+            print(f"Gameweek {event}: {'stored' if stored is not None else 'already in the store'}")
+        return 0
+
+    try:
+        weights = leagues.load_weights(args.weights) if args.weights else None
+        configs = leagues.load_configs(args.leagues, weights) if args.leagues else None
+    except (OSError, ValueError) as e:
+        print(f"Invalid league config: {e}", file=sys.stderr)
+        return 2
+    if configs and args.data_mode != 'inline':
+        print(f"--leagues writes self-contained pages; drop --data-mode {args.data_mode}", file=sys.stderr)
+        return 2
+
+    if args.project is not None and args.project < 1:
+        print(f"--project needs at least one gameweek, got {args.project}", file=sys.stderr)
+        return 2
+    if args.project and args.simulations < 1:
+        print(f"--simulations must be at least 1, got {args.simulations}", file=sys.stderr)
+        return 2
+    if args.solve_squad and args.top_k < 1:
+        print(f"--top-k must be at least 1, got {args.top_k}", file=sys.stderr)
+        return 2
+    if args.fixtures and not os.path.exists(args.fixtures):
+        print(f"No fixtures at {args.fixtures}", file=sys.stderr)
+        return 2
+    if args.momentum and not os.path.exists(args.momentum):
+        print(f"No momentum journal at {args.momentum}; run momentum.py first", file=sys.stderr)
+        return 2
+
+    with timer.stage('load'):
+        data = load_data(args.input, args.stream, args.cache, args.rebuild_cache)
+
+    if args.verify_engine:
+        mismatches = verify_engines(data['elements'])
+        if mismatches:
+            print(f"Engine mismatch for {len(mismatches)} players: {mismatches[:20]}", file=sys.stderr)
+            return 1
+        print(f"Engines agree on all {len(data['elements'])} players.")
+        return 0
+
+    if args.incremental:
+        state_path = args.state or args.output + '.state.json'
+        with timer.stage('incremental'):
+            state, summary = incremental.incremental_build(data, map_teams(data), build_processed_player, incremental.load_state(state_path), weights)
+            incremental.save_state(state_path, state)
+            processed_players = incremental.ordered_rows(state, data['elements'])
+        print(f"Incremental build: {summary}")
+    else:
+        with timer.stage('score'):
+            draft_scores = score_snapshot(data, args.engine, weights)
+        with timer.stage('transform'):
+            processed_players = build_rows(data['elements'], map_teams(data), draft_scores)
+    if timer.enabled:
+        timer.details['positions'] = profiling.position_counts(data['elements'])
+    form_elements = fixture_factors = None
+    if args.form_window:
+        with timer.stage('form'):
+            form_elements = history.rolling_elements(history.load_history(args.history, args.form_window), args.form_window)
+            form_scores = history.form_scores(form_elements, weights)
+            for p in processed_players:
+                p['form_score'] = form_scores.get(p['id'], 0)
+
+    if args.fixtures:
+        with timer.stage('fixtures'):
+            try:
+                matrix, _ = fixtures.load_matrix(args.fixtures, data['teams'])
+            except (OSError, ValueError) as e:
+                print(f"Invalid fixtures {args.fixtures}: {e}", file=sys.stderr)
+                return 2
+            fixture_factors = fixtures.add_fixture_scores(processed_players, data['elements'], matrix, fixtures.start_gameweek(data), args.fixture_horizon)
+
+    if args.similar:
+        with timer.stage('similar'):
+            similarity.add_similar(processed_players, data['elements'], args.similar, args.similar_max_price, args.similar_backend)
+
+    if args.momentum:
+        with timer.stage('momentum'):
+            momentum.add_momentum(processed_players, momentum.load_journal(args.momentum))
+
+    if args.project:
+        with timer.stage('project'):
+            projected = projection.project(data['elements'], projection.scoring_rules(data), args.project, args.simulations, args.seed, args.workers)
+            projection.add_projections(processed_players, projected)
+
+    if args.solve_squad:
+        return print_squads(data, processed_players, args)
+
+    if configs:
+        shared = {
+            'rows': processed_players,
+            'score': snapshot_scorer(data, args.engine),
+            'render': generate_html,
+            'fixture_factors': fixture_factors,
+            'form': functools.partial(history.form_scores, form_elements) if form_elements is not None else None,
+        }
+        with timer.stage('leagues'):
+            results = leagues.render_leagues(shared, configs, args.leagues_dir, args.workers)
+        for result in results:
+            print(f"{result['name']}: {result['path']} ({result['seconds']:.2f} s)")
+        print(f"Generated {len(results)} league pages with {len(processed_players)} players each.")
+        return 0
+
+    if args.data_mode == 'bundle':
+        with timer.stage('bundle'):
+            summary = bundle.write_bundle(processed_players, args.output, generate_html)
+        print(f"Successfully generated {args.output} with {len(processed_players)} players: {summary['assets']} assets in "
+              f"{summary['static_dir']} ({summary['written']} written, {summary['reused']} unchanged, {summary['removed']} old files removed).")
+        return 0
+
+    data_dir = manifest_url = None
+    if args.data_mode == 'external':
+        data_dir = os.path.splitext(args.output)[0] + '_data'
+        manifest_url = os.path.basename(data_dir) + '/manifest.json'
+    with timer.stage('render'):
+        html_content = generate_html(processed_players, manifest_url)
+    # One 'write' stage covers the data files and the page
+    with timer.stage('write'):
+        if data_dir:
+            payload.write_payload(processed_players, data_dir)
+        write_output(args.output, html_content)
+    print(f"Successfully generated {args.output} with {len(processed_players)} players.")
+    return 0
 
 
 if __name__ == "__main__":
-    html_content = generate_html(processed_players)
-    output_filename = 'FPL_Ultimate_Draft_Tool.html'
-    with open(output_filename, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print(f"Successfully generated {output_filename} with {len(processed_players)} players.") 
\ No newline at end of file
+    sys.exit(main())
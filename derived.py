@@ -0,0 +1,100 @@
+# --- Derived Player Fields ---
+# Values the page used to recompute in the browser on every sort, filter and
+# render: xDiff, G+A, xG+xA, the insight flags/text and the quick-filter
+# membership. Also the per-column sort permutations shipped with the payload
+# and the constants the page's draft mode reads.
+from decimal import Decimal, ROUND_HALF_UP
+
+from squad_solver import DEFAULT_RULES
+
+# Insight flags: (bit, icon, text). The page maps the bits back to icons.
+INSIGHTS = [
+    ('penalty_taker', '🎯', 'בועט פנדלים'),
+    ('corners_taker', '⚽', 'לוקח קרנות'),
+    ('differential', '💎', 'דיפרנציאל'),
+    ('rotation_risk', '⚠️', 'סיכון רוטציה'),
+    ('overperforming', '📈', 'במימוש יתר'),
+    ('underperforming', '📉', 'בביצועי חסר, צפוי להשתפר'),
+    ('value', '💰', 'תמורה מעולה למחיר'),
+    ('bonus_magnet', '🎖️', 'מגנט בונוסים'),
+]
+INSIGHT_BITS = {name: 1 << i for i, (name, _, _) in enumerate(INSIGHTS)}
+
+QUICK_FILTERS = {
+    'differentials': lambda p: p['selected_percent'] < 5 and p['total_points'] > 30,
+    'penalties': lambda p: p['penalty_taker'],
+    'corners': lambda p: p['corners_taker'],
+    'underperforming': lambda p: p['xdiff'] <= -4,
+    'overperforming': lambda p: p['xdiff'] >= 4,
+    'bonus_magnets': lambda p: p['bps'] > 20,
+    'value': lambda p: is_value_pick(p),
+    'clean_sheets': lambda p: p['clean_sheets'] > 8,
+    # Filled in by momentum.py (--momentum); never set otherwise
+    'price_risers': lambda p: p.get('price_trend', 0) > 0,
+    'price_fallers': lambda p: p.get('price_trend', 0) < 0,
+}
+QUICK_FILTER_BITS = {name: 1 << i for i, name in enumerate(QUICK_FILTERS)}
+
+# Table columns sorted numerically (descending) in the page
+SORT_FIELDS = [
+    'draft_score', 'price', 'total_points', 'ppg', 'selected_percent', 'goals_assists',
+    'xg_xa', 'minutes', 'xdiff', 'bps', 'ict_index', 'bonus', 'clean_sheets',
+]
+
+# Letters name search folds after stripping marks; the page's search box and
+# server.py's queries both use this table
+LETTER_FOLDS = {'ø': 'o', 'œ': 'oe', 'æ': 'ae', 'ß': 'ss', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'þ': 'th', 'ı': 'i',
+                'ך': 'כ', 'ם': 'מ', 'ן': 'נ', 'ף': 'פ', 'ץ': 'צ'}
+
+# Columns the page's draft mode can rank by, when present in the payload
+DRAFT_KEYS = ['draft_score', 'proj_mean', 'fixture_score', 'form_score']
+
+def js_to_fixed(value, digits=2):
+    # Number.prototype.toFixed: exact binary value, ties away from zero
+    return float(Decimal(value).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+def is_value_pick(p):
+    return p['price'] > 0 and (p['ppg'] / p['price']) > 0.8 and p['total_points'] > 50
+
+def insight_flags(p):
+    checks = {
+        'penalty_taker': p['penalty_taker'],
+        'corners_taker': p['corners_taker'],
+        'differential': p['selected_percent'] < 5,
+        'rotation_risk': p['rotation_risk'],
+        'overperforming': p['xdiff'] > 1,
+        'underperforming': p['xdiff'] < -1,
+        'value': is_value_pick(p),
+        'bonus_magnet': p['bps'] > 500,
+    }
+    return sum(INSIGHT_BITS[name] for name, on in checks.items() if on)
+
+def insight_text(flags):
+    return ', '.join(text for name, _, text in INSIGHTS if flags & INSIGHT_BITS[name])
+
+def add_derived_fields(p):
+    p['goals_assists'] = p['goals'] + p['assists']
+    p['xg_xa'] = p['xg'] + p['xa']
+    p['xdiff'] = js_to_fixed(p['goals_assists'] - p['xg_xa'])
+    p['insight_flags'] = insight_flags(p)
+    p['insights'] = insight_text(p['insight_flags'])
+    p['quick_filters'] = quick_filter_bits(p)
+    return p
+
+def quick_filter_bits(p):
+    return sum(bit for name, bit in QUICK_FILTER_BITS.items() if QUICK_FILTERS[name](p))
+
+def sort_orders(players):
+    # Player ids per column in display order (descending, stable like Array.sort)
+    return {field: [players[i]['id'] for i in sorted(range(len(players)), key=lambda i: -(players[i][field] or 0))] for field in SORT_FIELDS}
+
+def page_constants():
+    # Flag tables the page needs to decode insight_flags / quick_filters, plus
+    # the draft mode's ranking columns, squad quotas and search letter folds
+    return {
+        'insights': [{'bit': INSIGHT_BITS[name], 'icon': icon} for name, icon, _ in INSIGHTS],
+        'quickFilters': QUICK_FILTER_BITS,
+        'draftKeys': DRAFT_KEYS,
+        'squadQuotas': DEFAULT_RULES['quotas'],
+        'letterFolds': LETTER_FOLDS,
+    }
@@ -0,0 +1,248 @@
+# --- Element Summary Fetcher ---
+# Bulk-fetches the FPL element-summary endpoint (per-player fixtures and
+# gameweek history, one request per element id) with a small stdlib asyncio
+# HTTP/1.1 client:
+#   - a keep-alive connection pool capped at `concurrency` sockets
+#   - retries with exponential backoff and jitter on connection errors,
+#     timeouts, 429 and 5xx (Retry-After is honoured)
+#   - conditional requests from the on-disk cache (If-None-Match /
+#     If-Modified-Since); a 304 keeps the cached body
+#   - gzip and chunked responses
+# The cache is one JSON file per element under <cache_dir>/element-summary/,
+# written atomically, so an interrupted refresh leaves every entry usable.
+# mock_fpl_server.py serves the same endpoint locally for offline runs.
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import ssl
+import sys
+import time
+from urllib.parse import urlsplit
+
+import ingest
+from atomic import write_atomic
+
+BASE_URL = 'https://fantasy.premierleague.com/api/'
+SUMMARY_PATH = 'element-summary/{id}/'
+USER_AGENT = 'fpl-draft-tool/1.0'
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 30.0
+
+class FetchError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+# --- HTTP ---
+class ConnectionPool:
+    # Idle keep-alive connections to one origin; at most `size` open at once
+    def __init__(self, base_url, size=32, timeout=15.0):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == 'https' else None
+        self.base_path = url.path if url.path.endswith('/') else url.path + '/'
+        self.timeout = timeout
+        self.idle = []
+        self.slots = asyncio.Semaphore(size)
+
+    async def get(self, path, headers=None):
+        # (status, lowercase headers, decoded body bytes)
+        async with self.slots:
+            while True:
+                reused = bool(self.idle)
+                reader, writer = self.idle.pop() if reused else await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+                try:
+                    status, response_headers, body, keep_alive = await asyncio.wait_for(
+                        self._exchange(reader, writer, self.base_path + path, headers or {}), self.timeout)
+                    break
+                except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+                    writer.close()
+                    # The server dropped an idle keep-alive socket: retry on another
+                    if not reused:
+                        raise
+                except BaseException:
+                    writer.close()
+                    raise
+            if keep_alive:
+                self.idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, response_headers, body
+
+    async def _exchange(self, reader, writer, target, headers):
+        lines = [f"GET {target} HTTP/1.1", f"Host: {self.host}", f"User-Agent: {USER_AGENT}",
+                 'Accept: application/json', 'Accept-Encoding: gzip', 'Connection: keep-alive']
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('connection closed before the response')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = response_headers.get('connection', '').lower() != 'close'
+        if status in (204, 304):
+            body = b''
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            body = await reader.readexactly(int(response_headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        if response_headers.get('content-encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+        return status, response_headers, body, keep_alive
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+# --- Disk Cache ---
+def cache_file(cache_dir, element_id):
+    return os.path.join(cache_dir, 'element-summary', f"{element_id}.json")
+
+def read_cached(cache_dir, element_id):
+    try:
+        with open(cache_file(cache_dir, element_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_cached(cache_dir, element_id, entry):
+    path = cache_file(cache_dir, element_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, json.dumps(entry, separators=(',', ':')))
+
+def load_summaries(cache_dir, element_ids=None):
+    # {element id: element-summary document} for everything in the cache
+    directory = os.path.join(cache_dir, 'element-summary')
+    if element_ids is None:
+        names = os.listdir(directory) if os.path.isdir(directory) else []
+        element_ids = [int(name[:-5]) for name in names if name.endswith('.json') and name[:-5].isdigit()]
+    summaries = {}
+    for element_id in element_ids:
+        entry = read_cached(cache_dir, element_id)
+        if entry is not None:
+            summaries[element_id] = entry['data']
+    return summaries
+
+# --- Fetching ---
+def _retry_delay(attempt, backoff, retry_after=None):
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        except ValueError:
+            pass
+    return backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+async def fetch_summary(pool, cache_dir, element_id, retries=4, backoff=0.25, refresh=False):
+    # 'fetched' or 'not_modified'; raises FetchError when retries run out
+    cached = None if refresh else read_cached(cache_dir, element_id)
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    path = SUMMARY_PATH.format(id=element_id)
+    for attempt in range(retries + 1):
+        retry_after = None
+        try:
+            status, response_headers, body = await pool.get(path, headers)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            error = FetchError(f"element {element_id}: {type(e).__name__}: {e}")
+        else:
+            if status == 304 and cached:
+                return 'not_modified'
+            if status == 200:
+                try:
+                    data = json.loads(body)
+                except ValueError as e:
+                    error = FetchError(f"element {element_id}: invalid JSON: {e}", status)
+                else:
+                    write_cached(cache_dir, element_id, {
+                        'etag': response_headers.get('etag'),
+                        'last_modified': response_headers.get('last-modified'),
+                        'fetched_at': time.time(),
+                        'data': data,
+                    })
+                    return 'fetched'
+            else:
+                error = FetchError(f"element {element_id}: HTTP {status}", status)
+                if status not in RETRY_STATUSES:
+                    raise error
+                retry_after = response_headers.get('retry-after')
+        if attempt < retries:
+            await asyncio.sleep(_retry_delay(attempt, backoff, retry_after))
+    raise error
+
+async def fetch_all(element_ids, cache_dir, base_url=BASE_URL, concurrency=32, retries=4, backoff=0.25,
+                    timeout=15.0, refresh=False):
+    # Refreshes the cache for every id; returns per-outcome counts and failures
+    pool = ConnectionPool(base_url, concurrency, timeout)
+    start = time.perf_counter()
+    outcomes = {'fetched': 0, 'not_modified': 0, 'failed': 0}
+    failures = {}
+
+    async def one(element_id):
+        try:
+            outcomes[await fetch_summary(pool, cache_dir, element_id, retries, backoff, refresh)] += 1
+        except FetchError as e:
+            outcomes['failed'] += 1
+            failures[element_id] = str(e)
+
+    try:
+        await asyncio.gather(*(one(element_id) for element_id in element_ids))
+    finally:
+        pool.close()
+    outcomes['seconds'] = round(time.perf_counter() - start, 3)
+    return outcomes, failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fetch FPL element-summary data for every player into a local cache.')
+    parser.add_argument('--input', default='FPL_Bootstrap_static.json', help='bootstrap-static JSON file listing the element ids')
+    parser.add_argument('--cache-dir', default='fpl_cache', help='response cache directory')
+    parser.add_argument('--base-url', default=BASE_URL, help='API root (e.g. http://127.0.0.1:8766/api/ for mock_fpl_server.py)')
+    parser.add_argument('--concurrency', type=int, default=32, help='simultaneous requests / pooled connections')
+    parser.add_argument('--retries', type=int, default=4, help='retries per element on errors, 429 and 5xx')
+    parser.add_argument('--backoff', type=float, default=0.25, help='base backoff in seconds (doubles per retry)')
+    parser.add_argument('--timeout', type=float, default=15.0, help='per-request timeout in seconds')
+    parser.add_argument('--refresh', action='store_true', help='ignore cached validators and download everything')
+    parser.add_argument('--limit', type=int, help='only fetch the first N elements')
+    args = parser.parse_args(argv)
+
+    element_ids = [element['id'] for element in ingest.iter_elements(args.input)][:args.limit]
+    outcomes, failures = asyncio.run(fetch_all(element_ids, args.cache_dir, args.base_url, args.concurrency,
+                                               args.retries, args.backoff, args.timeout, args.refresh))
+    for element_id, message in sorted(failures.items())[:20]:
+        print(f"Failed: {message}", file=sys.stderr)
+    print(f"{len(element_ids)} elements in {outcomes['seconds']:.2f} s: {outcomes['fetched']} fetched, "
+          f"{outcomes['not_modified']} not modified, {outcomes['failed']} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
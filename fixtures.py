@@ -0,0 +1,225 @@
+# --- Fixture Difficulty Matrix ---
+# Dense team x gameweek difficulty built once per fixture list. Each cell sums,
+# over the team's fixtures that gameweek, the opponent's relevant strength
+# relative to the league average (1.0 = an average opponent):
+#   attack  - opponent strength_defence_home/away (what attackers face)
+#   defence - opponent strength_attack_home/away (what defenders face)
+# A blank gameweek is 0 with count 0; a double gameweek holds both fixtures.
+# Teams without strength ratings fall back to the fixture's FDR / 3.
+#
+# Every row carries prefix sums, so the next-N difficulty for a team is one
+# subtraction whatever N is. The matrix is kept in a JSON sidecar next to the
+# fixtures file; when the fixture list changes (results in, postponements
+# rescheduled) only the fixtures that moved are re-applied and only the rows
+# of the teams involved get their prefix sums redone.
+import json
+import os
+
+import fetcher
+from atomic import write_atomic
+from ingest import current_event
+from snapshot_cache import content_hash
+
+VERSION = 1
+KINDS = ('attack', 'defence', 'count')
+DEFAULT_FDR = 3
+
+# --- Fixture Sources ---
+def load_fixtures(path):
+    # A fixtures list (the API's fixtures/ document), or a fetcher.py cache
+    # directory whose element summaries are merged back into one list.
+    # Raises ValueError when the file is not a fixtures list.
+    if os.path.isdir(path):
+        merged = {}
+        for summary in fetcher.load_summaries(path).values():
+            for f in summary.get('fixtures', []):
+                fixture = merged.setdefault(f['id'], {key: f.get(key) for key in ('id', 'event', 'team_h', 'team_a', 'finished')})
+                fixture['team_h_difficulty' if f.get('is_home') else 'team_a_difficulty'] = f.get('difficulty')
+        return sorted(merged.values(), key=lambda f: f['id'])
+    with open(path, 'r', encoding='utf-8') as f:
+        fixtures = json.load(f)
+    if not isinstance(fixtures, list) or not all(isinstance(f, dict) and {'id', 'team_h', 'team_a'} <= f.keys() for f in fixtures):
+        raise ValueError("expected a list of fixtures with id, team_h and team_a")
+    return fixtures
+
+def start_gameweek(data):
+    # First gameweek not yet under way: the one after the current event
+    event = current_event(data.get('events') or []) if isinstance(data, dict) else data.event
+    return (event or 0) + 1
+
+# --- Matrix ---
+def _strengths(teams):
+    # {team id: {field: rating / league mean}}; None when the ratings are missing
+    fields = ['strength_attack_home', 'strength_attack_away', 'strength_defence_home', 'strength_defence_away']
+    if not teams or not all(team.get(field) for team in teams for field in fields):
+        return None
+    means = {field: sum(team[field] for team in teams) / len(teams) for field in fields}
+    return {team['id']: {field: team[field] / means[field] for field in fields} for team in teams}
+
+def fixture_cells(fixture, strengths):
+    # [(team id, attack difficulty, defence difficulty)] for both sides
+    home, away = fixture['team_h'], fixture['team_a']
+    if strengths and home in strengths and away in strengths:
+        return [
+            (home, strengths[away]['strength_defence_away'], strengths[away]['strength_attack_away']),
+            (away, strengths[home]['strength_defence_home'], strengths[home]['strength_attack_home']),
+        ]
+    home_fdr = (fixture.get('team_h_difficulty') or DEFAULT_FDR) / DEFAULT_FDR
+    away_fdr = (fixture.get('team_a_difficulty') or DEFAULT_FDR) / DEFAULT_FDR
+    return [(home, home_fdr, home_fdr), (away, away_fdr, away_fdr)]
+
+def _fixture_key(fixture):
+    # What a fixture contributes depends only on when and who
+    return [fixture.get('event'), fixture['team_h'], fixture['team_a'],
+            fixture.get('team_h_difficulty'), fixture.get('team_a_difficulty')]
+
+def _apply(matrix, key, sign):
+    event, home, away, home_fdr, away_fdr = key
+    if event is None or not 1 <= event <= matrix['gameweeks']:
+        return set()
+    rows = matrix['rows']
+    fixture = {'team_h': home, 'team_a': away, 'team_h_difficulty': home_fdr, 'team_a_difficulty': away_fdr}
+    touched = set()
+    for team, attack, defence in fixture_cells(fixture, matrix['strengths']):
+        row = rows.get(team)
+        if row is None:
+            continue
+        row['attack'][event - 1] += sign * attack
+        row['defence'][event - 1] += sign * defence
+        row['count'][event - 1] += sign
+        touched.add(team)
+    return touched
+
+def _prefix(values):
+    sums = [0.0]
+    for value in values:
+        sums.append(sums[-1] + value)
+    return sums
+
+def _refresh_prefixes(matrix, team_ids):
+    for team in team_ids:
+        row = matrix['rows'][team]
+        row['prefix'] = {kind: _prefix(row[kind]) for kind in KINDS}
+
+def _strength_signature(teams):
+    return [[team['id']] + [team.get(field) for field in ('strength_attack_home', 'strength_attack_away',
+                                                          'strength_defence_home', 'strength_defence_away')] for team in teams]
+
+def build_matrix(teams, fixtures, gameweeks=None):
+    if gameweeks is None:
+        gameweeks = max((f['event'] for f in fixtures if f.get('event')), default=38)
+    matrix = {
+        'version': VERSION,
+        'gameweeks': gameweeks,
+        'teams': _strength_signature(teams),
+        'strengths': _strengths(teams),
+        'rows': {team['id']: {kind: [0.0] * gameweeks for kind in KINDS} for team in teams},
+        'fixtures': {},
+    }
+    for fixture in fixtures:
+        key = _fixture_key(fixture)
+        matrix['fixtures'][fixture['id']] = key
+        _apply(matrix, key, 1)
+    _refresh_prefixes(matrix, matrix['rows'])
+    return matrix
+
+def update_matrix(matrix, fixtures):
+    # Re-applies only fixtures that were added, moved or dropped; returns the
+    # number of fixtures that changed
+    seen = set()
+    touched = set()
+    changed = 0
+    for fixture in fixtures:
+        seen.add(fixture['id'])
+        key = _fixture_key(fixture)
+        old = matrix['fixtures'].get(fixture['id'])
+        if old == key:
+            continue
+        if old is not None:
+            touched |= _apply(matrix, old, -1)
+        touched |= _apply(matrix, key, 1)
+        matrix['fixtures'][fixture['id']] = key
+        changed += 1
+    for fixture_id in [fixture_id for fixture_id in matrix['fixtures'] if fixture_id not in seen]:
+        touched |= _apply(matrix, matrix['fixtures'].pop(fixture_id), -1)
+        changed += 1
+    _refresh_prefixes(matrix, touched)
+    return changed
+
+def window_sum(matrix, team, start, horizon, kind='attack'):
+    # Sum over gameweeks start .. start + horizon - 1 (clipped to the season)
+    row = matrix['rows'].get(team)
+    if row is None:
+        return 0.0
+    gameweeks = matrix['gameweeks']
+    lo = min(max(start - 1, 0), gameweeks)
+    hi = min(max(start - 1 + horizon, lo), gameweeks)
+    prefix = row['prefix'][kind]
+    return prefix[hi] - prefix[lo]
+
+def window_table(matrix, start, horizon):
+    # {team id: {'attack', 'defence', 'count'}} next-N sums for every team
+    return {team: {kind: window_sum(matrix, team, start, horizon, kind) for kind in KINDS} for team in matrix['rows']}
+
+# --- Sidecar Cache ---
+def cache_path(fixtures_path):
+    return fixtures_path.rstrip(os.sep) + '.matrix.json'
+
+def load_matrix(fixtures_path, teams):
+    # Cached matrix for this fixture file, patched when the file changed;
+    # rebuilt when there is no usable cache or team ratings moved
+    fixtures = None
+    digest = None if os.path.isdir(fixtures_path) else content_hash(fixtures_path)
+    path = cache_path(fixtures_path)
+    matrix = None
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                matrix = json.load(f)
+        except (OSError, ValueError):
+            matrix = None
+    if matrix and matrix.get('version') == VERSION and matrix['teams'] == _strength_signature(teams):
+        matrix['rows'] = {int(k): v for k, v in matrix['rows'].items()}
+        matrix['fixtures'] = {int(k): v for k, v in matrix['fixtures'].items()}
+        if matrix['strengths']:
+            matrix['strengths'] = {int(k): v for k, v in matrix['strengths'].items()}
+        if digest is not None and matrix.get('hash') == digest:
+            return matrix, 0
+        fixtures = load_fixtures(fixtures_path)
+        if max((f['event'] for f in fixtures if f.get('event')), default=38) == matrix['gameweeks']:
+            changed = update_matrix(matrix, fixtures)
+            if changed:
+                save_matrix(path, matrix, digest)
+            return matrix, changed
+    if fixtures is None:
+        fixtures = load_fixtures(fixtures_path)
+    matrix = build_matrix(teams, fixtures)
+    save_matrix(path, matrix, digest)
+    return matrix, len(fixtures)
+
+def save_matrix(path, matrix, digest=None):
+    matrix['hash'] = digest
+    write_atomic(path, json.dumps(matrix, separators=(',', ':')))
+
+# --- Fixture-Adjusted Score ---
+def fixture_factor(sums, horizon, kind):
+    # Share of the horizon with a fixture over the mean difficulty faced:
+    # 1.0 for one average fixture a week, lower for blanks or hard runs
+    count = sums['count']
+    if count <= 0 or horizon <= 0:
+        return 0.0
+    return (count / horizon) * (count / sums[kind])
+
+def add_fixture_scores(processed_players, all_players_elements, matrix, start, horizon):
+    # fixture_difficulty: next-N difficulty sum; fixture_score: draft_score x factor.
+    # Returns the per-player factors so re-weighted draft scores can reuse them.
+    table = window_table(matrix, start, horizon)
+    empty = dict.fromkeys(KINDS, 0.0)
+    factors = []
+    for p, element in zip(processed_players, all_players_elements):
+        kind = 'defence' if element.get('element_type') in (1, 2) else 'attack'
+        sums = table.get(element.get('team'), empty)
+        factors.append(fixture_factor(sums, horizon, kind))
+        p['fixture_difficulty'] = round(sums[kind], 2)
+        p['fixture_score'] = round(p['draft_score'] * factors[-1])
+    return factors
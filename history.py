@@ -0,0 +1,232 @@
+# --- Gameweek History Store ---
+# Keeps one entry per gameweek (the snapshot's current events[].id) so form
+# over the last N gameweeks can be read without re-parsing old bootstrap
+# files. The first ingested snapshot is the baseline: its season totals only
+# go into the index, since they are not one gameweek's numbers. Every later
+# snapshot becomes an append-only segment file holding, for the players whose
+# numbers moved, the change since the previous stored gameweek. index.json
+# lists the segments and carries the latest running totals, so ingesting the
+# next gameweek only needs the new snapshot. Windows only ever sum segments.
+#
+# Segment layout (little-endian, framed like snapshot_cache.py's files):
+#   b'FPLH' | u32 version | u32 header length | JSON header | padding to 8
+#   then one int32 column per field ('id' first), 8-byte aligned
+# Decimal-string fields are stored as fixed-point integers (see FIELDS), so
+# sums over a window are exact.
+import array
+import json
+import os
+
+import ingest
+import scoring
+from atomic import write_atomic
+from snapshot_cache import pack_header, pad, pad_block, unpack_header
+
+MAGIC = b'FPLH'
+VERSION = 1
+INDEX_FILE = 'index.json'
+
+# Stored element fields and their fixed-point scale
+FIELDS = {
+    'total_points': 1,
+    'minutes': 1,
+    'goals_scored': 1,
+    'assists': 1,
+    'clean_sheets': 1,
+    'goals_conceded': 1,
+    'saves': 1,
+    'bps': 1,
+    'bonus': 1,
+    'expected_goals': 100,
+    'expected_assists': 100,
+    'expected_goals_conceded': 100,
+    'ict_index': 10,
+    'now_cost': 1,
+    'selected_by_percent': 10,
+}
+FIELD_NAMES = list(FIELDS)
+# Levels rather than flows: rolling_elements reports their latest values
+LEVEL_FIELDS = ['now_cost', 'selected_by_percent']
+
+def _fixed(element, field):
+    return int(round(float(element.get(field) or 0) * FIELDS[field]))
+
+# --- Index ---
+def load_index(directory):
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return {'version': VERSION, 'fields': FIELD_NAMES, 'baseline': None, 'segments': [], 'totals': {}, 'element_types': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get('version') != VERSION or index.get('fields') != FIELD_NAMES:
+        raise ValueError(f"{path} is not a version {VERSION} history index")
+    index['totals'] = {int(k): v for k, v in index['totals'].items()}
+    index['element_types'] = {int(k): v for k, v in index['element_types'].items()}
+    return index
+
+def save_index(directory, index):
+    write_atomic(os.path.join(directory, INDEX_FILE), json.dumps(index, separators=(',', ':')))
+
+# --- Segments ---
+def write_segment(path, event, ids, columns):
+    blocks = [pad_block(array.array('i', values).tobytes()) for values in [ids] + [columns[field] for field in FIELD_NAMES]]
+    write_atomic(path, pack_header(MAGIC, VERSION, {'event': event, 'count': len(ids), 'fields': FIELD_NAMES}) + b''.join(blocks))
+
+def read_segment(path):
+    # {'event', 'ids', field: [delta, ...]} with deltas still fixed-point
+    with open(path, 'rb') as f:
+        raw = f.read()
+    header, offset = unpack_header(raw, MAGIC, VERSION, path, 'history segment')
+    count = header['count']
+    size = count * 4 + pad(count * 4)
+    segment = {'event': header['event']}
+    for field in ['ids'] + header['fields']:
+        column = array.array('i')
+        column.frombytes(raw[offset:offset + count * 4])
+        segment[field] = column.tolist()
+        offset += size
+    return segment
+
+# --- Ingestion ---
+def ingest_snapshot(directory, snapshot):
+    # Appends the snapshot's gameweek (the first one only becomes the
+    # baseline); returns its event id, or None when that gameweek is already
+    # stored. Gameweeks must arrive in order.
+    event = snapshot.event if hasattr(snapshot, 'event') else ingest.current_event(snapshot.get('events', []))
+    if event is None:
+        raise ValueError("snapshot has no current or finished gameweek")
+    os.makedirs(directory, exist_ok=True)
+    index = load_index(directory)
+    stored = [segment['event'] for segment in index['segments']]
+    if index['baseline'] is not None:
+        stored.insert(0, index['baseline'])
+    if event in stored:
+        return None
+    if stored and event < stored[-1]:
+        raise ValueError(f"gameweek {event} is older than the last stored gameweek {stored[-1]}")
+
+    totals = index['totals']
+    if index['baseline'] is None:
+        for element in snapshot['elements']:
+            totals[element['id']] = [_fixed(element, field) for field in FIELD_NAMES]
+            index['element_types'][element['id']] = element.get('element_type')
+        index['baseline'] = event
+        save_index(directory, index)
+        return event
+
+    ids, columns = [], {field: [] for field in FIELD_NAMES}
+    for element in snapshot['elements']:
+        current = [_fixed(element, field) for field in FIELD_NAMES]
+        previous = totals.get(element['id'])
+        # A player new to the game since the baseline starts from zero
+        deltas = current if previous is None else [c - p for c, p in zip(current, previous)]
+        if previous is None or any(deltas):
+            ids.append(element['id'])
+            for field, delta in zip(FIELD_NAMES, deltas):
+                columns[field].append(delta)
+        totals[element['id']] = current
+        index['element_types'][element['id']] = element.get('element_type')
+
+    filename = f"gw-{event:02d}.fplh"
+    write_segment(os.path.join(directory, filename), event, ids, columns)
+    index['segments'].append({'event': event, 'file': filename, 'rows': len(ids)})
+    save_index(directory, index)
+    return event
+
+def ingest_paths(directory, paths):
+    # Bootstrap files, JSON-lines archives or directories of snapshots
+    events = []
+    for path in paths:
+        for snapshot in ingest.iter_snapshots(path):
+            events.append((snapshot.event, ingest_snapshot(directory, snapshot)))
+    return events
+
+# --- Queries ---
+def load_history(directory, last=None):
+    # Reads only the newest `last` gameweek segments (all when None)
+    index = load_index(directory)
+    entries = index['segments'] if last is None else index['segments'][-last:] if last > 0 else []
+    return {
+        'index': index,
+        'events': [entry['event'] for entry in entries],
+        'segments': [read_segment(os.path.join(directory, entry['file'])) for entry in entries],
+    }
+
+def window_totals(history, window=None):
+    # {player id: {field: summed delta, 'appearances': gameweeks with minutes}}
+    # over the newest `window` loaded segments, scaled back to real units
+    segments = history['segments'] if window is None else history['segments'][-window:] if window > 0 else []
+    sums = {}
+    for segment in segments:
+        minutes = segment['minutes']
+        for row, player_id in enumerate(segment['ids']):
+            totals = sums.get(player_id)
+            if totals is None:
+                totals = sums[player_id] = dict.fromkeys(FIELD_NAMES, 0)
+                totals['appearances'] = 0
+            for field in FIELD_NAMES:
+                totals[field] += segment[field][row]
+            if minutes[row] > 0:
+                totals['appearances'] += 1
+    for totals in sums.values():
+        for field, scale in FIELDS.items():
+            if scale != 1:
+                totals[field] /= scale
+    return sums
+
+def rolling_per90(history, field, window):
+    # e.g. rolling_per90(history, 'expected_goals', 5): xG/90 over the last 5 gameweeks
+    result = {}
+    for player_id, totals in window_totals(history, window).items():
+        result[player_id] = totals[field] * 90 / totals['minutes'] if totals['minutes'] > 0 else 0.0
+    return result
+
+def price_trajectory(history, player_id):
+    # [(event, price)] over the loaded segments, walked back from the latest
+    # totals; starts at the baseline gameweek when every segment is loaded
+    current = history['index']['totals'].get(player_id)
+    if current is None:
+        return []
+    cost = current[FIELD_NAMES.index('now_cost')]
+    trajectory = []
+    for event, segment in zip(reversed(history['events']), reversed(history['segments'])):
+        trajectory.append((event, cost / 10))
+        if player_id in segment['ids']:
+            cost -= segment['now_cost'][segment['ids'].index(player_id)]
+    index = history['index']
+    if index['baseline'] is not None and len(history['segments']) == len(index['segments']):
+        trajectory.append((index['baseline'], cost / 10))
+    trajectory.reverse()
+    return trajectory
+
+def ownership_velocity(history, window):
+    # Change in selected_by_percent per gameweek over the window
+    window = min(window, len(history['segments']))
+    if window <= 0:
+        return {}
+    return {player_id: totals['selected_by_percent'] / window for player_id, totals in window_totals(history, window).items()}
+
+def rolling_elements(history, window):
+    # Element-shaped records holding window sums in place of season totals;
+    # price and ownership keep their latest values
+    element_types = history['index']['element_types']
+    latest = history['index']['totals']
+    levels = [(field, FIELD_NAMES.index(field), FIELDS[field]) for field in LEVEL_FIELDS]
+    elements = []
+    for player_id, totals in window_totals(history, window).items():
+        element = {field: totals[field] for field in FIELD_NAMES}
+        for field, position, scale in levels:
+            element[field] = latest[player_id][position] / scale if scale != 1 else latest[player_id][position]
+        element['id'] = player_id
+        element['element_type'] = element_types.get(player_id)
+        element['points_per_game'] = totals['total_points'] / totals['appearances'] if totals['appearances'] else 0.0
+        elements.append(element)
+    return elements
+
+def form_scores(elements, weights=None):
+    # {player id: calculate_draft_score} for rolling_elements records
+    return {element['id']: score for element, score in zip(elements, scoring.score_players(elements, weights=weights))}
+
+def rolling_form_scores(history, window, weights=None):
+    # calculate_draft_score over the last `window` gameweeks: {player id: score}
+    return form_scores(rolling_elements(history, window), weights)
@@ -0,0 +1,110 @@
+# --- Incremental Rebuild ---
+# Keeps the previous snapshot (only the fields that feed the scorer and the
+# processed rows) plus the derived rows and statistics context on disk. A new
+# snapshot is diffed by element id; only added/changed rows are rebuilt, and
+# draft scores are recomputed for everyone only when a league maximum moved.
+# A build with different scoring weights from the stored state starts over.
+import json
+import os
+
+from atomic import write_atomic
+from ingest import ELEMENT_FIELDS
+from scoring import build_stats_context, calculate_draft_score, update_stats_context
+
+STATE_VERSION = 3
+
+def slim_element(player):
+    return {field: player[field] for field in ELEMENT_FIELDS if field in player}
+
+def load_state(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        return None
+    # JSON object keys are strings; restore the integer ids and positions
+    state['elements'] = {int(k): v for k, v in state['elements'].items()}
+    state['rows'] = {int(k): v for k, v in state['rows'].items()}
+    state['teams'] = {int(k): v for k, v in state['teams'].items()}
+    state['context']['positions'] = {int(k) if k != 'null' else None: v for k, v in state['context']['positions'].items()}
+    return state
+
+def save_state(path, state):
+    write_atomic(path, json.dumps(dict(state, version=STATE_VERSION), separators=(',', ':')))
+
+def diff_snapshot(previous_elements, all_players_elements):
+    changed, added = [], []
+    seen = set()
+    for player in all_players_elements:
+        pid = player['id']
+        seen.add(pid)
+        old = previous_elements.get(pid)
+        if old is None:
+            added.append(pid)
+        elif old != slim_element(player):
+            changed.append(pid)
+    removed = [pid for pid in previous_elements if pid not in seen]
+    return changed, added, removed
+
+def full_build(data, teams, build_row, weights=None):
+    all_players_elements = data['elements']
+    context = build_stats_context(all_players_elements)
+    rows = {}
+    for player in all_players_elements:
+        rows[player['id']] = build_row(player, teams, calculate_draft_score(player, context, weights))
+    state = {
+        'weights': weights,
+        'teams': teams,
+        'elements': {player['id']: slim_element(player) for player in all_players_elements},
+        'rows': rows,
+        'context': context,
+    }
+    return state, {'mode': 'full', 'rebuilt': len(rows)}
+
+def incremental_build(data, teams, build_row, state, weights=None):
+    if state is None or state['teams'] != teams or state.get('weights') != weights:
+        return full_build(data, teams, build_row, weights)
+
+    elements = {player['id']: player for player in data['elements']}
+    changed, added, removed = diff_snapshot(state['elements'], data['elements'])
+    if not (changed or added or removed):
+        return state, {'mode': 'incremental', 'changed': 0, 'added': 0, 'removed': 0, 'rebuilt': 0, 'rescored': 0}
+
+    previous = state['elements']
+    context = state['context']
+    old_max = dict(context['max'])
+    old_rows = [previous[pid] for pid in changed + removed]
+    new_rows = [slim_element(elements[pid]) for pid in changed + added]
+    if not update_stats_context(context, old_rows, new_rows):
+        context = build_stats_context(data['elements'])
+    maxima_moved = context['max'] != old_max
+
+    rows = state['rows']
+    for pid in removed:
+        del previous[pid]
+        del rows[pid]
+    for pid in changed + added:
+        player = elements[pid]
+        previous[pid] = slim_element(player)
+        rows[pid] = build_row(player, teams, calculate_draft_score(player, context, weights))
+
+    rescored = 0
+    if maxima_moved:
+        # Every score is relative to the league maxima
+        dirty = set(changed + added)
+        for pid, player in elements.items():
+            if pid not in dirty:
+                rows[pid]['draft_score'] = calculate_draft_score(player, context, weights)
+                rescored += 1
+
+    state = {'weights': weights, 'teams': teams, 'elements': previous, 'rows': rows, 'context': context}
+    summary = {
+        'mode': 'incremental', 'changed': len(changed), 'added': len(added), 'removed': len(removed),
+        'rebuilt': len(changed) + len(added), 'rescored': rescored, 'maxima_moved': maxima_moved,
+    }
+    return state, summary
+
+def ordered_rows(state, all_players_elements):
+    rows = state['rows']
+    return [rows[player['id']] for player in all_players_elements]
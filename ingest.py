@@ -0,0 +1,220 @@
+# --- Streaming Bootstrap Ingestion ---
+# Reads bootstrap-static documents value by value instead of json.load-ing the
+# whole file. Only `teams`, the squad and scoring settings, the current event
+# id and the element fields used by
+# the scorer and processed rows are kept; everything else is decoded one array
+# item at a time and dropped. Also reads multi-snapshot archives (a directory
+# of bootstrap files, or JSON-lines / concatenated documents) one snapshot at a
+# time.
+import json
+import os
+
+CHUNK_SIZE = 1 << 16
+NUMBER_CHARS = '0123456789.eE+-'
+
+# Small top-level sections kept as-is (squad rules, positions)
+DOCUMENT_KEYS = ('teams', 'elements', 'game_settings', 'element_types', 'game_config')
+
+# Element fields read by calculate_draft_score and build_processed_player
+ELEMENT_FIELDS = [
+    'id', 'first_name', 'web_name', 'team', 'element_type', 'now_cost', 'total_points',
+    'points_per_game', 'selected_by_percent', 'goals_scored', 'assists', 'minutes',
+    'expected_goals', 'expected_assists', 'expected_goals_conceded', 'goals_conceded',
+    'saves', 'bps', 'ict_index', 'bonus', 'clean_sheets', 'penalties_order',
+    'corners_and_indirect_freekicks_order', 'chance_of_playing_next_round', 'starts_per_90',
+    'expected_goals_per_90', 'expected_assists_per_90', 'expected_goals_conceded_per_90',
+    'saves_per_90',
+]
+
+class ElementRecord:
+    # Compact, read-only stand-in for an element dict. Supports the dict
+    # accessors the scorers use (get / [] / in); absent fields stay unset.
+    __slots__ = ELEMENT_FIELDS
+
+    def __init__(self, element):
+        for field in ELEMENT_FIELDS:
+            if field in element:
+                setattr(self, field, element[field])
+
+    def get(self, field, default=None):
+        return getattr(self, field, default) if field in ELEMENT_FIELDS else default
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+    def __contains__(self, field):
+        return field in ELEMENT_FIELDS and hasattr(self, field)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in ELEMENT_FIELDS if hasattr(self, field)}
+
+    def __repr__(self):
+        return f"ElementRecord({self.to_dict()!r})"
+
+class Snapshot:
+    __slots__ = ('source', 'event', 'teams', 'elements', 'game_settings', 'element_types', 'game_config')
+
+    def __init__(self, source, event, teams, elements, game_settings=None, element_types=None, game_config=None):
+        self.source = source
+        self.event = event
+        self.teams = teams
+        self.elements = elements
+        self.game_settings = game_settings or {}
+        self.element_types = element_types or []
+        self.game_config = game_config or {}
+
+    # Same shape as the json.load()ed document for the parts the tool reads
+    def __getitem__(self, key):
+        if key in DOCUMENT_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in DOCUMENT_KEYS else default
+
+# --- Incremental JSON reader ---
+class _Reader:
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        # Next non-whitespace character, or '' at end of input
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the current buffer")
+        self.pos += 1
+
+    def value(self, decoder=json.JSONDecoder()):
+        self.peek()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number ending at the buffer edge may continue in the next chunk,
+            # also when the edge splits it after a '.', 'e' or sign ("12." | "5")
+            at_edge = end == len(self.buf) or (isinstance(obj, (int, float)) and not self.buf[end:].strip(NUMBER_CHARS))
+            if at_edge and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def items(self):
+        # Yield the items of the array at the cursor one at a time
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == ']':
+                return
+            if sep != ',':
+                raise ValueError(f"Expected ',' or ']' in array, got {sep!r}")
+
+    def members(self):
+        # Yield the keys of the object at the cursor; the caller consumes each value
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            sep = self.peek()
+            self.pos += 1
+            if sep == '}':
+                return
+            if sep != ',':
+                raise ValueError(f"Expected ',' or '}}' in object, got {sep!r}")
+
+    def skip(self):
+        if self.peek() == '[':
+            for _ in self.items():
+                pass
+        else:
+            self.value()
+
+def current_event(events):
+    current = None
+    for event in events:
+        if event.get('is_current'):
+            return event['id']
+        if event.get('finished'):
+            current = event['id']
+    return current
+
+def stream_document(reader, source=None):
+    teams, event, elements, sections = [], None, [], {}
+    for key in reader.members():
+        if key == 'teams':
+            teams = reader.value()
+        elif key in ('game_settings', 'element_types', 'game_config'):
+            sections[key] = reader.value()
+        elif key == 'events':
+            event = current_event(list(reader.items()))
+        elif key == 'elements':
+            elements = [ElementRecord(element) for element in reader.items()]
+        else:
+            reader.skip()
+    return Snapshot(source, event, teams, elements, **sections)
+
+def iter_elements(path):
+    # Generator over the compact element records of a single bootstrap file
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f)
+        for key in reader.members():
+            if key == 'elements':
+                for element in reader.items():
+                    yield ElementRecord(element)
+            else:
+                reader.skip()
+
+def read_snapshot(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return stream_document(_Reader(f), source=path)
+
+def iter_snapshots(path):
+    # One Snapshot at a time from a bootstrap file, a JSON-lines / concatenated
+    # archive, or a directory of bootstrap files (in file name order)
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(('.json', '.jsonl')):
+                yield from iter_snapshots(os.path.join(path, name))
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f)
+        index = 0
+        while reader.peek():
+            yield stream_document(reader, source=f"{path}#{index}")
+            index += 1
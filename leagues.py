@@ -0,0 +1,108 @@
+# --- League Configs and Batch Generation ---
+# A league config names a league and the scoring weights it drafts by:
+#   {"name": "office", "weights": {"DEF": {"bonus": 0.05}, "FWD": {"xg": 0.35, "ppg": 0.35}}}
+# Weights override scoring.DEFAULT_WEIGHTS (or the --weights config) entry by
+# entry; "output" optionally names the page (default: <name>.html). A config
+# file holds one config or a list of them; a directory is read *.json file by
+# file in name order.
+#
+# Batch mode renders one page per league from a single parse of the snapshot.
+# The parent builds the rows, the score columns and the league maxima once;
+# worker processes are forked from it, so they read that state copy-on-write
+# instead of receiving a pickled copy (other platforms pickle it once per
+# worker). A league then only costs the re-weighting, its fixture/form
+# columns, the render and the write.
+import json
+import os
+import re
+import time
+
+import parallel
+import scoring
+from atomic import write_atomic
+
+# --- Configs ---
+def _slug(name):
+    return re.sub(r'[^A-Za-z0-9._-]+', '-', name).strip('-.') or 'league'
+
+def parse_config(config, base=None, source='config'):
+    # {'name', 'output', 'weights'} with weights merged and validated;
+    # raises ValueError on anything malformed
+    if not isinstance(config, dict):
+        raise ValueError(f"{source}: a league config must be a JSON object")
+    unknown = set(config) - {'name', 'output', 'weights'}
+    if unknown:
+        raise ValueError(f"{source}: unknown keys {', '.join(sorted(unknown))}")
+    name = config.get('name')
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError(f"{source}: 'name' must be a non-empty string")
+    output = config.get('output') or _slug(name) + '.html'
+    if not isinstance(output, str) or os.path.basename(output) != output:
+        raise ValueError(f"{source}: 'output' must be a plain file name")
+    try:
+        weights = scoring.merge_weights(config.get('weights'), base)
+    except ValueError as e:
+        raise ValueError(f"{source} ({name}): {e}") from None
+    return {'name': name, 'output': output, 'weights': weights}
+
+def _read_configs(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        loaded = json.load(f)
+    return [(f"{path}[{i}]", config) for i, config in enumerate(loaded)] if isinstance(loaded, list) else [(path, loaded)]
+
+def load_configs(path, base=None):
+    if os.path.isdir(path):
+        entries = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.json'):
+                entries.extend(_read_configs(os.path.join(path, name)))
+    else:
+        entries = _read_configs(path)
+    if not entries:
+        raise ValueError(f"{path}: no league configs")
+    configs = [parse_config(config, base, source) for source, config in entries]
+    outputs = [config['output'] for config in configs]
+    duplicates = sorted({output for output in outputs if outputs.count(output) > 1})
+    if duplicates:
+        raise ValueError(f"{path}: several leagues write {', '.join(duplicates)}")
+    return configs
+
+def load_weights(path):
+    # Weights of a single league config, for one-off runs
+    configs = load_configs(path)
+    if len(configs) != 1:
+        raise ValueError(f"{path}: expected one league config, found {len(configs)}")
+    return configs[0]['weights']
+
+# --- Batch Rendering ---
+# shared (read-only in the workers):
+#   rows            processed rows built once (draft_score gets replaced)
+#   score           callable(weights=...) -> draft scores in row order
+#   render          callable(rows) -> page HTML
+#   fixture_factors fixtures.add_fixture_scores factors, or None
+#   form            callable(weights) -> {id: form_score}, or None
+def league_rows(shared, weights):
+    rows = [dict(row, draft_score=int(score)) for row, score in zip(shared['rows'], shared['score'](weights=weights))]
+    if shared.get('fixture_factors') is not None:
+        for row, factor in zip(rows, shared['fixture_factors']):
+            row['fixture_score'] = round(row['draft_score'] * factor)
+    if shared.get('form') is not None:
+        form_scores = shared['form'](weights)
+        for row in rows:
+            row['form_score'] = form_scores.get(row['id'], 0)
+    return rows
+
+def _render_league(index):
+    start = time.perf_counter()
+    config = parallel.state['configs'][index]
+    html_content = parallel.state['shared']['render'](league_rows(parallel.state['shared'], config['weights']))
+    path = os.path.join(parallel.state['out_dir'], config['output'])
+    write_atomic(path, html_content)
+    return {'name': config['name'], 'path': path, 'seconds': round(time.perf_counter() - start, 3)}
+
+def render_leagues(shared, configs, out_dir, workers=None):
+    # [{'name', 'path', 'seconds'}] in config order
+    os.makedirs(out_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    with parallel.mapper(workers, shared=shared, configs=configs, out_dir=out_dir) as run:
+        return list(run(_render_league, range(len(configs))))
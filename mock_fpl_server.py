@@ -0,0 +1,252 @@
+# --- Local FPL API Stand-in ---
+# Serves /api/bootstrap-static/, /api/fixtures/ and
+# /api/element-summary/<id>/ from local files so fetcher.py can run fully
+# offline. Element summaries are replayed from a recordings directory
+# (<id>.json, as saved from the real endpoint) when one is given; otherwise
+# they are generated deterministically from the bootstrap file: a double
+# round-robin schedule over its teams with fixture difficulty from team
+# strength, plus per-gameweek history rows for finished gameweeks.
+#
+# Responses carry ETag and Last-Modified and answer conditional requests with
+# 304. --latency, --fail-rate, --throttle-rate and --max-requests-per-connection
+# inject the slowness, 503s, 429s and dropped keep-alive sockets the real API
+# produces, so retries and reconnects get exercised.
+import argparse
+import asyncio
+import email.utils
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+
+SUMMARY_ROUTE = re.compile(r'^/api/element-summary/(\d+)/?$')
+REASONS = {200: 'OK', 304: 'Not Modified', 404: 'Not Found', 405: 'Method Not Allowed',
+           429: 'Too Many Requests', 503: 'Service Unavailable'}
+MAX_HEADERS = 100
+
+# --- Generated Summaries ---
+def round_robin(team_ids):
+    # [(event, home, away)] for a double round-robin (circle method)
+    teams = list(team_ids)
+    if len(teams) % 2:
+        teams.append(None)
+    rounds = len(teams) - 1
+    schedule = []
+    for r in range(rounds):
+        for i in range(len(teams) // 2):
+            home, away = teams[i], teams[-1 - i]
+            if home is None or away is None:
+                continue
+            if (r + i) % 2:
+                home, away = away, home
+            schedule.append((r + 1, home, away))
+            schedule.append((r + 1 + rounds, away, home))
+        teams.insert(1, teams.pop())
+    return sorted(schedule)
+
+def generate_fixtures(bootstrap):
+    # The fixtures/ document for a generated schedule
+    teams = {team['id']: team for team in bootstrap['teams']}
+    events = {event['id']: event for event in bootstrap.get('events', [])}
+    fixtures = []
+    for fixture_id, (event, home, away) in enumerate(round_robin(sorted(teams)), 1):
+        fixtures.append({
+            'id': fixture_id, 'code': 2500000 + fixture_id, 'event': event,
+            'team_h': home, 'team_a': away, 'team_h_score': None, 'team_a_score': None,
+            'kickoff_time': events.get(event, {}).get('deadline_time'),
+            'finished': bool(events.get(event, {}).get('finished')),
+            'minutes': 0, 'provisional_start_time': False,
+            'event_name': events.get(event, {}).get('name', f"Gameweek {event}"),
+            'team_h_difficulty': teams[away].get('strength', 3),
+            'team_a_difficulty': teams[home].get('strength', 3),
+        })
+    return fixtures
+
+def generate_summaries(bootstrap, fixtures):
+    finished = [f for f in fixtures if f['finished']]
+    played = max(len({f['event'] for f in finished}), 1)
+
+    summaries = {}
+    for element in bootstrap['elements']:
+        team = element['team']
+        upcoming, history = [], []
+        for f in fixtures:
+            if team not in (f['team_h'], f['team_a']):
+                continue
+            is_home = f['team_h'] == team
+            if not f['finished']:
+                upcoming.append({
+                    key: f[key] for key in ('id', 'code', 'team_h', 'team_h_score', 'team_a', 'team_a_score', 'event',
+                                            'finished', 'minutes', 'provisional_start_time', 'kickoff_time', 'event_name')
+                } | {'is_home': is_home, 'difficulty': f['team_h_difficulty'] if is_home else f['team_a_difficulty']})
+                continue
+            # Season totals spread evenly over the finished gameweeks
+            history.append({
+                'element': element['id'], 'fixture': f['id'], 'round': f['event'], 'was_home': is_home,
+                'opponent_team': f['team_a'] if is_home else f['team_h'], 'kickoff_time': f['kickoff_time'],
+                'minutes': round(element.get('minutes', 0) / played),
+                'total_points': round(element.get('total_points', 0) / played),
+                'goals_scored': 0, 'assists': 0, 'value': element.get('now_cost', 0),
+                'expected_goals': f"{float(element.get('expected_goals', 0)) / played:.2f}",
+                'expected_assists': f"{float(element.get('expected_assists', 0)) / played:.2f}",
+            })
+        summaries[element['id']] = {'fixtures': upcoming, 'history': history, 'history_past': []}
+    return summaries
+
+# --- Responses ---
+def _entry(body):
+    return {
+        'body': body,
+        'gzip': gzip.compress(body, 6),
+        'etag': '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"',
+    }
+
+def load_responses(bootstrap_path, recordings=None):
+    with open(bootstrap_path, 'rb') as f:
+        raw = f.read()
+    bootstrap = json.loads(raw)
+    fixtures = generate_fixtures(bootstrap)
+    documents = generate_summaries(bootstrap, fixtures)
+    if recordings:
+        for name in os.listdir(recordings):
+            if name.endswith('.json') and name[:-5].isdigit():
+                with open(os.path.join(recordings, name), 'r', encoding='utf-8') as f:
+                    documents[int(name[:-5])] = json.load(f)
+    responses = {element_id: _entry(json.dumps(doc, separators=(',', ':')).encode('utf-8')) for element_id, doc in documents.items()}
+    return _entry(raw), _entry(json.dumps(fixtures, separators=(',', ':')).encode('utf-8')), responses
+
+def not_modified(entry, headers, last_modified):
+    if 'if-none-match' in headers:
+        return headers['if-none-match'] == entry['etag']
+    since = headers.get('if-modified-since')
+    if since:
+        try:
+            return email.utils.parsedate_to_datetime(since).timestamp() >= last_modified
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def respond(app, method, target, headers):
+    # (status, body, extra headers)
+    if method not in ('GET', 'HEAD'):
+        return 405, b'', {'Allow': 'GET, HEAD'}
+    roll = app['random'].random()
+    if roll < app['fail_rate']:
+        return 503, b'{"error":"unavailable"}', {}
+    if roll < app['fail_rate'] + app['throttle_rate']:
+        return 429, b'{"error":"slow down"}', {'Retry-After': '0'}
+    path = target.split('?', 1)[0]
+    match = SUMMARY_ROUTE.match(path)
+    if match:
+        entry = app['summaries'].get(int(match.group(1)))
+    elif path.rstrip('/') == '/api/bootstrap-static':
+        entry = app['bootstrap']
+    elif path.rstrip('/') == '/api/fixtures':
+        entry = app['fixtures']
+    else:
+        entry = None
+    if entry is None:
+        return 404, b'The game is being updated.', {}
+    extra = {'ETag': entry['etag'], 'Last-Modified': app['last_modified_header'], 'Content-Type': 'application/json'}
+    if not_modified(entry, headers, app['last_modified']):
+        return 304, b'', extra
+    if 'gzip' in headers.get('accept-encoding', ''):
+        extra['Content-Encoding'] = 'gzip'
+        return 200, entry['gzip'], extra
+    return 200, entry['body'], extra
+
+async def read_request(reader):
+    # (method, target, version, headers) or None at end of stream
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    parts = request_line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise ValueError('malformed request line')
+    headers = {}
+    for _ in range(MAX_HEADERS):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise ValueError('too many headers')
+    return parts[0], parts[1], parts[2], headers
+
+async def handle_connection(app, reader, writer):
+    served = 0
+    try:
+        while True:
+            request = await read_request(reader)
+            if request is None:
+                break
+            method, target, version, headers = request
+            if app['latency']:
+                await asyncio.sleep(app['latency'])
+            status, body, extra = respond(app, method, target, headers)
+            served += 1
+            app['requests'] += 1
+            app['statuses'][status] = app['statuses'].get(status, 0) + 1
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+            if app['max_requests'] and served >= app['max_requests']:
+                keep_alive = False
+            lines = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Length: {len(body)}",
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+            lines.extend(f"{name}: {value}" for name, value in extra.items())
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+            if method != 'HEAD':
+                writer.write(body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        pass
+    finally:
+        writer.close()
+
+def make_app(bootstrap_path, recordings=None, latency=0.0, fail_rate=0.0, throttle_rate=0.0, max_requests=0, seed=0):
+    bootstrap, fixtures, summaries = load_responses(bootstrap_path, recordings)
+    last_modified = int(os.path.getmtime(bootstrap_path))
+    return {
+        'bootstrap': bootstrap, 'fixtures': fixtures, 'summaries': summaries,
+        'last_modified': last_modified, 'last_modified_header': email.utils.formatdate(last_modified, usegmt=True),
+        'latency': latency, 'fail_rate': fail_rate, 'throttle_rate': throttle_rate, 'max_requests': max_requests,
+        'random': random.Random(seed), 'requests': 0, 'statuses': {},
+    }
+
+async def start(app, host='127.0.0.1', port=8766):
+    return await asyncio.start_server(lambda r, w: handle_connection(app, r, w), host, port, backlog=1024)
+
+async def serve(app, host, port):
+    server = await start(app, host, port)
+    print(f"Mock FPL API with {len(app['summaries'])} element summaries on http://{host}:{server.sockets[0].getsockname()[1]}/api/")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve recorded or generated FPL API responses locally.')
+    parser.add_argument('--bootstrap', default='FPL_Bootstrap_static.json', help='bootstrap-static JSON file to serve and derive summaries from')
+    parser.add_argument('--recordings', help='directory of recorded element-summary responses named <id>.json')
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind')
+    parser.add_argument('--port', type=int, default=8766, help='port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='share of requests answered 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests answered 429')
+    parser.add_argument('--max-requests-per-connection', type=int, default=0, help='close keep-alive connections after N requests (0: never)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for injected failures')
+    args = parser.parse_args(argv)
+    app = make_app(args.bootstrap, args.recordings, args.latency, args.fail_rate, args.throttle_rate,
+                   args.max_requests_per_connection, args.seed)
+    try:
+        asyncio.run(serve(app, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
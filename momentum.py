@@ -0,0 +1,337 @@
+# --- Price and Ownership Momentum Tracker ---
+# Follows transfers and ownership between bootstrap snapshots polled at short
+# intervals (typically every minute around a deadline). Snapshots come from a
+# directory that a fetch job drops files into, or from a bootstrap-static
+# endpoint (the real API or mock_fpl_server.py). Per player it keeps a ring
+# buffer of its last window + 1 observed changes of event net transfers
+# (transfers_in_event - transfers_out_event) and selected_by_percent. From it
+# come the page columns:
+#   net_transfers     event net transfers now
+#   transfer_momentum net transfers over the last `window` polls
+#   ownership_change  selected_by_percent change over the window (points)
+#   price_progress    net transfers since the last price change (or the
+#                     gameweek start) plus one more window at the current
+#                     momentum, as a % of `threshold` x the player's owners;
+#                     +-100 is where a rise / fall is predicted
+#   price_trend       1 predicted to rise, -1 to fall, 0 otherwise
+# The FPL price algorithm is not public; THRESHOLD is a rule of thumb.
+#
+# A poll diffs the snapshot against each player's last values (one pass over
+# the parsed elements) and only updates players that changed. A player's
+# window also moves when an old change ages out, so every change schedules one
+# re-score `window` polls later on a heap; beyond the scan a poll costs
+# O(changed + expired). A new gameweek resets the event counters, and so every
+# player, once a week.
+#
+# State is an append-only JSON-lines journal: a 'base' record holding every
+# player's ring buffer, then one 'poll' record per poll listing only the
+# changed players. Replaying it rebuilds the tracker exactly. It is rewritten
+# as a single base record every COMPACT_EVERY polls and at each new gameweek.
+import argparse
+import asyncio
+import heapq
+import json
+import os
+import sys
+import time
+
+import derived
+import fetcher
+from atomic import write_atomic
+from ingest import current_event
+
+WINDOW = 60
+THRESHOLD = 0.05
+COMPACT_EVERY = 500
+DEFAULT_TOTAL_PLAYERS = 10000000
+BOOTSTRAP_PATH = 'bootstrap-static/'
+EMPTY_STATS = {'net_transfers': 0, 'transfer_momentum': 0, 'ownership_change': 0.0, 'price_progress': 0.0, 'price_trend': 0}
+
+class RingBuffer:
+    # The newest `capacity` (poll, net transfers, selected %) observations
+    __slots__ = ('capacity', 'entries', 'head', 'size')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = [None] * capacity
+        self.head = 0
+        self.size = 0
+
+    def append(self, entry):
+        self.entries[self.head] = entry
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def newest_first(self):
+        for k in range(1, self.size + 1):
+            yield self.entries[(self.head - k) % self.capacity]
+
+    def latest(self):
+        return self.entries[(self.head - 1) % self.capacity] if self.size else None
+
+    def at(self, poll):
+        # Newest observation made at or before `poll`; the oldest kept one when
+        # the player was first seen later
+        entry = None
+        for entry in self.newest_first():
+            if entry[0] <= poll:
+                break
+        return entry
+
+    def to_list(self):
+        return list(reversed(list(self.newest_first())))
+
+class Tracker:
+    def __init__(self, window=WINDOW, threshold=THRESHOLD):
+        self.window = window
+        self.threshold = threshold
+        self.poll = 0
+        self.event = None
+        self.source = None
+        self.total_players = DEFAULT_TOTAL_PLAYERS
+        self.players = {}   # id -> {'last', 'cost', 'base_net', 'ring', 'stats'}
+        self.flags = {}     # id -> price_trend, for players predicted to move
+        self.expiry = []    # heap of (poll, id): re-score when a change leaves the window
+
+    # --- Polls ---
+    def diff(self, elements):
+        # {id: [net transfers, selected %, price, cost_change_event]} for players whose values moved
+        players = self.players
+        changes = {}
+        for e in elements:
+            value = [e.get('transfers_in_event', 0) - e.get('transfers_out_event', 0),
+                     float(e.get('selected_by_percent') or 0), e.get('now_cost', 0), e.get('cost_change_event', 0)]
+            p = players.get(e['id'])
+            if p is None or p['last'] != value:
+                changes[e['id']] = value
+        return changes
+
+    def observe(self, document, now=None, source=None):
+        # Applies one snapshot (None: unchanged since the last poll); returns
+        # (journal record, players re-scored)
+        record = {
+            'type': 'poll', 'poll': self.poll + 1, 'time': round(time.time() if now is None else now, 3),
+            'event': self.event, 'total_players': self.total_players, 'source': source, 'changes': {},
+        }
+        if document is not None:
+            record.update(event=current_event(document.get('events') or []), total_players=document.get('total_players'),
+                          changes=self.diff(document['elements']))
+        return record, self.apply(record)
+
+    def apply(self, record):
+        # Returns the number of players re-scored
+        self.poll = record['poll']
+        self.source = record.get('source') or self.source
+        self.total_players = record.get('total_players') or self.total_players
+        new_gameweek = bool(self.players) and record['event'] != self.event
+        self.event = record['event']
+        scored = set()
+        for pid, value in record['changes'].items():
+            pid = int(pid)
+            self._update(pid, value, new_gameweek)
+            scored.add(pid)
+        if new_gameweek:
+            self._reset_gameweek()
+            return len(self.players)
+        for pid in scored:
+            self._score(pid)
+        while self.expiry and self.expiry[0][0] <= self.poll:
+            _, pid = heapq.heappop(self.expiry)
+            if pid not in scored:
+                self._score(pid)
+                scored.add(pid)
+        return len(scored)
+
+    def _update(self, pid, value, new_gameweek):
+        p = self.players.get(pid)
+        if p is None:
+            # First sight: count from the gameweek start, or from now when
+            # the price already moved this gameweek
+            p = self.players[pid] = {'cost': value[2], 'base_net': value[0] if value[3] else 0,
+                                     'ring': RingBuffer(self.window + 1), 'stats': EMPTY_STATS}
+        elif value[2] != p['cost'] and not new_gameweek:
+            p['cost'] = value[2]
+            p['base_net'] = value[0]
+        p['last'] = value
+        p['ring'].append((self.poll, value[0], value[1]))
+        heapq.heappush(self.expiry, (self.poll + self.window, pid))
+
+    def _reset_gameweek(self):
+        # Event transfer counters restart: every window starts over from now
+        self.expiry = []
+        for pid, p in self.players.items():
+            net, selected, cost, _ = p['last']
+            p['cost'] = cost
+            p['base_net'] = 0
+            p['ring'] = RingBuffer(self.window + 1)
+            p['ring'].append((self.poll, net, selected))
+            self._score(pid)
+
+    def _score(self, pid):
+        p = self.players[pid]
+        _, net, selected = p['ring'].latest()
+        start = p['ring'].at(self.poll - self.window)
+        momentum = net - start[1]
+        owners = max(selected / 100 * self.total_players, 1)
+        progress = (net - p['base_net'] + momentum) / (self.threshold * owners)
+        trend = 1 if progress >= 1 else -1 if progress <= -1 else 0
+        p['stats'] = {
+            'net_transfers': net, 'transfer_momentum': momentum, 'ownership_change': round(selected - start[2], 2),
+            'price_progress': round(progress * 100, 1), 'price_trend': trend,
+        }
+        if trend:
+            self.flags[pid] = trend
+        else:
+            self.flags.pop(pid, None)
+
+    def stats(self, pid):
+        p = self.players.get(pid)
+        return p['stats'] if p else EMPTY_STATS
+
+    # --- Journal ---
+    def base_record(self):
+        return {
+            'type': 'base', 'window': self.window, 'threshold': self.threshold, 'poll': self.poll, 'event': self.event,
+            'source': self.source, 'total_players': self.total_players,
+            'players': {pid: {'last': p['last'], 'cost': p['cost'], 'base_net': p['base_net'], 'ring': p['ring'].to_list()}
+                        for pid, p in self.players.items()},
+        }
+
+    @classmethod
+    def from_base(cls, record):
+        tracker = cls(record['window'], record['threshold'])
+        tracker.poll = record['poll']
+        tracker.event = record['event']
+        tracker.source = record['source']
+        tracker.total_players = record['total_players']
+        for pid, saved in record['players'].items():
+            pid = int(pid)
+            ring = RingBuffer(tracker.window + 1)
+            for entry in saved['ring']:
+                ring.append(tuple(entry))
+                if entry[0] + tracker.window > tracker.poll:
+                    heapq.heappush(tracker.expiry, (entry[0] + tracker.window, pid))
+            tracker.players[pid] = {'last': saved['last'], 'cost': saved['cost'], 'base_net': saved['base_net'], 'ring': ring}
+            tracker._score(pid)
+        return tracker
+
+def load_journal(path, window=WINDOW, threshold=THRESHOLD):
+    # Tracker rebuilt from the journal (a new one when there is none). A torn
+    # last line from an interrupted append is ignored.
+    tracker = Tracker(window, threshold)
+    if not os.path.exists(path):
+        return tracker
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+    bases = [i for i, record in enumerate(records) if record['type'] == 'base']
+    if bases:
+        tracker = Tracker.from_base(records[bases[-1]])
+        records = records[bases[-1] + 1:]
+    for record in records:
+        tracker.apply(record)
+    return tracker
+
+def write_base(path, tracker):
+    write_atomic(path, json.dumps(tracker.base_record(), separators=(',', ':')) + '\n')
+
+def append_record(path, record):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+# --- Snapshot Sources ---
+def new_snapshots(directory, after=None):
+    # [(name, path)] of *.json snapshots sorting after `after`, oldest first
+    names = sorted(name for name in os.listdir(directory) if name.endswith('.json') and (after is None or name > after))
+    return [(name, os.path.join(directory, name)) for name in names]
+
+async def fetch_bootstrap(pool, etag=None):
+    # (document or None when unchanged, etag)
+    status, headers, body = await pool.get(BOOTSTRAP_PATH, {'If-None-Match': etag} if etag else None)
+    if status == 304:
+        return None, etag
+    if status != 200:
+        raise fetcher.FetchError(f"bootstrap-static: HTTP {status}", status)
+    return json.loads(body), headers.get('etag')
+
+# --- Watching ---
+def record_poll(path, tracker, document, now=None, source=None):
+    # Observes one snapshot and journals it; returns (record, players re-scored)
+    previous_event = tracker.event
+    record, scored = tracker.observe(document, now, source)
+    if tracker.poll == 1 or record['event'] != previous_event or tracker.poll % COMPACT_EVERY == 0:
+        write_base(path, tracker)
+    else:
+        append_record(path, record)
+    return record, scored
+
+def summary_line(tracker, record, scored, seconds):
+    rising = sum(1 for trend in tracker.flags.values() if trend > 0)
+    return (f"Poll {record['poll']} (GW {record['event']}): {len(record['changes'])} changed, {scored} re-scored "
+            f"in {seconds * 1000:.1f} ms; {rising} predicted to rise, {len(tracker.flags) - rising} to fall")
+
+async def watch(tracker, state_path, directory=None, base_url=None, interval=60.0, polls=0):
+    pool = fetcher.ConnectionPool(base_url, 1) if directory is None else None
+    etag = None
+    done = 0
+    try:
+        while not polls or done < polls:
+            if directory is not None:
+                batch = [(name, path, os.path.getmtime(path)) for name, path in new_snapshots(directory, tracker.source)]
+            else:
+                try:
+                    document, etag = await fetch_bootstrap(pool, etag)
+                except (OSError, ValueError, asyncio.TimeoutError, fetcher.FetchError) as e:
+                    print(f"Poll failed: {e}", file=sys.stderr)
+                    batch = []
+                else:
+                    # Unchanged (304) still counts as a poll: windows keep moving
+                    batch = [(None, document, None)]
+            for name, snapshot, mtime in batch:
+                if isinstance(snapshot, str):
+                    with open(snapshot, 'r', encoding='utf-8') as f:
+                        snapshot = json.load(f)
+                start = time.perf_counter()
+                record, scored = record_poll(state_path, tracker, snapshot, mtime, name)
+                print(summary_line(tracker, record, scored, time.perf_counter() - start))
+                done += 1
+                if polls and done >= polls:
+                    return
+            await asyncio.sleep(interval)
+    finally:
+        if pool:
+            pool.close()
+
+# --- Page Columns ---
+def add_momentum(processed_players, tracker):
+    for p in processed_players:
+        p.update(tracker.stats(p['id']))
+        p['quick_filters'] = derived.quick_filter_bits(p)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Track transfer and ownership momentum between frequent bootstrap snapshots.')
+    parser.add_argument('--from-dir', metavar='DIR', help='read new bootstrap snapshots (*.json, in name order) from DIR instead of polling the API')
+    parser.add_argument('--base-url', default=fetcher.BASE_URL, help='API root to poll (e.g. http://127.0.0.1:8766/api/ for mock_fpl_server.py)')
+    parser.add_argument('--state', default='momentum.jsonl', help='tracker journal (read on start, appended every poll)')
+    parser.add_argument('--interval', type=float, default=60.0, help='seconds between polls')
+    parser.add_argument('--polls', type=int, default=0, help='stop after N polls (0: run until interrupted)')
+    parser.add_argument('--window', type=int, default=WINDOW, help='polls covered by the rolling windows (new journals only)')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="net transfers, as a share of a player's owners, that move the price (new journals only)")
+    args = parser.parse_args(argv)
+
+    tracker = load_journal(args.state, args.window, args.threshold)
+    if tracker.poll:
+        write_base(args.state, tracker)  # drops a torn last line before appending
+    try:
+        asyncio.run(watch(tracker, args.state, args.from_dir, args.base_url, args.interval, args.polls))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
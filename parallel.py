@@ -0,0 +1,28 @@
+# --- Process Pools ---
+# Worker processes receive read-only state once, through the pool
+# initializer, instead of with every task; task functions read it from
+# `state`. Where fork is available the workers inherit it copy-on-write,
+# elsewhere it is pickled once per worker. With one worker the tasks run in
+# this process against the same state.
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+state = {}
+
+def _init_worker(shared):
+    state.clear()
+    state.update(shared)
+
+@contextlib.contextmanager
+def mapper(workers, **shared):
+    # Yields a map(fn, tasks) that sees `shared` in parallel.state; consume
+    # its results inside the with block
+    _init_worker(shared)
+    if workers <= 1:
+        yield map
+        return
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(shared,)) as pool:
+        yield pool.map
@@ -0,0 +1,105 @@
+# --- Player Data Payload ---
+# Columnar encoding of processed_players for the generated page: one array per
+# field, repeated strings (team, position, insights) replaced by indexes into a
+# field dictionary and booleans sent as 0/1, plus the per-column sort
+# permutations (player ids) from derived.sort_orders. The page decodes it back
+# into player objects. In external mode the payload is written as one file per
+# position next to the page plus a manifest, and fetched lazily by the page
+# (bundle.py writes the same files under content-hashed names).
+import json
+import os
+
+import derived
+from atomic import write_atomic
+
+DICTIONARY_FIELDS = ('team', 'position', 'insights')
+CHUNK_FIELD = 'position'
+CHUNK_ORDER = ['GKP', 'DEF', 'MID', 'FWD']
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+def payload_fields(players):
+    return list(players[0].keys()) if players else []
+
+def boolean_fields(players, fields):
+    return [f for f in fields if players and all(isinstance(p[f], bool) for p in players)]
+
+def build_dictionaries(players):
+    return {field: sorted({p[field] for p in players}) for field in DICTIONARY_FIELDS if players and field in players[0]}
+
+def encode_columns(players, fields, dictionaries, booleans):
+    lookups = {field: {value: i for i, value in enumerate(values)} for field, values in dictionaries.items()}
+    columns = {}
+    for field in fields:
+        if field in lookups:
+            index = lookups[field]
+            columns[field] = [index[p[field]] for p in players]
+        elif field in booleans:
+            columns[field] = [int(p[field]) for p in players]
+        else:
+            columns[field] = [p[field] for p in players]
+    return {'count': len(players), 'columns': columns}
+
+def encode_players(players):
+    # Self-contained payload, used when the data is inlined into the page
+    fields = payload_fields(players)
+    dictionaries = build_dictionaries(players)
+    booleans = boolean_fields(players, fields)
+    payload = {'fields': fields, 'dictionaries': dictionaries, 'booleans': booleans, 'orders': derived.sort_orders(players)}
+    payload.update(encode_columns(players, fields, dictionaries, booleans))
+    return payload
+
+def chunk_players(players):
+    chunks = {}
+    for p in players:
+        chunks.setdefault(p.get(CHUNK_FIELD), []).append(p)
+    ordered = [key for key in CHUNK_ORDER if key in chunks] + [key for key in chunks if key not in CHUNK_ORDER]
+    return [(key, chunks[key]) for key in ordered]
+
+def encode_chunks(players):
+    # (manifest without its 'chunks' list, [(position, chunk JSON, player count)])
+    fields = payload_fields(players)
+    dictionaries = build_dictionaries(players)
+    booleans = boolean_fields(players, fields)
+    manifest = {'fields': fields, 'dictionaries': dictionaries, 'booleans': booleans, 'count': len(players),
+                'orders': derived.sort_orders(players)}
+    chunks = [(key, _dumps(encode_columns(chunk, fields, dictionaries, booleans)), len(chunk)) for key, chunk in chunk_players(players)]
+    return manifest, chunks
+
+def write_payload(players, directory):
+    # Writes manifest.json plus players-<position>.json; returns the manifest
+    os.makedirs(directory, exist_ok=True)
+    manifest, chunks = encode_chunks(players)
+    manifest['chunks'] = []
+    for key, text, count in chunks:
+        filename = f"players-{key}.json"
+        write_atomic(os.path.join(directory, filename), text)
+        manifest['chunks'].append({'key': key, 'file': filename, 'count': count})
+    # The manifest goes last, so it never lists a chunk that is not there yet
+    write_atomic(os.path.join(directory, 'manifest.json'), _dumps(manifest))
+    return manifest
+
+def decode_players(payload):
+    # Python mirror of the page's decodeColumns(), for checks and tooling
+    dictionaries = payload.get('dictionaries', {})
+    booleans = set(payload.get('booleans', []))
+    columns = payload['columns']
+    players = []
+    for i in range(payload['count']):
+        p = {}
+        for field in payload['fields']:
+            value = columns[field][i]
+            if field in dictionaries:
+                value = dictionaries[field][value]
+            elif field in booleans:
+                value = bool(value)
+            p[field] = value
+        players.append(p)
+    return players
+
+def page_data_script(players=None, manifest_url=None):
+    # The `PLAYER_DATA` literal embedded in the page
+    if manifest_url is not None:
+        return _dumps({'manifest': manifest_url}).replace('</', '<\\/')
+    return _dumps({'payload': encode_players(players)}).replace('</', '<\\/')
@@ -0,0 +1,119 @@
+# --- Build Timings and Profiling ---
+# Per-stage wall times for a generator run plus optional cProfile output.
+# Stages are wrapped in `timer.stage(name)`; with timings off the timer is a
+# NullTimer whose stage() hands back one shared no-op context manager, so the
+# instrumented build costs a few attribute lookups per stage.
+#
+# Collapsed stacks ("root;caller;callee microseconds", the input format of
+# flamegraph.pl / speedscope / inferno) are rebuilt from the pstats caller
+# graph: each function's own time is split across its call paths in
+# proportion to the time each caller spent in it.
+import cProfile
+import json
+import marshal
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+from atomic import write_atomic
+from scoring import positions
+
+_NO_STAGE = nullcontext()
+
+class NullTimer:
+    enabled = False
+
+    def stage(self, name):
+        return _NO_STAGE
+
+class StageTimer:
+    enabled = True
+
+    def __init__(self, **details):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.details = details
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def summary(self, **extra):
+        result = {
+            'stages': {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            'total_seconds': round(time.perf_counter() - self.started, 6),
+        }
+        result.update(self.details)
+        result.update(extra)
+        return result
+
+def position_counts(all_players_elements):
+    counts = {}
+    for p in all_players_elements:
+        position = positions.get(p.get('element_type'), 'N/A')
+        counts[position] = counts.get(position, 0) + 1
+    return counts
+
+def write_summary(summary, target='-'):
+    # '-' prints one JSON line to stderr; anything else is a sidecar file
+    if target == '-':
+        print(json.dumps(summary, separators=(',', ':')), file=sys.stderr)
+        return
+    write_atomic(target, json.dumps(summary, indent=2))
+
+# --- cProfile ---
+def start_profiler():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def _label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+def collapsed_stacks(stats, min_microseconds=1):
+    # {"a;b;c": microseconds of self time} from a pstats.Stats caller graph
+    table = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in table.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            callees.setdefault(caller, []).append((func, edge_cumulative))
+    roots = [func for func, entry in table.items() if not any(caller in table for caller in entry[4])]
+    stacks = {}
+
+    def walk(func, path, share):
+        _, _, own, cumulative, _ = table[func]
+        path = path + (func,)
+        micros = round(own * share * 1e6)
+        if micros >= min_microseconds:
+            key = ';'.join(_label(f) for f in path)
+            stacks[key] = stacks.get(key, 0) + micros
+        for callee, edge_cumulative in callees.get(func, ()):
+            callee_cumulative = table[callee][3]
+            if callee in path or not callee_cumulative:
+                continue
+            callee_share = share * edge_cumulative / callee_cumulative
+            if callee_cumulative * callee_share * 1e6 >= min_microseconds:
+                walk(callee, path, callee_share)
+
+    for root in roots:
+        walk(root, (), 1.0)
+    return stacks
+
+def write_profile(profiler, pstats_path=None, collapsed_path=None):
+    profiler.disable()
+    stats = pstats.Stats(profiler)
+    if pstats_path:
+        # The bytes Stats.dump_stats writes, through the atomic writer
+        write_atomic(pstats_path, marshal.dumps(stats.stats))
+    if collapsed_path:
+        write_atomic(collapsed_path, ''.join(f"{stack} {micros}\n" for stack, micros in sorted(collapsed_stacks(stats).items())))
+    return stats
@@ -0,0 +1,193 @@
+# --- Monte Carlo Points Projection ---
+# Simulates FPL points over the next N gameweeks for every player and reports
+# the mean and percentiles of the total. Per player and gameweek:
+#   plays      Bernoulli(availability * start rate); availability from
+#              chance_of_playing_next_round, start rate from starts_per_90 and
+#              minutes against the most-used player in the pool
+#   minutes    average minutes per start (90 / starts_per_90, capped at 90)
+#   goals      Poisson(expected_goals_per_90 * minutes / 90), same for assists
+#   conceded   Poisson(expected_goals_conceded_per_90 * minutes / 90); a clean
+#              sheet when 0, and deductions per 2 conceded, both only when
+#              the player lasts 60 minutes
+#   saves      Poisson(saves_per_90 * minutes / 90), goalkeepers only
+# and points follow the game_config scoring rules for the player's position.
+# Not modelled: bonus points, cards, own goals, penalties and
+# defensive_contribution (game_config scores it, but the snapshot carries no
+# per-90 rate or threshold to simulate it from).
+#
+# Terms that are linear in the number of appearances are drawn once for the
+# whole horizon (Binomial appearances, Poisson goals/assists over them,
+# Binomial clean sheets for MID/FWD). Goals conceded and saves only score per
+# gameweek, so goalkeepers and defenders get per-gameweek draws.
+#
+# Simulations run in fixed-size batches, each with its own child of one
+# SeedSequence, so results depend on the seed only, not on the worker count.
+# Batches are spread over a process pool and return per-player histograms of
+# the total, which are summed for exact percentiles.
+import math
+import os
+
+try:
+    import numpy as np
+except ImportError:  # optional: only needed for projections
+    np = None
+
+import parallel
+from columnar import require_numpy
+from scoring import positions
+
+# FPL scoring for the simulated events, used when the snapshot has no game_config
+DEFAULT_SCORING = {
+    'long_play': 2,
+    'short_play': 1,
+    'goals_scored': {'GKP': 10, 'DEF': 6, 'MID': 5, 'FWD': 4},
+    'assists': 3,
+    'clean_sheets': {'GKP': 4, 'DEF': 4, 'MID': 1, 'FWD': 0},
+    'goals_conceded': {'GKP': -1, 'DEF': -1, 'MID': 0, 'FWD': 0},
+    'saves': 1,
+}
+LONG_PLAY_MINUTES = 60
+GOALS_CONCEDED_PER_PENALTY = 2
+SAVES_PER_POINT = 3
+PERCENTILES = (10, 50, 90)
+BATCH_SIZE = 2000
+# Histogram range of a total, per projected gameweek
+MIN_POINTS_PER_GAMEWEEK = -10
+MAX_POINTS_PER_GAMEWEEK = 40
+
+def scoring_rules(data):
+    scoring = ((data.get('game_config') or {}).get('scoring')) or {}
+    return {key: scoring.get(key, default) for key, default in DEFAULT_SCORING.items()}
+
+def _per_position(value, position):
+    return value.get(position, 0) if isinstance(value, dict) else value
+
+# --- Model Parameters ---
+def projection_params(all_players_elements, rules=None):
+    require_numpy()
+    rules = rules or DEFAULT_SCORING
+
+    def column(field, default=0.0):
+        return np.array([float(p.get(field) if p.get(field) is not None else default) for p in all_players_elements])
+
+    pos = [positions.get(p.get('element_type'), 'N/A') for p in all_players_elements]
+    starts_per_90 = column('starts_per_90')
+    starts = starts_per_90 * column('minutes') / 90
+    games = max(starts.max(initial=0), 1.0)
+    minutes = np.where(starts_per_90 > 0, np.minimum(90, 90 / np.maximum(starts_per_90, 1e-9)), 0)
+    long_play = minutes >= LONG_PLAY_MINUTES
+    scale = minutes / 90
+
+    def points(key):
+        return np.array([_per_position(rules[key], position) for position in pos], dtype=np.int64)
+
+    # Like clean sheets, goals conceded only cost points after 60 minutes
+    conceded_points = points('goals_conceded') * long_play
+
+    return {
+        'ids': [p['id'] for p in all_players_elements],
+        'play': column('chance_of_playing_next_round', 100) / 100 * np.minimum(1, starts / games),
+        'appearance': np.where(long_play, rules['long_play'], rules['short_play']).astype(np.int64),
+        'goals': column('expected_goals_per_90') * scale,
+        'assists': column('expected_assists_per_90') * scale,
+        'conceded': column('expected_goals_conceded_per_90') * scale,
+        'saves': column('saves_per_90') * scale * np.array([position == 'GKP' for position in pos]),
+        'goal_points': points('goals_scored'),
+        'assist_points': points('assists'),
+        'clean_sheet_points': points('clean_sheets') * long_play,
+        'conceded_points': conceded_points,
+        'save_points': points('saves'),
+        # Players whose points depend on per-gameweek conceded goals or saves
+        'per_gameweek': np.flatnonzero((conceded_points != 0) | ((column('saves_per_90') > 0) & (np.array(pos) == 'GKP'))),
+    }
+
+# --- Simulation ---
+def simulate_batch(params, seed, simulations, gameweeks):
+    # Totals for `simulations` runs as (simulations, players) int64
+    rng = np.random.default_rng(seed)
+    n = len(params['ids'])
+    shape = (simulations, n)
+    per_gw = params['per_gameweek']
+    linear = np.setdiff1d(np.arange(n), per_gw)
+
+    appearances = np.zeros(shape, dtype=np.int64)
+    totals = np.zeros(shape, dtype=np.int64)
+
+    # Goalkeepers/defenders: per-gameweek appearances, conceded goals and saves
+    if len(per_gw):
+        sub = {key: params[key][per_gw] for key in ('play', 'conceded', 'saves', 'clean_sheet_points', 'conceded_points', 'save_points')}
+        for _ in range(gameweeks):
+            plays = rng.random((simulations, len(per_gw))) < sub['play']
+            conceded = rng.poisson(sub['conceded'], (simulations, len(per_gw)))
+            saves = rng.poisson(sub['saves'], (simulations, len(per_gw)))
+            points = ((conceded == 0) * sub['clean_sheet_points']
+                      + (conceded // GOALS_CONCEDED_PER_PENALTY) * sub['conceded_points']
+                      + (saves // SAVES_PER_POINT) * sub['save_points'])
+            appearances[:, per_gw] += plays
+            totals[:, per_gw] += plays * points
+    if len(linear):
+        appearances[:, linear] = rng.binomial(gameweeks, params['play'][linear], (simulations, len(linear)))
+        clean_sheets = rng.binomial(appearances[:, linear], np.exp(-params['conceded'][linear]))
+        totals[:, linear] += clean_sheets * params['clean_sheet_points'][linear]
+
+    totals += appearances * params['appearance']
+    totals += rng.poisson(appearances * params['goals']) * params['goal_points']
+    totals += rng.poisson(appearances * params['assists']) * params['assist_points']
+    return totals
+
+def _bounds(gameweeks):
+    return MIN_POINTS_PER_GAMEWEEK * gameweeks, MAX_POINTS_PER_GAMEWEEK * gameweeks
+
+def histogram_batch(params, seed, simulations, gameweeks):
+    # (per-player point sums, (players, bins) histogram of clipped totals)
+    totals = simulate_batch(params, seed, simulations, gameweeks)
+    low, high = _bounds(gameweeks)
+    width = high - low + 1
+    n = totals.shape[1]
+    bins = np.clip(totals, low, high) - low + np.arange(n) * width
+    return totals.sum(axis=0), np.bincount(bins.ravel(), minlength=n * width).reshape(n, width)
+
+def _run_batch(task):
+    seed, simulations = task
+    return histogram_batch(parallel.state['params'], seed, simulations, parallel.state['gameweeks'])
+
+def project(all_players_elements, rules=None, gameweeks=5, simulations=100000, seed=0, workers=None):
+    # {'ids', 'mean', 'p10', 'p50', 'p90'}: total points over the next `gameweeks`
+    if gameweeks < 1 or simulations < 1:
+        raise ValueError(f"need at least one gameweek and one simulation, got {gameweeks} and {simulations}")
+    params = projection_params(all_players_elements, rules)
+    batches = math.ceil(simulations / BATCH_SIZE)
+    sizes = [min(BATCH_SIZE, simulations - i * BATCH_SIZE) for i in range(batches)]
+    tasks = list(zip(np.random.SeedSequence(seed).spawn(batches), sizes))
+    workers = min(workers or os.cpu_count() or 1, batches)
+
+    with parallel.mapper(workers, params=params, gameweeks=gameweeks) as run:
+        sums, histogram = _merge(run(_run_batch, tasks))
+
+    low, _ = _bounds(gameweeks)
+    cumulative = histogram.cumsum(axis=1)
+    result = {'ids': params['ids'], 'mean': (sums / simulations).tolist()}
+    for q in PERCENTILES:
+        # Smallest total whose cumulative share reaches q%
+        result[f'p{q}'] = ((cumulative < math.ceil(simulations * q / 100)).sum(axis=1) + low).tolist()
+    return result
+
+def _merge(results):
+    sums = histogram = None
+    for batch_sums, batch_histogram in results:
+        if sums is None:
+            sums, histogram = batch_sums, batch_histogram
+        else:
+            sums += batch_sums
+            histogram += batch_histogram
+    return sums, histogram
+
+def add_projections(processed_players, projection):
+    # proj_mean / proj_p10 / proj_p50 / proj_p90 columns on the processed rows
+    by_id = {player_id: i for i, player_id in enumerate(projection['ids'])}
+    for p in processed_players:
+        i = by_id.get(p['id'])
+        p['proj_mean'] = round(projection['mean'][i], 2) if i is not None else 0
+        for q in PERCENTILES:
+            p[f'proj_p{q}'] = projection[f'p{q}'][i] if i is not None else 0
+    return processed_players
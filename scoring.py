@@ -0,0 +1,155 @@
+# --- Normalization and Position-Specific Draft Score ---
+positions = {1: 'GKP', 2: 'DEF', 3: 'MID', 4: 'FWD'}
+
+def normalize_stat(value, max_value, reverse=False):
+    if max_value == 0: return 0
+    score = value / max_value
+    return (1 - score) if reverse else score
+
+# --- Per-snapshot statistics context ---
+# League-wide maxima are computed once per snapshot (a single pass over the
+# elements) and handed to the pure per-player scorer below. Per-position
+# counts/maxima/means live alongside them for position-relative scoring.
+CONTEXT_STATS = ['saves', 'clean_sheets', 'bps', 'ppg', 'bonus', 'ict_index', 'xg', 'xa', 'xGC', 'xGC_diff']
+
+def player_stats(p):
+    xGC = float(p.get('expected_goals_conceded', 0))
+    return {
+        'saves': p.get('saves', 0),
+        'clean_sheets': p.get('clean_sheets', 0),
+        'bps': p.get('bps', 0),
+        'ppg': float(p.get('points_per_game', 0)),
+        'bonus': p.get('bonus', 0),
+        'ict_index': float(p.get('ict_index', 0)),
+        'xg': float(p.get('expected_goals', 0)),
+        'xa': float(p.get('expected_assists', 0)),
+        'xGC': xGC,
+        'xGC_diff': xGC - p.get('goals_conceded', 0),
+    }
+
+def _league_maxima(by_position):
+    # Same defaults as max(..., default=1) on an empty pool; saves only count goalkeepers
+    max_stats = {}
+    for key in CONTEXT_STATS:
+        values = [bucket['max'][key] for bucket in by_position.values() if bucket['count']]
+        max_stats[key] = max(values, default=1)
+    max_stats['saves'] = by_position[1]['max']['saves'] if by_position.get(1, {}).get('count') else 1
+    return max_stats
+
+def _refresh_means(bucket):
+    bucket['mean'] = {key: total / bucket['count'] for key, total in bucket['sum'].items()} if bucket['count'] else {}
+
+def build_stats_context(all_players_elements):
+    by_position = {}
+    for p in all_players_elements:
+        pos = p.get('element_type')
+        bucket = by_position.setdefault(pos, {'count': 0, 'max': {}, 'sum': dict.fromkeys(CONTEXT_STATS, 0)})
+        bucket['count'] += 1
+        for key, value in player_stats(p).items():
+            if key not in bucket['max'] or value > bucket['max'][key]:
+                bucket['max'][key] = value
+            bucket['sum'][key] += value
+
+    for bucket in by_position.values():
+        _refresh_means(bucket)
+
+    return {'max': _league_maxima(by_position), 'positions': by_position}
+
+def update_stats_context(context, removed, added):
+    # Apply replaced/removed (old) and replacement/new (added) elements to a
+    # context in place. Returns False when a maximum may have dropped and the
+    # context has to be rebuilt with build_stats_context instead.
+    by_position = context['positions']
+    dropped = set()
+    touched = set()
+    for p in removed:
+        pos = p.get('element_type')
+        bucket = by_position[pos]
+        bucket['count'] -= 1
+        touched.add(pos)
+        for key, value in player_stats(p).items():
+            bucket['sum'][key] -= value
+            if value == bucket['max'][key]:
+                dropped.add((pos, key))
+    for p in added:
+        pos = p.get('element_type')
+        bucket = by_position.setdefault(pos, {'count': 0, 'max': {}, 'sum': dict.fromkeys(CONTEXT_STATS, 0)})
+        bucket['count'] += 1
+        touched.add(pos)
+        for key, value in player_stats(p).items():
+            bucket['sum'][key] += value
+            if key not in bucket['max'] or value > bucket['max'][key]:
+                bucket['max'][key] = value
+            if value == bucket['max'][key]:
+                dropped.discard((pos, key))
+    if dropped or any(not by_position[pos]['count'] for pos in touched):
+        return False
+    for pos in touched:
+        _refresh_means(by_position[pos])
+    context['max'] = _league_maxima(by_position)
+    return True
+
+# --- Scoring Weights ---
+# Per-position feature weights, summed in the order listed. 'unplayed' scores
+# players without minutes (on a 0-50 scale). League configs override single
+# entries through merge_weights; a feature not listed contributes nothing.
+DEFAULT_WEIGHTS = {
+    'GKP': {'saves': 0.30, 'clean_sheets': 0.25, 'bps': 0.15, 'ppg': 0.10, 'bonus': 0.05, 'xGC_diff': 0.15},
+    'DEF': {'ict_index': 0.20, 'clean_sheets': 0.40, 'xg_xa': 0.30, 'bps': 0.10,
+            'bonus': 0},  # Explicitly set to 0 as per user request
+    'MID': {'ict_index': 0.10, 'xg_xa': 0.40, 'bps': 0.15, 'ppg': 0.25, 'bonus': 0.10},
+    'FWD': {'xg': 0.30, 'ict_index': 0.15, 'bps': 0.15, 'ppg': 0.40},
+    'unplayed': {'price': 0.7, 'ict_index': 0.3},
+}
+# Weightable features: player_stats keys, plus xG + xA combined and price
+WEIGHT_FEATURES = ['saves', 'clean_sheets', 'bps', 'ppg', 'bonus', 'ict_index', 'xg', 'xa', 'xg_xa', 'xGC', 'xGC_diff', 'price']
+PRICE_SCALE = 130
+
+def merge_weights(overrides=None, base=None):
+    # {group: {feature: weight}} with overrides applied entry by entry; raises
+    # ValueError on unknown groups/features or non-numeric/negative weights
+    merged = {group: dict(weights) for group, weights in (base or DEFAULT_WEIGHTS).items()}
+    for group, weights in (overrides or {}).items():
+        if group not in merged:
+            raise ValueError(f"unknown weight group {group!r} (expected one of {', '.join(merged)})")
+        if not isinstance(weights, dict):
+            raise ValueError(f"weights for {group} must be an object of feature: weight")
+        for feature, weight in weights.items():
+            if feature not in WEIGHT_FEATURES:
+                raise ValueError(f"unknown feature {feature!r} in {group} weights")
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                raise ValueError(f"weight for {group}.{feature} must be a number, got {weight!r}")
+            if not 0 <= weight < float('inf'):
+                raise ValueError(f"weight for {group}.{feature} must be a non-negative finite number, got {weight!r}")
+            merged[group][feature] = weight
+    return merged
+
+def feature_score(player, stats, feature, max_stats):
+    # One normalised feature for calculate_draft_score (stats: player_stats(player))
+    if feature == 'xg_xa':
+        return normalize_stat(stats['xg'] + stats['xa'], max_stats['xg'] + max_stats['xa'])
+    if feature == 'price':
+        return normalize_stat(player.get('now_cost', 0), PRICE_SCALE)
+    return normalize_stat(stats[feature], max_stats[feature])
+
+def calculate_draft_score(player, context, weights=None):
+    weights = weights or DEFAULT_WEIGHTS
+    max_stats = context['max']
+
+    stats = player_stats(player)
+
+    score = 0
+    if player.get('minutes', 0) == 0:
+        for feature, weight in weights['unplayed'].items():
+            score += feature_score(player, stats, feature, max_stats) * weight
+        return round(score * 50)
+
+    position = positions.get(player.get('element_type'))
+    for feature, weight in weights.get(position, {}).items():
+        score += feature_score(player, stats, feature, max_stats) * weight
+    return round(score * 100)
+
+def score_players(all_players_elements, context=None, weights=None):
+    if context is None:
+        context = build_stats_context(all_players_elements)
+    return [calculate_draft_score(player, context, weights) for player in all_players_elements]
@@ -0,0 +1,302 @@
+# --- Local Server Mode ---
+# Keeps the parsed snapshot and processed players in memory and serves the
+# page plus JSON player queries over a small asyncio HTTP/1.1 server (stdlib
+# only, keep-alive, GET/HEAD). Queries run against indexes built once per
+# load: precomputed sort orders, position/team row sets, normalized names and
+# each player's JSON already encoded. A watcher polls the bootstrap file's
+# mtime/size, confirms a change by content hash, rebuilds off the event loop
+# and swaps the new state in; requests keep using the old state until then.
+#
+# Endpoints:
+#   GET /                     the generated page (gzip when accepted, ETag)
+#   GET /api/players          ?position=&team=&q=&min_price=&max_price=
+#                             &min_points=&min_selected=&quick=&sort=&order=
+#                             &offset=&limit=
+#   GET /api/players/<id>
+#   GET /api/meta             snapshot id, counts, sortable fields
+import argparse
+import asyncio
+import gzip
+import os
+import re
+import sys
+import time
+import unicodedata
+from urllib.parse import parse_qs, urlsplit
+
+import create_ultimate_tool_v2 as tool
+import derived
+import ingest
+import snapshot_cache
+from payload import _dumps
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_HEADERS = 100
+SORTABLE = ['name'] + derived.SORT_FIELDS
+LETTER_FOLDS = str.maketrans(derived.LETTER_FOLDS)
+MARKS = re.compile('[\u0300-\u036f\u0591-\u05c7]')
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+class QueryError(ValueError):
+    pass
+
+def normalize_text(text):
+    # Same folding as the page's search box
+    return MARKS.sub('', unicodedata.normalize('NFD', text)).lower().translate(LETTER_FOLDS)
+
+# --- State ---
+def file_signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+def build_state(path, engine='python'):
+    signature = file_signature(path)
+    digest = snapshot_cache.content_hash(path)
+    data = tool.load_data(path)
+    players = tool.build_processed_players(data, engine)
+    page = tool.generate_html(players).encode('utf-8')
+    orders = {field: [i for i, _ in sorted(enumerate(players), key=lambda item: -(item[1][field] or 0))] for field in derived.SORT_FIELDS}
+    orders['name'] = sorted(range(len(players)), key=lambda i: normalize_text(players[i]['name']))
+    groups = {'position': {}, 'team': {}}
+    for i, p in enumerate(players):
+        for field, index in groups.items():
+            index.setdefault(p[field], set()).add(i)
+    return {
+        'source': path,
+        'signature': signature,
+        'hash': digest,
+        'event': data.event if isinstance(data, ingest.Snapshot) else ingest.current_event(data.get('events') or []),
+        'loaded_at': time.time(),
+        'players': players,
+        'by_id': {p['id']: i for i, p in enumerate(players)},
+        'encoded': [_dumps(p) for p in players],
+        'names': [normalize_text(p['name']) for p in players],
+        'groups': groups,
+        'orders': orders,
+        'page': page,
+        'page_gzip': gzip.compress(page, 6),
+        # One validator per representation: the gzip body is different bytes
+        'etag': f'"{digest}"',
+        'etag_gzip': f'"{digest}-gzip"',
+    }
+
+# --- Queries ---
+def _param(params, name, convert=str, default=None):
+    values = params.get(name)
+    if not values or values[-1] == '':
+        return default
+    try:
+        return convert(values[-1])
+    except ValueError:
+        raise QueryError(f"invalid {name}: {values[-1]!r}")
+
+def query_players(state, params):
+    # (total matches, encoded rows for the requested page)
+    players = state['players']
+    sort = _param(params, 'sort', default='draft_score')
+    if sort not in state['orders']:
+        raise QueryError(f"unknown sort field {sort!r}; one of {', '.join(SORTABLE)}")
+    order = _param(params, 'order', default='asc' if sort == 'name' else 'desc')
+    if order not in ('asc', 'desc'):
+        raise QueryError("order must be asc or desc")
+    offset = max(_param(params, 'offset', int, 0), 0)
+    limit = min(max(_param(params, 'limit', int, DEFAULT_LIMIT), 0), MAX_LIMIT)
+
+    allowed = None
+    for field in ('position', 'team'):
+        value = _param(params, field)
+        if value is not None:
+            rows = state['groups'][field].get(value, set())
+            allowed = rows if allowed is None else allowed & rows
+    quick = _param(params, 'quick')
+    quick_bit = derived.QUICK_FILTER_BITS.get(quick) if quick else 0
+    if quick and not quick_bit:
+        raise QueryError(f"unknown quick filter {quick!r}")
+    query = normalize_text(_param(params, 'q', default=''))
+    min_price = _param(params, 'min_price', float, 0.0)
+    max_price = _param(params, 'max_price', float, float('inf'))
+    min_points = _param(params, 'min_points', int, None)
+    min_selected = _param(params, 'min_selected', float, None)
+
+    names = state['names']
+    ordered = state['orders'][sort]
+    if order != ('asc' if sort == 'name' else 'desc'):
+        ordered = reversed(ordered)
+    matches = []
+    for i in ordered:
+        if allowed is not None and i not in allowed:
+            continue
+        p = players[i]
+        if not min_price <= p['price'] <= max_price:
+            continue
+        if min_points is not None and p['total_points'] < min_points:
+            continue
+        if min_selected is not None and p['selected_percent'] < min_selected:
+            continue
+        if quick_bit and not p['quick_filters'] & quick_bit:
+            continue
+        if query and query not in names[i]:
+            continue
+        matches.append(i)
+    encoded = state['encoded']
+    return len(matches), [encoded[i] for i in matches[offset:offset + limit]], offset, limit
+
+def players_response(state, params):
+    total, rows, offset, limit = query_players(state, params)
+    return f'{{"total":{total},"offset":{offset},"limit":{limit},"players":[{",".join(rows)}]}}'
+
+def meta_response(state):
+    return _dumps({
+        'source': os.path.basename(state['source']),
+        'hash': state['hash'],
+        'event': state['event'],
+        'loaded_at': state['loaded_at'],
+        'count': len(state['players']),
+        'positions': {key: len(rows) for key, rows in state['groups']['position'].items()},
+        'teams': sorted(state['groups']['team']),
+        'sort_fields': SORTABLE,
+        'quick_filters': list(derived.QUICK_FILTER_BITS),
+    })
+
+# --- HTTP ---
+def route(app, method, target, headers):
+    # (status, content type, body bytes, extra headers)
+    if method not in ('GET', 'HEAD'):
+        return 405, 'application/json', b'{"error":"method not allowed"}', {'Allow': 'GET, HEAD'}
+    state = app['state']
+    url = urlsplit(target)
+    path = url.path.rstrip('/') or '/'
+    json_type = 'application/json; charset=utf-8'
+    try:
+        if path in ('/', '/index.html'):
+            gzipped = 'gzip' in headers.get('accept-encoding', '')
+            etag = state['etag_gzip'] if gzipped else state['etag']
+            extra = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+            if etag in (tag.strip() for tag in headers.get('if-none-match', '').split(',')):
+                return 304, None, b'', extra
+            if gzipped:
+                extra['Content-Encoding'] = 'gzip'
+                return 200, 'text/html; charset=utf-8', state['page_gzip'], extra
+            return 200, 'text/html; charset=utf-8', state['page'], extra
+        if path == '/api/players':
+            return 200, json_type, players_response(state, parse_qs(url.query)).encode('utf-8'), {}
+        if path.startswith('/api/players/'):
+            player_id = path[len('/api/players/'):]
+            i = state['by_id'].get(int(player_id)) if player_id.isdigit() else None
+            if i is None:
+                return 404, json_type, b'{"error":"no such player"}', {}
+            return 200, json_type, state['encoded'][i].encode('utf-8'), {}
+        if path == '/api/meta':
+            return 200, json_type, meta_response(state).encode('utf-8'), {}
+    except QueryError as e:
+        return 400, json_type, _dumps({'error': str(e)}).encode('utf-8'), {}
+    return 404, json_type, b'{"error":"not found"}', {}
+
+async def read_request(reader):
+    # (method, target, version, headers) or None at end of stream
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    parts = request_line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise QueryError('malformed request line')
+    headers = {}
+    for _ in range(MAX_HEADERS):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise QueryError('too many headers')
+    return parts[0], parts[1], parts[2], headers
+
+async def handle_connection(app, reader, writer):
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except (QueryError, ValueError):
+                request = ('GET', None, 'HTTP/1.0', {})
+            if request is None:
+                break
+            method, target, version, headers = request
+            if target is None:
+                status, content_type, body, extra = 400, 'application/json', b'{"error":"bad request"}', {}
+            else:
+                status, content_type, body, extra = route(app, method, target, headers)
+            app['requests'] += 1
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close' and target is not None
+            lines = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Length: {len(body)}",
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+            if content_type:
+                lines.append(f"Content-Type: {content_type}")
+            lines.extend(f"{name}: {value}" for name, value in extra.items())
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+            if method != 'HEAD':
+                writer.write(body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        pass
+    finally:
+        writer.close()
+
+# --- Hot Reload ---
+async def watch_snapshot(app, interval):
+    loop = asyncio.get_running_loop()
+    seen = app['state']['signature']
+    while True:
+        await asyncio.sleep(interval)
+        state = app['state']
+        try:
+            signature = file_signature(state['source'])
+        except OSError:
+            continue
+        if signature == seen:
+            continue
+        seen = signature
+        try:
+            digest = await loop.run_in_executor(None, snapshot_cache.content_hash, state['source'])
+            if digest == state['hash']:
+                continue
+            fresh = await loop.run_in_executor(None, build_state, state['source'], app['engine'])
+        except Exception as e:
+            # Half-written, broken or wrongly shaped file: keep serving the
+            # previous snapshot and keep watching
+            print(f"Reload of {state['source']} failed, keeping the loaded snapshot: {e}", file=sys.stderr)
+            continue
+        app['state'] = fresh
+        app['reloads'] += 1
+        print(f"Reloaded {fresh['source']} ({len(fresh['players'])} players, gameweek {fresh['event']})")
+
+async def serve(path, host='127.0.0.1', port=8000, engine='python', interval=2.0):
+    app = {'state': build_state(path, engine), 'engine': engine, 'reloads': 0, 'requests': 0}
+    server = await asyncio.start_server(lambda r, w: handle_connection(app, r, w), host, port, backlog=1024)
+    print(f"Serving {path} ({len(app['state']['players'])} players) on http://{host}:{server.sockets[0].getsockname()[1]}/")
+    watcher = asyncio.create_task(watch_snapshot(app, interval))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the FPL draft tool page and player queries from memory.')
+    parser.add_argument('--input', default='FPL_Bootstrap_static.json', help='bootstrap-static JSON file to serve and watch')
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on')
+    parser.add_argument('--engine', choices=sorted(tool.ENGINES), default='python', help='draft score engine')
+    parser.add_argument('--poll', type=float, default=2.0, help='seconds between checks of the input for changes')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.input, args.host, args.port, args.engine, args.poll))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+# --- Player Similarity and Replacements ---
+# Like-for-like replacement search: each player becomes a stat vector over the
+# fields calculate_draft_score reads (which ones depends on the position),
+# z-scored within the position, and the nearest neighbours in that space with
+# a lower price are its replacements. Computed once per build and shipped with
+# the rows, so the page never compares players pairwise.
+#
+# Index backends (BACKENDS) are built from (vectors, costs) and share one
+# query, neighbours(row, k, max_cost):
+#   exact - full scan per query (numpy matrix rows when available); the
+#           right choice for one season's pool
+#   lsh   - random-hyperplane hashing over several tables, candidates re-ranked
+#           by true distance; for multi-season pools where n^2 scans get
+#           slow. Hash width grows with the pool so buckets stay around
+#           LSH_BUCKET players and a query costs about the same at any size.
+#           Falls back to a scan when a query's buckets hold fewer than k
+#           affordable players, so every query still gets k results.
+import bisect
+import heapq
+import math
+import random
+
+from scoring import player_stats, positions
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Vector features per position (keys of scoring.player_stats)
+FEATURES = {
+    'GKP': ['saves', 'clean_sheets', 'bps', 'ppg', 'ict_index'],
+    'DEF': ['xg', 'xa', 'clean_sheets', 'bps', 'ppg', 'ict_index'],
+    'MID': ['xg', 'xa', 'bps', 'ppg', 'ict_index'],
+    'FWD': ['xg', 'xa', 'bps', 'ppg', 'ict_index'],
+}
+LSH_TABLES = 8
+LSH_BUCKET = 32
+
+# --- Vectors ---
+def position_vectors(all_players_elements):
+    # {position: (element ids, costs, vectors)} with z-scored features
+    grouped = {}
+    for p in all_players_elements:
+        position = positions.get(p.get('element_type'))
+        if position not in FEATURES:
+            continue
+        stats = player_stats(p)
+        ids, costs, raw = grouped.setdefault(position, ([], [], []))
+        ids.append(p['id'])
+        costs.append(p.get('now_cost', 0))
+        raw.append([float(stats[feature]) for feature in FEATURES[position]])
+    for ids, costs, raw in grouped.values():
+        if not raw:
+            continue
+        for j in range(len(raw[0])):
+            column = [vector[j] for vector in raw]
+            mean = sum(column) / len(column)
+            std = math.sqrt(sum((value - mean) ** 2 for value in column) / len(column)) or 1.0
+            for vector in raw:
+                vector[j] = (vector[j] - mean) / std
+    return grouped
+
+def _distance(a, b):
+    return sum((x - y) ** 2 for x, y in zip(a, b))
+
+# --- Backends ---
+class ExactIndex:
+    # Rows kept in cost order, so a query only scans the affordable prefix
+    def __init__(self, vectors, costs, seed=0):
+        self.vectors = vectors
+        self.order = sorted(range(len(costs)), key=lambda i: costs[i])
+        self.sorted_costs = [costs[i] for i in self.order]
+        if np is not None and vectors:
+            self.matrix = np.asarray(vectors, dtype=np.float64)
+            self.ordered = self.matrix[self.order]
+            self.order_array = np.asarray(self.order)
+
+    def affordable(self, max_cost):
+        return bisect.bisect_right(self.sorted_costs, max_cost)
+
+    def neighbours(self, row, k, max_cost):
+        # [(squared distance, row)] for the k nearest other rows costing <= max_cost
+        count = self.affordable(max_cost)
+        if count == 0:
+            return []
+        if np is not None:
+            distances = ((self.ordered[:count] - self.matrix[row]) ** 2).sum(axis=1)
+            rows = self.order_array[:count]
+            distances[rows == row] = np.inf
+            take = min(k, count - int((rows == row).any()))
+            if take <= 0:
+                return []
+            nearest = np.argpartition(distances, take - 1)[:take]
+            return sorted((float(distances[i]), int(rows[i])) for i in nearest)
+        vector = self.vectors[row]
+        return heapq.nsmallest(k, ((_distance(vector, self.vectors[i]), i) for i in self.order[:count] if i != row))
+
+class LSHIndex:
+    # Indexes distinct vectors (zero-minute players all share one) with their
+    # players kept in cost order, so a dense cluster costs one candidate
+    def __init__(self, vectors, costs, seed=0, tables=LSH_TABLES, bucket=LSH_BUCKET):
+        rng = random.Random(seed)
+        groups = {}
+        for i, vector in enumerate(vectors):
+            groups.setdefault(tuple(vector), []).append(i)
+        self.points = [list(point) for point in groups]
+        self.members = [sorted(rows, key=lambda i: costs[i]) for rows in groups.values()]
+        self.member_costs = [[costs[i] for i in rows] for rows in self.members]
+        self.point_of = [0] * len(vectors)
+        for point, rows in enumerate(self.members):
+            for i in rows:
+                self.point_of[i] = point
+        self.exact = ExactIndex(vectors, costs)
+        self.matrix = np.asarray(self.points, dtype=np.float64) if np is not None and vectors else None
+
+        dims = len(vectors[0]) if vectors else 0
+        bits = max(1, int(math.log2(max(len(self.points), 2) / bucket)))
+        self.keys = []
+        for _ in range(tables):
+            planes = [[rng.gauss(0, 1) for _ in range(dims)] for _ in range(bits)]
+            self.keys.append(self._keys(planes))
+        self.buckets = []
+        for keys in self.keys:
+            buckets = {}
+            for point, key in enumerate(keys):
+                buckets.setdefault(key, []).append(point)
+            self.buckets.append(buckets)
+        if self.matrix is not None:
+            self.buckets = [{key: np.asarray(points) for key, points in buckets.items()} for buckets in self.buckets]
+            self.cheapest = np.asarray([point_costs[0] for point_costs in self.member_costs])
+
+    def _keys(self, planes):
+        # One bit per plane, split at the median projection rather than at the
+        # origin so each bit halves the pool even where players bunch up
+        if self.matrix is not None:
+            projections = self.matrix @ np.asarray(planes).T
+            bits = projections >= np.median(projections, axis=0)
+            return (bits @ (1 << np.arange(len(planes) - 1, -1, -1))).tolist()
+        keys = [0] * len(self.points)
+        for plane in planes:
+            projections = [sum(a * b for a, b in zip(plane, point)) for point in self.points]
+            median = sorted(projections)[len(projections) // 2]
+            keys = [(key << 1) | (value >= median) for key, value in zip(keys, projections)]
+        return keys
+
+    def neighbours(self, row, k, max_cost):
+        # Few affordable players anywhere: hashing would not find k of them
+        if self.exact.affordable(max_cost) <= len(self.keys) * k:
+            return self.exact.neighbours(row, k, max_cost)
+        own = self.point_of[row]
+        if self.matrix is not None:
+            # A point can sit in the same bucket in several tables; every
+            # surviving point has an affordable player, so the walk below
+            # needs at most k + 1 distinct points and only that many
+            # (times the duplicates) get sorted
+            candidates = np.concatenate([buckets[keys[own]] for keys, buckets in zip(self.keys, self.buckets)])
+            candidates = candidates[self.cheapest[candidates] <= max_cost]
+            distances = ((self.matrix[candidates] - self.matrix[own]) ** 2).sum(axis=1)
+            head = min(len(candidates), (k + 1) * len(self.keys))
+            if head < len(candidates):
+                nearest = np.argpartition(distances, head - 1)[:head]
+                candidates, distances = candidates[nearest], distances[nearest]
+            order = np.argsort(distances, kind='stable')
+            ranked = zip(distances[order].tolist(), candidates[order].tolist())
+        else:
+            candidates = set()
+            for keys, buckets in zip(self.keys, self.buckets):
+                candidates.update(buckets[keys[own]])
+            ranked = sorted((_distance(self.points[own], self.points[point]), point) for point in candidates)
+        found = []
+        seen = set()
+        for distance, point in ranked:
+            if point in seen:
+                continue
+            seen.add(point)
+            # Affordable members, priciest first: closest in price among equals
+            members = self.members[point]
+            for j in range(bisect.bisect_right(self.member_costs[point], max_cost) - 1, -1, -1):
+                if members[j] != row:
+                    found.append((distance, members[j]))
+                    if len(found) == k:
+                        return found
+        return self.exact.neighbours(row, k, max_cost)
+
+BACKENDS = {
+    'exact': ExactIndex,
+    'lsh': LSHIndex,
+}
+
+# --- Replacements ---
+def replacements(all_players_elements, k=5, max_price=None, backend='exact', seed=0):
+    # {player id: [replacement ids, most similar first]}. Replacements play the
+    # same position and cost less than the player, and no more than max_price
+    # when one is given.
+    cap = None if max_price is None else int(round(max_price * 10))
+    result = {}
+    for ids, costs, vectors in position_vectors(all_players_elements).values():
+        index = BACKENDS[backend](vectors, costs, seed)
+        for row, cost in enumerate(costs):
+            found = index.neighbours(row, k, cost - 1 if cap is None else min(cost - 1, cap))
+            result[ids[row]] = [ids[i] for _, i in found]
+    return result
+
+def add_similar(processed_players, all_players_elements, k=5, max_price=None, backend='exact'):
+    similar = replacements(all_players_elements, k, max_price, backend)
+    for p in processed_players:
+        p['similar'] = similar.get(p['id'], [])
@@ -0,0 +1,288 @@
+# --- Squad Solver ---
+# Best legal draft squads over processed_players: positional quotas, budget and
+# per-team cap from the bootstrap `game_settings` / `element_types`, maximizing
+# draft_score (or any numeric column). Locked players are forced in, excluded
+# players are dropped, and the top-K distinct squads come back best first.
+#
+# Exact path: dominated players are pruned per position, then a depth-first
+# branch and bound picks players position by position. Its bound is a
+# knapsack table of the best completion for every (position, candidate index,
+# picks left, budget left) that ignores only the team cap, so it is tight and
+# cheap to look up. If the exact search runs past its time limit, a beam search
+# guided by the same table fills in.
+import heapq
+import time
+
+from scoring import positions
+
+DEFAULT_RULES = {
+    'budget': 1000,
+    'squad_size': 15,
+    'team_limit': 3,
+    'quotas': {'GKP': 2, 'DEF': 5, 'MID': 5, 'FWD': 3},
+}
+NEG = float('-inf')
+EPSILON = 1e-9
+
+# --- Rules ---
+def squad_rules(data):
+    # Limits from the bootstrap document (budget in tenths, like now_cost)
+    settings = data.get('game_settings') or {}
+    quotas = {}
+    for element_type in data.get('element_types') or []:
+        if 'squad_select' in element_type:
+            quotas[positions.get(element_type['id'], element_type.get('singular_name_short'))] = element_type['squad_select']
+    quotas = quotas or dict(DEFAULT_RULES['quotas'])
+    return {
+        'budget': settings.get('squad_total_spend', DEFAULT_RULES['budget']),
+        'squad_size': settings.get('squad_squadsize', sum(quotas.values())),
+        'team_limit': settings.get('squad_team_limit', DEFAULT_RULES['team_limit']),
+        'quotas': quotas,
+    }
+
+# --- Model ---
+def check_objective(players, objective):
+    # The objective must be a numeric row column (missing values count as 0)
+    values = [p.get(objective) for p in players]
+    if all(v is None for v in values):
+        raise ValueError(f"'{objective}' is not a player column")
+    if any(isinstance(v, bool) or not isinstance(v, (int, float)) for v in values if v is not None):
+        raise ValueError(f"'{objective}' is not a numeric column")
+
+def prepare(players, rules=None, objective='draft_score'):
+    # Sorted per-position candidates (value, cost, team, id, position), reusable across
+    # solves with different locks and exclusions
+    check_objective(players, objective)
+    rules = rules or DEFAULT_RULES
+    by_position = {pos: [] for pos in rules['quotas']}
+    for p in players:
+        if p['position'] in by_position:
+            by_position[p['position']].append((p.get(objective) or 0, int(round(p['price'] * 10)), p['team'], p['id'], p['position']))
+    for candidates in by_position.values():
+        candidates.sort(key=lambda c: (-c[0], c[1], c[3]))
+    return {'rules': rules, 'objective': objective, 'positions': by_position}
+
+def prune_dominated(candidates, quota, full_teams, top_k):
+    # A player can be swapped for a cheaper-or-equal, scoring-or-equal one from
+    # another team unless at most quota - 1 of those are already picked and
+    # every other one is on a full team. With enough distinct teams among the
+    # dominators, any squad holding the player has `top_k` better alternatives.
+    needed = quota - 1 + full_teams + top_k
+    ordered = sorted(candidates, key=lambda c: (c[1], -c[0], c[3]))
+    kept = []
+    for i, c in enumerate(ordered):
+        teams = set()
+        for d in ordered[:i]:
+            if d[0] >= c[0]:
+                teams.add(d[2])
+                if len(teams) >= needed:
+                    break
+        if len(teams) < needed:
+            kept.append(c)
+    kept.sort(key=lambda c: (-c[0], c[1], c[3]))
+    return kept
+
+def _apply_locks(model, locked, excluded, top_k):
+    rules = model['rules']
+    locked, excluded = set(locked), set(excluded)
+    if locked & excluded:
+        raise ValueError(f"players both locked and excluded: {sorted(locked & excluded)}")
+    quotas = dict(rules['quotas'])
+    budget = rules['budget']
+    counts = {}
+    fixed, value = [], 0
+    pools = {}
+    for pos, candidates in model['positions'].items():
+        pool = []
+        for c in candidates:
+            if c[3] in locked:
+                fixed.append(c)
+                value += c[0]
+                budget -= c[1]
+                quotas[pos] -= 1
+                counts[c[2]] = counts.get(c[2], 0) + 1
+            elif c[3] not in excluded:
+                pool.append(c)
+        pools[pos] = pool
+    missing = locked - {c[3] for c in fixed}
+    if missing:
+        raise ValueError(f"locked players not in the pool: {sorted(missing)}")
+    over = [pos for pos, need in quotas.items() if need < 0]
+    if over:
+        raise ValueError(f"too many locked players for {', '.join(over)}")
+    if budget < 0:
+        raise ValueError(f"locked players cost {rules['budget'] - budget} of a {rules['budget']} budget")
+    if any(n > rules['team_limit'] for n in counts.values()):
+        raise ValueError(f"locked players exceed the {rules['team_limit']}-per-team limit")
+
+    full_teams = (rules['squad_size'] - 1) // rules['team_limit']
+    order = sorted((pos for pos in quotas if quotas[pos] > 0), key=lambda pos: quotas[pos])
+    pools = [prune_dominated(pools[pos], quotas[pos], full_teams, top_k) for pos in order]
+    return {
+        'order': order,
+        'quotas': [quotas[pos] for pos in order],
+        'pools': pools,
+        'budget': budget,
+        'counts': counts,
+        'fixed': fixed,
+        'value': value,
+    }
+
+# --- Completion Bound ---
+def completion_tables(pools, quotas, budget):
+    # tables[i][j][k][b]: best value choosing k players from pools[i][j:] plus
+    # filling every later position, within budget b (team cap ignored)
+    tables = [None] * len(pools)
+    after = [0] * (budget + 1)
+    for i in range(len(pools) - 1, -1, -1):
+        pool, quota = pools[i], quotas[i]
+        empty = [NEG] * (budget + 1)
+        rows = [None] * (len(pool) + 1)
+        rows[len(pool)] = [after] + [empty] * quota
+        for j in range(len(pool) - 1, -1, -1):
+            value, cost = pool[j][0], pool[j][1]
+            nxt = rows[j + 1]
+            row = [after]
+            for k in range(1, quota + 1):
+                if k > len(pool) - j:
+                    row.append(empty)
+                    continue
+                skip, take = nxt[k], nxt[k - 1]
+                if cost > budget:
+                    row.append(skip)
+                    continue
+                shifted = [NEG] * cost
+                shifted.extend([t + value for t in take[:budget + 1 - cost]])
+                row.append(list(map(max, skip, shifted)))
+            rows[j] = row
+        tables[i] = rows
+        after = rows[0][quota]
+    return tables
+
+# --- Search ---
+class _OutOfTime(Exception):
+    pass
+
+def _squad(model, state, picks, value):
+    rank = {pos: i for i, pos in enumerate(model['positions'])}
+    members = sorted(list(state['fixed']) + list(picks), key=lambda c: (rank[c[4]], -c[0], c[3]))
+    return {
+        'score': value,
+        'cost': sum(c[1] for c in members),
+        'players': [c[3] for c in members],
+    }
+
+def _record(best, top_k, value, picks):
+    entry = (value, tuple(sorted(c[3] for c in picks)), picks)
+    if len(best) < top_k:
+        heapq.heappush(best, entry)
+    elif entry[:2] > best[0][:2]:
+        heapq.heapreplace(best, entry)
+
+def branch_and_bound(state, tables, team_limit, top_k, deadline=None):
+    pools, quotas = state['pools'], state['quotas']
+    counts = dict(state['counts'])
+    best = []
+    picks = []
+    nodes = [0]
+
+    def threshold():
+        return best[0][0] + EPSILON if len(best) == top_k else NEG
+
+    def visit(i, j, k, budget, value):
+        if k == 0:
+            i += 1
+            if i == len(pools):
+                _record(best, top_k, value, tuple(picks))
+                return
+            j, k = 0, quotas[i]
+        nodes[0] += 1
+        if deadline is not None and not nodes[0] & 1023 and time.perf_counter() > deadline:
+            raise _OutOfTime
+        pool, rows = pools[i], tables[i]
+        for jj in range(j, len(pool)):
+            # Best possible without this candidate or anything before it
+            if value + rows[jj][k][budget] <= threshold():
+                return
+            c = pool[jj]
+            cost = c[1]
+            if cost > budget or counts.get(c[2], 0) >= team_limit:
+                continue
+            if value + c[0] + rows[jj + 1][k - 1][budget - cost] <= threshold():
+                continue
+            counts[c[2]] = counts.get(c[2], 0) + 1
+            picks.append(c)
+            visit(i, jj + 1, k - 1, budget - cost, value + c[0])
+            picks.pop()
+            counts[c[2]] -= 1
+
+    exact = True
+    try:
+        if pools:
+            visit(0, 0, quotas[0], state['budget'], state['value'])
+        else:
+            _record(best, top_k, state['value'], ())
+    except _OutOfTime:
+        exact = False
+    return best, exact, nodes[0]
+
+def beam_search(state, tables, team_limit, top_k, width=64):
+    # Picks one player per step; states are ranked by their completion bound
+    pools, quotas = state['pools'], state['quotas']
+    beam = [(state['value'], state['budget'], -1, state['counts'], ())]
+    for i, quota in enumerate(quotas):
+        pool, rows = pools[i], tables[i]
+        for step in range(quota):
+            k = quota - step
+            expanded = []
+            for value, budget, last, counts, picks in beam:
+                for jj in range(last + 1, len(pool)):
+                    c = pool[jj]
+                    if c[1] > budget or counts.get(c[2], 0) >= team_limit:
+                        continue
+                    bound = value + c[0] + rows[jj + 1][k - 1][budget - c[1]]
+                    if bound == NEG:
+                        continue
+                    expanded.append((bound, value + c[0], budget - c[1], jj, counts, picks, c))
+            expanded = heapq.nlargest(width, expanded, key=lambda e: (e[0], -e[3]))
+            beam = []
+            for bound, value, budget, jj, counts, picks, c in expanded:
+                counts = dict(counts)
+                counts[c[2]] = counts.get(c[2], 0) + 1
+                beam.append((value, budget, jj if k > 1 else -1, counts, picks + (c,)))
+    best = []
+    for value, _, _, _, picks in beam:
+        _record(best, top_k, value, picks)
+    return best
+
+def solve(model, locked=(), excluded=(), top_k=1, method='auto', time_limit=1.0, beam_width=64):
+    # method: 'exact' (no time limit), 'beam', or 'auto' (exact, beam on timeout)
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    start = time.perf_counter()
+    state = _apply_locks(model, locked, excluded, top_k)
+    tables = completion_tables(state['pools'], state['quotas'], state['budget'])
+    team_limit = model['rules']['team_limit']
+    nodes, exact = 0, False
+    if method == 'beam':
+        best = beam_search(state, tables, team_limit, top_k, beam_width)
+    else:
+        deadline = start + time_limit if method == 'auto' and time_limit else None
+        best, exact, nodes = branch_and_bound(state, tables, team_limit, top_k, deadline)
+        if not exact:
+            for entry in beam_search(state, tables, team_limit, top_k, beam_width):
+                if entry[1] not in {b[1] for b in best}:
+                    _record(best, top_k, entry[0], entry[2])
+            method = 'beam'
+    squads = [_squad(model, state, picks, value) for value, _, picks in sorted(best, reverse=True)]
+    return {
+        'squads': squads,
+        'exact': exact,
+        'method': 'exact' if exact else method,
+        'nodes': nodes,
+        'candidates': sum(len(pool) for pool in state['pools']),
+        'seconds': time.perf_counter() - start,
+    }
+
+def solve_squads(players, rules=None, objective='draft_score', **options):
+    return solve(prepare(players, rules, objective), **options)
@@ -0,0 +1,50 @@
+# --- Backtest Tests ---
+import math
+
+import pytest
+
+import backtest
+import scoring
+from columnar import np
+
+pytestmark = pytest.mark.skipif(np is None, reason='numpy is not installed')
+
+def pair(group, features, gained):
+    # One (current, gained) pair with `features` (name: column) filled in
+    rows = len(gained)
+    matrix = np.zeros((rows, len(scoring.WEIGHT_FEATURES)))
+    for feature, column in features.items():
+        matrix[:, scoring.WEIGHT_FEATURES.index(feature)] = column
+    return {'groups': {group: np.ones(rows, dtype=bool)}, 'matrix': matrix}, np.asarray(gained, dtype=np.float64)
+
+def test_average_ranks_share_ties():
+    assert backtest.average_ranks(np.array([10, 20, 20, 30])).tolist() == [1, 2.5, 2.5, 4]
+    columns = np.array([[3, 1], [1, 1], [3, 1], [2, 0]])
+    assert backtest.average_ranks(columns).tolist() == [[3.5, 3], [1, 3], [3.5, 3], [2, 1]]
+
+def test_spearman_with_ties_matches_hand_computation():
+    # Scores 1, 2, 2, 3 rank 1, 2.5, 2.5, 4; points 3, 1, 2, 4 rank 3, 1, 2, 4.
+    # Centred: (-1.5, 0, 0, 1.5) and (0.5, -1.5, -0.5, 1.5), so
+    # rho = 1.5 / sqrt(4.5 * 5) = 1 / sqrt(10)
+    samples = backtest.group_samples([pair('MID', {'xg': [1, 2, 2, 3]}, [3, 1, 2, 4])], 'MID', ['xg'])
+    assert backtest.evaluate(samples, np.array([[1.0]]))[0] == pytest.approx(1 / math.sqrt(10))
+    # A negated score reverses the ranking
+    assert backtest.evaluate(samples, np.array([[-1.0]]))[0] == pytest.approx(-1 / math.sqrt(10))
+
+def test_search_recovers_a_known_weighting():
+    features = ['xg', 'xa', 'bps']
+    truth = np.array([0.5, 0.3, 0.2])
+    rng = np.random.default_rng(1)
+    pairs = []
+    for _ in range(4):
+        columns = rng.random((3, 200))
+        pairs.append(pair('FWD', dict(zip(features, columns)), truth @ columns))
+    samples = {'FWD': backtest.group_samples(pairs, 'FWD', features)}
+    baselines = {'FWD': np.full(3, 1 / 3)}
+    weights, fit, evaluated = backtest.search(samples, baselines, 'grid', steps=10, workers=1)['FWD']
+    assert weights == pytest.approx(truth)
+    assert fit == pytest.approx(1.0)
+    assert evaluated == 1 + 66
+    weights, fit, _ = backtest.search(samples, baselines, 'coordinate', restarts=2, min_step=0.001, workers=1)['FWD']
+    assert weights == pytest.approx(truth, abs=0.02)
+    assert fit > 0.999
@@ -0,0 +1,28 @@
+# --- Benchmark Smoke Test ---
+# A tiny input at scales 1 and 2: every stage is timed at both and the
+# results file is written whole.
+import json
+import os
+
+import benchmark
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def test_tiny_benchmark_times_every_stage(tmp_path, capsys):
+    with open(os.path.join(HERE, 'FPL_Bootstrap_static.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['elements'] = data['elements'][:40]
+    source = tmp_path / 'tiny.json'
+    source.write_text(json.dumps(data), encoding='utf-8')
+    output = tmp_path / 'results.json'
+    assert benchmark.main(['--input', str(source), '--scales', '1,2', '--repeat', '1', '--output', str(output)]) == 0
+    with open(output, 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    assert [result['scale'] for result in results['scales']] == [1, 2]
+    assert [result['elements'] for result in results['scales']] == [40, 80]
+    for result in results['scales']:
+        assert list(result['stages']) == benchmark.STAGES
+        assert all(stage['seconds'] > 0 and stage['mean_seconds'] > 0 for stage in result['stages'].values())
+        assert result['total_seconds'] > 0
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+    assert 'x2: 80 elements' in capsys.readouterr().out
@@ -0,0 +1,84 @@
+# --- Bundle Minifier Tests ---
+# minify_js output must run exactly like its input: a snippet of the
+# constructs a comment/whitespace stripper can break (regex literals,
+# automatic semicolon insertion, template strings), and the page's own script
+# from the bundle's minified app.<hash>.js under the draft-mode harness.
+import glob
+import os
+
+import bundle
+import create_ultimate_tool_v2 as tool
+from test_draft_mode import PROBE as DRAFT_PROBE
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT = os.path.join(HERE, 'FPL_Bootstrap_static.json')
+
+TRICKY = r"""
+const out = [];
+function log(...values) { out.push(values.map(v => JSON.stringify(v)).join(' ')); }
+// Regex literals after '}', '(', ',' and keywords, division elsewhere; the
+// spaces and quotes inside them must survive
+if (true) { log(1) } /a  b'c/.test("xa  b'c") && log('regex after }');
+log(('a / b / c'.match(/ \/ /g) || []).length);
+log(['x1', 'y22'].map(s => s.replace(/\d+/, n => n * 2)), / ["/]] /.source);
+function re() { return / =+ /g.exec('a == b')[0]; }
+log(re());
+const a = 10, b = 5, g = 2;
+log(a / b / g); log(a /b/ g);
+log(typeof /x/ === 'object');
+let i = 3;
+log(i++ + +i); log(i-- - -i);
+// ASI: a value after 'return' on the next line is unreachable
+function early() {
+  return
+  42;
+}
+log(early());
+// Lines starting with '[' or '(' continue the previous expression...
+const list = [1, 2, 3]
+;[4, 5].forEach(n => list.push(n))
+log(list);
+const f = function() { return 'called' }
+;(function() { log('iife') })()
+// ...and a newline ends a statement that would otherwise run on
+let x = 1
+let y = x
+++y
+log([x, y]);
+/* block
+   comment */ log('after block comment')
+// Template strings keep their whitespace, comments and nested templates
+const name = 'world';
+log(`hello   ${name} // not a comment
+  /* nor this */ ${`nested ${[1, 2].map(n => `<${n}>`).join('')}`} ${'}'} \` done`);
+log('string // with /* comment */ markers', "double \" quote");
+console.log(out.join('\n'));
+"""
+
+EXPECTED = '\n'.join([
+    '1', '"regex after }"', '2', '["x2","y44"] " [\\"/]] "', '" == "', '1', '1', 'true', '7', '7', '',
+    '[1,2,3,4,5]', '"iife"', '[1,2]', '"after block comment"',
+    '"hello   world // not a comment\\n  /* nor this */ nested <1><2> } ` done"',
+    '"string // with /* comment */ markers" "double \\" quote"',
+])
+
+def test_minified_snippet_runs_the_same(run_page):
+    minified = bundle.minify_js(TRICKY)
+    assert len(minified) < len(TRICKY)
+    assert '// Regex' not in minified and '/* block' not in minified
+    assert run_page(TRICKY, '') == EXPECTED
+    assert run_page(minified, '') == EXPECTED
+
+def test_bundled_script_passes_the_draft_harness(tmp_path, run_page):
+    inline = tmp_path / 'inline.html'
+    assert tool.main(['--input', SNAPSHOT, '--output', str(inline)]) == 0
+    # The bundle shell's PLAYER_DATA points at a manifest; run its minified
+    # script against the inline page's constants instead
+    _, _, inline_js, constants = bundle.split_page(inline.read_text(encoding='utf-8'))
+    shell = tmp_path / 'bundled.html'
+    assert tool.main(['--input', SNAPSHOT, '--output', str(shell), '--data-mode', 'bundle']) == 0
+    [script] = glob.glob(str(tmp_path / 'bundled_static' / 'app.*.js'))
+    with open(script, 'r', encoding='utf-8') as f:
+        minified = f.read()
+    assert len(minified) < len(inline_js)
+    assert run_page(constants + minified, DRAFT_PROBE) == 'ok'
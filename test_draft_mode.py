@@ -0,0 +1,51 @@
+# --- Draft Mode Tests ---
+# Runs the generated page's script under node (conftest.run_page) and checks
+# the per-position draft heaps against a full sort after every random pick,
+# release and undo.
+import os
+
+import create_ultimate_tool_v2 as tool
+from conftest import page_script
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT = os.path.join(HERE, 'FPL_Bootstrap_static.json')
+
+PROBE = r"""
+renderWindow = function() {}; renderTable = function() {};
+addPlayers(decodeColumns(PLAYER_DATA.payload));
+toggleDraftMode();
+function check() {
+  const taken = new Set(draft.picks.map(p => p.id));
+  for (const [pos, heap] of Object.entries(draftHeaps)) {
+    const avail = allPlayers.filter(p => p.position === pos && !taken.has(p.id))
+      .sort((a, b) => (b[draft.key] || 0) - (a[draft.key] || 0) || a.id - b.id);
+    if (avail.length !== heap.length) throw new Error('heap size ' + pos);
+    heap.forEach((p, i) => { if (p.draftSlot !== i) throw new Error('draftSlot ' + pos); });
+    const top = heapTop(heap, 10).map(p => p.id).join();
+    if (top !== avail.slice(0, 10).map(p => p.id).join()) throw new Error('heapTop ' + pos + ' under ' + draft.key);
+  }
+}
+let seed = 7; const rnd = () => (seed = (seed * 1103515245 + 12345) % 2147483648) / 2147483648;
+const keys = ['draft_score', 'fixture_score', 'total_points'];
+for (let step = 0; step < 1500; step++) {
+  const r = rnd(); const p = allPlayers[Math.floor(rnd() * allPlayers.length)];
+  if (r < 0.6) markDraftPick(p.id, rnd() < 0.2);
+  else if (r < 0.8) releaseDraftPick(p.id);
+  else if (r < 0.95) undoDraftPick();
+  else setDraftKey(keys[Math.floor(rnd() * keys.length)]);
+  check();
+}
+const saved = JSON.parse(localStorage.getItem('fplDraftState'));
+if (saved.picks.length !== draft.picks.length) throw new Error('draft state not saved');
+draft.picks.slice().reverse().forEach(p => releaseDraftPick(p.id));
+setDraftKey('draft_score');
+heapTop(draftHeaps.GKP, 2).forEach(p => markDraftPick(p.id, true));
+check();
+if (document.getElementById('draftBest').innerHTML.includes('GKP')) throw new Error('filled GKP quota still suggested');
+console.log('ok');
+"""
+
+def test_draft_heaps_track_a_full_sort(tmp_path, run_page):
+    page = tmp_path / 'page.html'
+    assert tool.main(['--input', SNAPSHOT, '--output', str(page)]) == 0
+    assert run_page(page_script(page.read_text(encoding='utf-8')), PROBE) == 'ok'
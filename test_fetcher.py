@@ -0,0 +1,59 @@
+# --- Element Summary Fetcher Tests ---
+# fetcher.fetch_all against mock_fpl_server started in-process, replaying the
+# recordings in testdata/recordings/ and injecting 503s, 429s and dropped
+# keep-alive sockets.
+import asyncio
+import json
+import os
+
+import fetcher
+import mock_fpl_server
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BOOTSTRAP = os.path.join(HERE, 'FPL_Bootstrap_static.json')
+RECORDINGS = os.path.join(HERE, 'testdata', 'recordings')
+
+def run_fetch(app, element_ids, cache_dir, retries=8):
+    async def scenario():
+        server = await mock_fpl_server.start(app, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await fetcher.fetch_all(element_ids, cache_dir, f"http://127.0.0.1:{port}/api/", concurrency=8,
+                                           retries=retries, backoff=0.001, timeout=10.0)
+        finally:
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(scenario())
+
+def test_fetch_replays_recordings_and_recovers_from_faults(tmp_path):
+    recorded = sorted(int(name[:-5]) for name in os.listdir(RECORDINGS) if name.endswith('.json'))
+    element_ids = recorded + list(range(1, 41))
+    cache_dir = str(tmp_path / 'cache')
+    app = mock_fpl_server.make_app(BOOTSTRAP, RECORDINGS, fail_rate=0.15, throttle_rate=0.15, max_requests=5, seed=3)
+
+    outcomes, failures = run_fetch(app, element_ids, cache_dir)
+    assert failures == {}
+    assert (outcomes['fetched'], outcomes['not_modified'], outcomes['failed']) == (len(element_ids), 0, 0)
+    # The injected faults happened and were retried
+    assert app['statuses'][429] and app['statuses'][503]
+    assert app['statuses'][200] == len(element_ids)
+
+    summaries = fetcher.load_summaries(cache_dir)
+    assert sorted(summaries) == sorted(element_ids)
+    for element_id in recorded:
+        with open(os.path.join(RECORDINGS, f"{element_id}.json"), 'r', encoding='utf-8') as f:
+            assert summaries[element_id] == json.load(f)
+
+    # Second pass: every entry revalidates with its ETag
+    outcomes, failures = run_fetch(app, element_ids, cache_dir)
+    assert failures == {}
+    assert (outcomes['fetched'], outcomes['not_modified'], outcomes['failed']) == (0, len(element_ids), 0)
+    assert app['statuses'][304] == len(element_ids)
+    assert fetcher.load_summaries(cache_dir) == summaries
+
+def test_retries_run_out(tmp_path):
+    app = mock_fpl_server.make_app(BOOTSTRAP, fail_rate=1.0)
+    outcomes, failures = run_fetch(app, [1, 2], str(tmp_path), retries=2)
+    assert outcomes['failed'] == 2 and sorted(failures) == [1, 2]
+    assert 'HTTP 503' in failures[1]
+    assert app['statuses'] == {503: 6}
@@ -0,0 +1,89 @@
+# --- Fixture Difficulty Matrix Tests ---
+# Window sums against brute force, incremental updates against a rebuild, and
+# the sidecar cache; fixtures come from mock_fpl_server's generated schedule.
+import copy
+import json
+import os
+import random
+
+import pytest
+
+import create_ultimate_tool_v2 as tool
+import fixtures
+import mock_fpl_server
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT = os.path.join(HERE, 'FPL_Bootstrap_static.json')
+
+@pytest.fixture(scope='module')
+def snapshot():
+    with open(SNAPSHOT, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@pytest.fixture(scope='module')
+def schedule(snapshot):
+    return mock_fpl_server.generate_fixtures(snapshot)
+
+def brute_window(matrix, fixture_list, team, start, horizon, kind):
+    total = 0.0
+    for fixture in fixture_list:
+        event = fixture.get('event')
+        if event is None or not start <= event < start + horizon or not 1 <= event <= matrix['gameweeks']:
+            continue
+        for side, attack, defence in fixtures.fixture_cells(fixture, matrix['strengths']):
+            if side == team:
+                total += {'attack': attack, 'defence': defence, 'count': 1}[kind]
+    return total
+
+def assert_same_matrix(a, b):
+    assert a['fixtures'] == b['fixtures']
+    for team, row in b['rows'].items():
+        for kind in fixtures.KINDS:
+            assert a['rows'][team][kind] == pytest.approx(row[kind])
+            assert a['rows'][team]['prefix'][kind] == pytest.approx(row['prefix'][kind])
+
+def test_window_sums_match_brute_force(snapshot, schedule):
+    rng = random.Random(3)
+    matrix = fixtures.build_matrix(snapshot['teams'], schedule)
+    team_ids = [team['id'] for team in snapshot['teams']]
+    for _ in range(300):
+        team, start, horizon = rng.choice(team_ids), rng.randint(-2, 40), rng.randint(0, 8)
+        kind = rng.choice(fixtures.KINDS)
+        assert fixtures.window_sum(matrix, team, start, horizon, kind) == pytest.approx(
+            brute_window(matrix, schedule, team, start, horizon, kind))
+
+def test_update_matches_rebuild(snapshot, schedule):
+    rng = random.Random(4)
+    matrix = fixtures.build_matrix(snapshot['teams'], schedule)
+    moved = copy.deepcopy(schedule)
+    for fixture in rng.sample(moved, 30):
+        fixture['event'] = rng.choice([None, rng.randint(1, 38)])
+    for fixture in rng.sample(moved, 4):
+        moved.remove(fixture)
+    changed = fixtures.update_matrix(matrix, moved)
+    assert 4 <= changed <= 34
+    assert_same_matrix(matrix, fixtures.build_matrix(snapshot['teams'], moved, matrix['gameweeks']))
+
+def test_sidecar_is_patched_not_rebuilt(snapshot, schedule, tmp_path):
+    path = str(tmp_path / 'fixtures.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(schedule, f)
+    _, built = fixtures.load_matrix(path, snapshot['teams'])
+    assert built == len(schedule)
+    assert fixtures.load_matrix(path, snapshot['teams'])[1] == 0
+    edited = copy.deepcopy(schedule)
+    edited[0]['event'], edited[-1]['event'] = None, 1
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(edited, f)
+    matrix, changed = fixtures.load_matrix(path, snapshot['teams'])
+    assert changed == 2
+    assert_same_matrix(matrix, fixtures.build_matrix(snapshot['teams'], edited))
+
+@pytest.mark.parametrize('content', [None, '{"a":', '[1, 2]', '{"fixtures": []}'])
+def test_cli_rejects_missing_or_malformed_fixtures(content, tmp_path, capsys):
+    path = tmp_path / 'fixtures.json'
+    if content is not None:
+        path.write_text(content, encoding='utf-8')
+    assert tool.main(['--input', SNAPSHOT, '--fixtures', str(path), '--output', str(tmp_path / 'page.html')]) == 2
+    assert str(path) in capsys.readouterr().err
+    assert not (tmp_path / 'page.html').exists()
@@ -0,0 +1,109 @@
+# --- Gameweek History Store Tests ---
+# Synthetic gameweeks derived from the bootstrap file: window sums must equal
+# the differences between snapshots, and the first (baseline) snapshot's
+# season totals must never be counted as a gameweek.
+import copy
+import json
+import os
+import random
+
+import pytest
+
+import create_ultimate_tool_v2 as tool
+import history
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIRST_EVENT = 10
+
+@pytest.fixture(scope='module')
+def snapshot():
+    with open(os.path.join(HERE, 'FPL_Bootstrap_static.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def at_event(data, event):
+    data = copy.deepcopy(data)
+    data['events'] = [{'id': i, 'is_current': i == event, 'finished': i < event} for i in range(1, 39)]
+    return data
+
+def gameweeks(base, count, seed=5):
+    # [snapshot] for gameweeks FIRST_EVENT.., with played minutes, returns,
+    # price moves and a late-arriving player
+    rng = random.Random(seed)
+    data = at_event(base, FIRST_EVENT)
+    for e in data['elements']:
+        e['minutes'] = rng.randint(0, 900)
+    snapshots = [copy.deepcopy(data)]
+    for k in range(1, count):
+        data = at_event(data, FIRST_EVENT + k)
+        for e in rng.sample(data['elements'], 200):
+            e['minutes'] += rng.choice([0, 30, 90])
+            e['total_points'] += rng.randint(0, 12)
+            e['expected_goals'] = f"{float(e['expected_goals']) + rng.randint(0, 80) / 100:.2f}"
+            e['ict_index'] = f"{float(e['ict_index']) + rng.randint(0, 90) / 10:.1f}"
+            e['now_cost'] += rng.choice([-1, 0, 0, 1])
+            e['selected_by_percent'] = f"{rng.randint(0, 600) / 10:.1f}"
+        if k == 3:
+            late = copy.deepcopy(data['elements'][0])
+            late.update(id=9000, minutes=90, total_points=6)
+            data['elements'].append(late)
+        snapshots.append(copy.deepcopy(data))
+    return snapshots
+
+def ingest_all(directory, snapshots):
+    return [history.ingest_snapshot(directory, s) for s in snapshots]
+
+def test_baseline_is_not_a_gameweek(snapshot, tmp_path):
+    gw10 = at_event(snapshot, 10)
+    player = gw10['elements'][0]
+    player['minutes'] = 900
+    gw11 = at_event(gw10, 11)
+    gw11['elements'][0]['minutes'] = 990
+    assert ingest_all(str(tmp_path), [gw10, gw11]) == [10, 11]
+    loaded = history.load_history(str(tmp_path), 2)
+    assert loaded['events'] == [11]
+    assert history.window_totals(loaded, 2)[player['id']]['minutes'] == 90
+    assert history.rolling_per90(loaded, 'minutes', 2)[player['id']] == 90
+
+def test_window_sums_match_snapshot_differences(snapshot, tmp_path):
+    snapshots = gameweeks(snapshot, 12)
+    ingest_all(str(tmp_path), snapshots)
+    loaded = history.load_history(str(tmp_path), 5)
+    assert loaded['events'] == list(range(FIRST_EVENT + 6, FIRST_EVENT + 12))[-5:]
+    sums = history.window_totals(loaded, 5)
+    before = {e['id']: e for e in snapshots[-6]['elements']}
+    for e in snapshots[-1]['elements']:
+        old = before.get(e['id'])
+        for field, scale in history.FIELDS.items():
+            expected = round(float(e[field] or 0) * scale) - (round(float(old[field] or 0) * scale) if old else 0)
+            got = round(sums[e['id']][field] * scale) if e['id'] in sums else 0
+            assert got == expected, (e['id'], field)
+
+def test_rolling_elements_keep_price_and_ownership_levels(snapshot, tmp_path):
+    snapshots = gameweeks(snapshot, 4)
+    ingest_all(str(tmp_path), snapshots)
+    latest = {e['id']: e for e in snapshots[-1]['elements']}
+    for element in history.rolling_elements(history.load_history(str(tmp_path), 2), 2):
+        assert element['now_cost'] == latest[element['id']]['now_cost']
+        assert element['selected_by_percent'] == float(latest[element['id']]['selected_by_percent'])
+
+def test_price_trajectory(snapshot, tmp_path):
+    snapshots = gameweeks(snapshot, 6)
+    ingest_all(str(tmp_path), snapshots)
+    player_id = snapshots[0]['elements'][5]['id']
+    prices = [(FIRST_EVENT + k, next(e for e in s['elements'] if e['id'] == player_id)['now_cost'] / 10)
+              for k, s in enumerate(snapshots)]
+    assert history.price_trajectory(history.load_history(str(tmp_path)), player_id) == prices
+    assert history.price_trajectory(history.load_history(str(tmp_path), 3), player_id) == prices[-3:]
+
+def test_gameweeks_are_stored_once_and_in_order(snapshot, tmp_path):
+    snapshots = gameweeks(snapshot, 3)
+    assert ingest_all(str(tmp_path), snapshots) == [10, 11, 12]
+    assert history.ingest_snapshot(str(tmp_path), snapshots[0]) is None
+    with pytest.raises(ValueError):
+        history.ingest_snapshot(str(tmp_path), at_event(snapshot, 5))
+
+def test_cli_rejects_a_snapshot_without_a_gameweek(snapshot, tmp_path, capsys):
+    path = tmp_path / 'preseason.json'
+    path.write_text(json.dumps(dict(snapshot, events=[{'id': 1, 'is_current': False, 'finished': False}])), encoding='utf-8')
+    assert tool.main(['--history', str(tmp_path / 'store'), '--history-ingest', str(path)]) == 2
+    assert 'no current or finished gameweek' in capsys.readouterr().err
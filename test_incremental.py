@@ -0,0 +1,85 @@
+# --- Incremental Rebuild Tests ---
+# Simulated rounds of edits, additions and removals; after each round the
+# incremental rows (through a saved and reloaded state) must equal a full build.
+import copy
+import json
+import os
+import random
+
+import pytest
+
+import create_ultimate_tool_v2 as tool
+import incremental
+import scoring
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture(scope='module')
+def snapshot():
+    with open(os.path.join(HERE, 'FPL_Bootstrap_static.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def full_rows(data, weights=None):
+    state, _ = incremental.full_build(data, tool.map_teams(data), tool.build_processed_player, weights)
+    return incremental.ordered_rows(state, data['elements'])
+
+def edit_round(rng, data, next_id):
+    elements = data['elements']
+    for p in rng.sample(elements, 25):
+        field = rng.choice(['now_cost', 'bps', 'ict_index', 'selected_by_percent', 'total_points', 'saves'])
+        if field == 'ict_index':
+            p[field] = f"{float(p[field]) + rng.uniform(0, 30):.1f}"
+        elif field == 'selected_by_percent':
+            p[field] = f"{rng.uniform(0, 60):.1f}"
+        else:
+            p[field] += rng.randint(1, 40)
+    for _ in range(rng.randint(0, 2)):
+        elements.remove(rng.choice(elements))
+    for _ in range(rng.randint(0, 2)):
+        added = copy.deepcopy(rng.choice(elements))
+        added['id'] = next_id
+        next_id += 1
+        elements.append(added)
+    return next_id
+
+def test_incremental_matches_full_build(snapshot, tmp_path):
+    rng = random.Random(7)
+    data = copy.deepcopy(snapshot)
+    teams = tool.map_teams(data)
+    path = str(tmp_path / 'state.json')
+    state, summary = incremental.incremental_build(data, teams, tool.build_processed_player, None)
+    assert summary['mode'] == 'full'
+    incremental.save_state(path, state)
+    next_id = max(p['id'] for p in data['elements']) + 1
+    modes = set()
+    for _ in range(40):
+        next_id = edit_round(rng, data, next_id)
+        state, summary = incremental.incremental_build(data, teams, tool.build_processed_player, incremental.load_state(path))
+        incremental.save_state(path, state)
+        modes.add((summary['mode'], summary.get('maxima_moved')))
+        assert incremental.ordered_rows(incremental.load_state(path), data['elements']) == full_rows(data)
+    assert ('incremental', True) in modes
+
+def test_removing_a_maximum_rebuilds_the_context(snapshot):
+    data = copy.deepcopy(snapshot)
+    teams = tool.map_teams(data)
+    state, _ = incremental.full_build(data, teams, tool.build_processed_player)
+    top = max(data['elements'], key=lambda p: p['bps'])
+    data['elements'].remove(top)
+    state, summary = incremental.incremental_build(data, teams, tool.build_processed_player, state)
+    assert summary['removed'] == 1
+    assert incremental.ordered_rows(state, data['elements']) == full_rows(data)
+
+def test_unchanged_snapshot_rebuilds_nothing(snapshot):
+    teams = tool.map_teams(snapshot)
+    state, _ = incremental.full_build(snapshot, teams, tool.build_processed_player)
+    _, summary = incremental.incremental_build(snapshot, teams, tool.build_processed_player, state)
+    assert summary['rebuilt'] == 0
+
+def test_new_weights_start_over(snapshot):
+    teams = tool.map_teams(snapshot)
+    state, _ = incremental.full_build(snapshot, teams, tool.build_processed_player)
+    weights = scoring.merge_weights({'FWD': {'xg': 0.5}})
+    state, summary = incremental.incremental_build(snapshot, teams, tool.build_processed_player, state, weights)
+    assert summary['mode'] == 'full'
+    assert incremental.ordered_rows(state, snapshot['elements']) == full_rows(snapshot, weights)
@@ -0,0 +1,85 @@
+# --- Streaming Reader Tests ---
+# The streaming reader against json.load, with chunk sizes small enough that
+# numbers, strings and keys get split across reads.
+import io
+import json
+import os
+
+import pytest
+
+import ingest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT = os.path.join(HERE, 'FPL_Bootstrap_static.json')
+
+@pytest.fixture(scope='module')
+def data():
+    with open(SNAPSHOT, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def expected_event(events):
+    finished = [event['id'] for event in events if event.get('finished')]
+    current = [event['id'] for event in events if event.get('is_current')]
+    return current[0] if current else (finished[-1] if finished else None)
+
+def same_snapshot(snapshot, data):
+    assert [element.to_dict() for element in snapshot.elements] == \
+        [{field: element[field] for field in ingest.ELEMENT_FIELDS if field in element} for element in data['elements']]
+    assert snapshot.event == expected_event(data['events'])
+    for key in ingest.DOCUMENT_KEYS:
+        if key != 'elements':
+            assert snapshot[key] == data.get(key)
+
+def tiny(event_ids, current, elements=2, first='events'):
+    # A small bootstrap document with `first` ('events' or 'elements') first
+    events = [{'id': i, 'is_current': i == current, 'finished': i < current} for i in event_ids]
+    players = [{'id': i, 'web_name': f"Player {i}", 'now_cost': 45 + i, 'points_per_game': f"{i}.5"} for i in range(1, elements + 1)]
+    keys = ['events', 'teams', 'elements'] if first == 'events' else ['elements', 'teams', 'events']
+    values = {'events': events, 'teams': [{'id': 1, 'name': 'Arsenal'}], 'elements': players}
+    return {key: values[key] for key in keys}
+
+@pytest.mark.parametrize('chunk_size', [7, 64, 1 << 16])
+def test_stream_document_matches_json_load(data, chunk_size, monkeypatch):
+    monkeypatch.setattr(ingest, 'CHUNK_SIZE', chunk_size)
+    same_snapshot(ingest.read_snapshot(SNAPSHOT), data)
+
+def test_values_split_at_every_offset(monkeypatch):
+    # Array items are decoded one by one, so a number like 12.5 can be cut
+    # after its '.' or 'e' and must still come back whole
+    values = [12.5, -0.03, 1e+20, 123456, 0, -0.25, 2500.0, 'quote " and \\ and é 😀', True, None, 'x' * 40,
+              {'nested': [1.75, {'deep': -0.001}]}]
+    texts = [json.dumps(values), json.dumps(values, ensure_ascii=False, indent=1),
+             '[12.50, -3e-2, 1E+20, 123456, 0, -25E-2, 2.5e3, "quote \\" and \\\\ and \\u00e9 \\ud83d\\ude00", true, null, "' + 'x' * 40 +
+             '", {"nested": [175e-2, {"deep": -1.0E-3}]}]']
+    for text in texts:
+        assert json.loads(text) == values
+        for chunk_size in range(1, 40):
+            monkeypatch.setattr(ingest, 'CHUNK_SIZE', chunk_size)
+            reader = ingest._Reader(io.StringIO(text))
+            assert list(reader.items()) == values, (text, chunk_size)
+            assert reader.peek() == ''
+
+@pytest.mark.parametrize('first', ['events', 'elements'])
+def test_key_order_does_not_matter(first, tmp_path, monkeypatch):
+    # The current event sits mid-array, so the reader must finish the array
+    monkeypatch.setattr(ingest, 'CHUNK_SIZE', 16)
+    document = tiny(range(1, 39), 5, elements=30, first=first)
+    path = tmp_path / 'bootstrap.json'
+    path.write_text(json.dumps(document), encoding='utf-8')
+    snapshot = ingest.read_snapshot(str(path))
+    assert snapshot.event == 5
+    assert [element['id'] for element in snapshot.elements] == list(range(1, 31))
+    assert snapshot.teams == document['teams']
+
+@pytest.mark.parametrize('separator', ['\n', '', ' \r\n'])
+def test_archives(separator, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, 'CHUNK_SIZE', 16)
+    documents = [tiny(range(1, 39), gameweek, elements=gameweek, first=['events', 'elements'][gameweek % 2])
+                 for gameweek in (1, 2, 3)]
+    path = tmp_path / 'archive.jsonl'
+    path.write_text(separator.join(json.dumps(document) for document in documents) + '\n', encoding='utf-8')
+    snapshots = list(ingest.iter_snapshots(str(path)))
+    assert [snapshot.event for snapshot in snapshots] == [1, 2, 3]
+    assert [len(snapshot.elements) for snapshot in snapshots] == [1, 2, 3]
+    assert snapshots[2].elements[2]['points_per_game'] == '3.5'
+    assert [snapshot.source for snapshot in snapshots] == [f"{path}#{i}" for i in range(3)]
@@ -0,0 +1,61 @@
+# --- League Config Tests ---
+import json
+import os
+
+import pytest
+
+import create_ultimate_tool_v2 as tool
+import leagues
+import scoring
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT = os.path.join(HERE, 'FPL_Bootstrap_static.json')
+
+@pytest.fixture(scope='module')
+def shared():
+    with open(SNAPSHOT, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {
+        'rows': tool.build_processed_players(data),
+        'score': tool.snapshot_scorer(data),
+        'render': tool.generate_html,
+    }
+
+def test_weight_override_changes_the_score(shared):
+    default = leagues.league_rows(shared, scoring.DEFAULT_WEIGHTS)
+    assert [row['draft_score'] for row in default] == [row['draft_score'] for row in shared['rows']]
+    config = leagues.parse_config({'name': 'xg league', 'weights': {'FWD': {'xg': 0.9}}})
+    assert config['output'] == 'xg-league.html'
+    assert config['weights']['FWD']['xg'] == 0.9 and config['weights']['MID'] == scoring.DEFAULT_WEIGHTS['MID']
+    rows = leagues.league_rows(shared, config['weights'])
+    changed = {row['position'] for row, before in zip(rows, default) if row['draft_score'] != before['draft_score']}
+    assert changed == {'FWD'}
+
+@pytest.mark.parametrize('weights, message', [
+    ({'STR': {'xg': 0.5}}, 'unknown weight group'),
+    ({'FWD': {'tackles': 0.5}}, 'unknown feature'),
+    ({'DEF': {'bonus': -0.1}}, 'non-negative'),
+    ({'DEF': {'bonus': float('inf')}}, 'non-negative'),
+    ({'DEF': {'bonus': '0.1'}}, 'must be a number'),
+])
+def test_invalid_configs_are_rejected(weights, message):
+    with pytest.raises(ValueError, match=message):
+        leagues.parse_config({'name': 'bad', 'weights': weights})
+
+def test_cli_rejects_an_invalid_config(tmp_path, capsys):
+    path = tmp_path / 'leagues.json'
+    path.write_text(json.dumps([{'name': 'ok'}, {'name': 'bad', 'weights': {'GKP': {'saves': -1}}}]), encoding='utf-8')
+    assert tool.main(['--input', SNAPSHOT, '--leagues', str(path), '--leagues-dir', str(tmp_path / 'out')]) == 2
+    assert 'Invalid league config' in capsys.readouterr().err
+    assert not (tmp_path / 'out').exists()
+
+def test_pool_output_matches_serial(shared, tmp_path):
+    configs = [leagues.parse_config({'name': 'default'}),
+               leagues.parse_config({'name': 'attack', 'weights': {'MID': {'xg_xa': 0.6}, 'FWD': {'xg': 0.6}}}),
+               leagues.parse_config({'name': 'defence', 'weights': {'DEF': {'clean_sheets': 0.6}}})]
+    serial = leagues.render_leagues(shared, configs, str(tmp_path / 'serial'), workers=1)
+    pooled = leagues.render_leagues(shared, configs, str(tmp_path / 'pooled'), workers=2)
+    assert [result['name'] for result in pooled] == [result['name'] for result in serial]
+    for one, two in zip(serial, pooled):
+        with open(one['path'], 'rb') as a, open(two['path'], 'rb') as b:
+            assert a.read() == b.read()
@@ -0,0 +1,134 @@
+# --- Momentum Tracker Tests ---
+# Synthetic minute-by-minute polls built from the bootstrap file (transfers,
+# ownership and price moves on a random subset, a new gameweek part way): the
+# incremental tracker must match stats recomputed from the full poll history,
+# and replaying or resuming its journal must rebuild the same tracker.
+import copy
+import json
+import os
+import random
+
+import pytest
+
+import create_ultimate_tool_v2 as tool
+import derived
+import momentum
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WINDOW = 6
+THRESHOLD = 0.05
+POLLS = 40
+NEW_GAMEWEEK = 25
+
+@pytest.fixture(scope='module')
+def polls():
+    # [document] per poll (1-based poll k is polls[k - 1])
+    with open(os.path.join(HERE, 'FPL_Bootstrap_static.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rng = random.Random(3)
+    data['events'] = [{'id': i, 'is_current': i == 1, 'finished': False} for i in range(1, 39)]
+    for e in data['elements']:
+        e['transfers_in_event'] = e['transfers_out_event'] = 0
+        e['cost_change_event'] = rng.choice([0] * 9 + [1])
+    documents = []
+    for poll in range(1, POLLS + 1):
+        if poll == NEW_GAMEWEEK:
+            data['events'] = [{'id': i, 'is_current': i == 2, 'finished': i < 2} for i in range(1, 39)]
+            for e in data['elements']:
+                e['transfers_in_event'] = e['transfers_out_event'] = e['cost_change_event'] = 0
+        for e in rng.sample(data['elements'], 60):
+            moved = rng.randint(-40000, 60000)
+            e['transfers_in_event' if moved > 0 else 'transfers_out_event'] += abs(moved)
+            e['selected_by_percent'] = f"{max(0.1, float(e['selected_by_percent']) + moved / data['total_players'] * 100):.1f}"
+            if rng.random() < 0.1:
+                step = 1 if moved > 0 else -1
+                e['now_cost'] += step
+                e['cost_change_event'] += step
+        documents.append(copy.deepcopy(data))
+    return documents
+
+def brute_stats(polls, poll):
+    # Every player's stats after `poll`, from the whole history at once
+    start = NEW_GAMEWEEK if poll >= NEW_GAMEWEEK else 1
+    total = polls[0]['total_players']
+    def value(e):
+        return (e['transfers_in_event'] - e['transfers_out_event'], float(e['selected_by_percent']), e['now_cost'], e['cost_change_event'])
+    history = [{e['id']: value(e) for e in document['elements']} for document in polls[:poll]]
+    stats = {}
+    for pid in history[0]:
+        at = lambda k: history[k - 1][pid]
+        net, selected, _, _ = at(poll)
+        before = at(max(poll - WINDOW, start))
+        base = at(1)[0] if start == 1 and at(1)[3] else 0
+        for k in range(start + 1, poll + 1):
+            if at(k)[2] != at(k - 1)[2]:
+                base = at(k)[0]
+        flow = net - before[0]
+        progress = (net - base + flow) / (THRESHOLD * max(selected / 100 * total, 1))
+        stats[pid] = {'net_transfers': net, 'transfer_momentum': flow, 'ownership_change': round(selected - before[1], 2),
+                      'price_progress': round(progress * 100, 1), 'price_trend': 1 if progress >= 1 else -1 if progress <= -1 else 0}
+    return stats
+
+def same_tracker(a, b):
+    assert a.poll == b.poll and a.event == b.event and a.flags == b.flags
+    assert all(a.stats(pid) == b.stats(pid) for pid in b.players)
+
+def test_tracker_matches_full_recompute(polls):
+    tracker = momentum.Tracker(WINDOW, THRESHOLD)
+    for poll, document in enumerate(polls, 1):
+        tracker.observe(document)
+        expected = brute_stats(polls, poll)
+        assert {pid: tracker.stats(pid) for pid in expected} == expected, poll
+        assert set(tracker.flags) == {pid for pid, stats in expected.items() if stats['price_trend']}
+    assert tracker.flags
+
+def test_unchanged_polls_still_move_the_window(polls):
+    tracker = momentum.Tracker(WINDOW, THRESHOLD)
+    for document in polls[:10]:
+        tracker.observe(document)
+    for _ in range(WINDOW):
+        tracker.observe(None)
+    assert all(tracker.stats(pid)['transfer_momentum'] == 0 for pid in tracker.players)
+
+def test_journal_replay_and_resume(polls, tmp_path):
+    path = str(tmp_path / 'momentum.jsonl')
+    live = momentum.Tracker(WINDOW, THRESHOLD)
+    for k, document in enumerate(polls[:30], 1):
+        momentum.record_poll(path, live, document, now=k, source=f"snap-{k:04d}.json")
+    replayed = momentum.load_journal(path)
+    same_tracker(replayed, live)
+    assert replayed.source == 'snap-0030.json'
+    for k, document in enumerate(polls[30:], 31):
+        momentum.record_poll(path, replayed, document, now=k)
+        live.observe(document)
+    same_tracker(replayed, live)
+    same_tracker(momentum.load_journal(path), live)
+
+def test_torn_last_line_is_ignored(polls, tmp_path):
+    path = str(tmp_path / 'momentum.jsonl')
+    tracker = momentum.Tracker(WINDOW, THRESHOLD)
+    for document in polls[:5]:
+        momentum.record_poll(path, tracker, document)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "poll", "poll": 6, "chan')
+    same_tracker(momentum.load_journal(path), tracker)
+
+def test_ring_buffer_keeps_the_newest_entries():
+    ring = momentum.RingBuffer(3)
+    assert ring.latest() is None
+    for poll in range(1, 6):
+        ring.append((poll * 2, poll, 0.0))
+    assert ring.to_list() == [(6, 3, 0.0), (8, 4, 0.0), (10, 5, 0.0)]
+    assert ring.at(9) == (8, 4, 0.0)
+    assert ring.at(1) == (6, 3, 0.0)
+
+def test_add_momentum_sets_quick_filter_bits(polls):
+    tracker = momentum.Tracker(WINDOW, THRESHOLD)
+    for document in polls:
+        tracker.observe(document)
+    players = tool.build_processed_players(polls[-1])
+    momentum.add_momentum(players, tracker)
+    for p in players:
+        assert p['price_trend'] == tracker.flags.get(p['id'], 0)
+        assert bool(p['quick_filters'] & derived.QUICK_FILTER_BITS['price_risers']) == (p['price_trend'] > 0)
+        assert bool(p['quick_filters'] & derived.QUICK_FILTER_BITS['price_fallers']) == (p['price_trend'] < 0)
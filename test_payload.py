@@ -0,0 +1,47 @@
+# --- Payload Encoding Tests ---
+# The columnar payload and the per-position chunks must decode back to
+# processed_players, in Python and in the page's own decodeColumns().
+import json
+import os
+
+import pytest
+
+import create_ultimate_tool_v2 as tool
+import payload
+from conftest import page_script
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT = os.path.join(HERE, 'FPL_Bootstrap_static.json')
+
+@pytest.fixture(scope='module')
+def players():
+    with open(SNAPSHOT, 'r', encoding='utf-8') as f:
+        return tool.build_processed_players(json.load(f))
+
+def test_columns_round_trip(players):
+    encoded = json.loads(json.dumps(payload.encode_players(players)))
+    assert encoded['count'] == len(players)
+    assert payload.decode_players(encoded) == players
+
+def test_chunks_cover_the_pool(players, tmp_path):
+    directory = str(tmp_path / 'data')
+    manifest = payload.write_payload(players, directory)
+    with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as f:
+        assert json.load(f) == manifest
+    decoded = []
+    for chunk in manifest['chunks']:
+        with open(os.path.join(directory, chunk['file']), 'r', encoding='utf-8') as f:
+            rows = payload.decode_players(dict(manifest, **json.load(f)))
+        assert len(rows) == chunk['count']
+        assert {p['position'] for p in rows} == {chunk['key']}
+        decoded.extend(rows)
+    assert [chunk['key'] for chunk in manifest['chunks']] == payload.CHUNK_ORDER
+    assert sum(chunk['count'] for chunk in manifest['chunks']) == manifest['count'] == len(players)
+    assert sorted(decoded, key=lambda p: p['id']) == sorted(players, key=lambda p: p['id'])
+
+def test_page_decodes_the_same_rows(players, tmp_path, run_page):
+    page = tmp_path / 'page.html'
+    assert tool.main(['--input', SNAPSHOT, '--output', str(page)]) == 0
+    decoded = json.loads(run_page(page_script(page.read_text(encoding='utf-8')),
+                                  'console.log(JSON.stringify(decodeColumns(PLAYER_DATA.payload)));'))
+    assert decoded == players
@@ -0,0 +1,46 @@
+# --- Monte Carlo Projection Tests ---
+import json
+import os
+
+import pytest
+
+import create_ultimate_tool_v2 as tool
+import projection
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT = os.path.join(HERE, 'FPL_Bootstrap_static.json')
+
+pytestmark = pytest.mark.skipif(projection.np is None, reason='numpy is not installed')
+
+@pytest.fixture(scope='module')
+def snapshot():
+    with open(SNAPSHOT, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_results_depend_on_the_seed_only(snapshot):
+    rules = projection.scoring_rules(snapshot)
+    one = projection.project(snapshot['elements'], rules, 3, 5000, seed=4, workers=1)
+    two = projection.project(snapshot['elements'], rules, 3, 5000, seed=4, workers=2)
+    assert one == two
+    assert all(p10 <= p50 <= p90 for p10, p50, p90 in zip(one['p10'], one['p50'], one['p90']))
+
+@pytest.mark.parametrize('gameweeks, simulations', [(0, 100), (3, 0), (-1, 100)])
+def test_rejects_empty_runs(snapshot, gameweeks, simulations):
+    with pytest.raises(ValueError):
+        projection.project(snapshot['elements'], None, gameweeks, simulations)
+
+@pytest.mark.parametrize('argv', [['--project', '0'], ['--project', '3', '--simulations', '0']])
+def test_cli_rejects_empty_runs(argv, capsys):
+    assert tool.main(['--input', SNAPSHOT] + argv) == 2
+    assert capsys.readouterr().err
+
+def test_goals_conceded_only_cost_points_after_60_minutes():
+    # Two defenders who concede a lot: one lasts 90 minutes, one is subbed at 45
+    base = {'element_type': 2, 'minutes': 900, 'chance_of_playing_next_round': 100,
+            'expected_goals_conceded_per_90': 6.0, 'expected_goals_per_90': 0, 'expected_assists_per_90': 0}
+    elements = [dict(base, id=1, starts_per_90=1.0), dict(base, id=2, starts_per_90=2.0)]
+    params = projection.projection_params(elements, projection.DEFAULT_SCORING)
+    assert params['conceded_points'].tolist() == [-1, 0]
+    totals = projection.simulate_batch(params, 0, 500, 3)
+    assert totals[:, 0].min() < 0
+    assert totals[:, 1].min() >= 0
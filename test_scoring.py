@@ -0,0 +1,44 @@
+# --- Draft Score Regression Tests ---
+# testdata/draft_scores.json pins draft_score for every player in
+# FPL_Bootstrap_static.json, as computed by the original per-player scorer
+# (maxima recomputed for each player). Every engine must reproduce it.
+import json
+import os
+
+import pytest
+
+import columnar
+import create_ultimate_tool_v2 as tool
+import scoring
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture(scope='module')
+def elements():
+    with open(os.path.join(HERE, 'FPL_Bootstrap_static.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)['elements']
+
+@pytest.fixture(scope='module')
+def pinned():
+    with open(os.path.join(HERE, 'testdata', 'draft_scores.json'), 'r', encoding='utf-8') as f:
+        return {int(pid): score for pid, score in json.load(f).items()}
+
+def test_every_player_is_pinned(elements, pinned):
+    assert sorted(pinned) == sorted(p['id'] for p in elements)
+
+@pytest.mark.parametrize('engine', sorted(tool.ENGINES))
+def test_engine_reproduces_pinned_scores(elements, pinned, engine):
+    if engine == 'numpy' and columnar.np is None:
+        pytest.skip('numpy is not installed')
+    scores = tool.score_elements(elements, engine)
+    assert {p['id']: score for p, score in zip(elements, scores)} == pinned
+
+def test_default_weights_are_the_pinned_weights(elements, pinned):
+    weights = scoring.merge_weights({})
+    assert scoring.score_players(elements, weights=weights) == [pinned[p['id']] for p in elements]
+
+def test_engines_agree_under_other_weights(elements):
+    if columnar.np is None:
+        pytest.skip('numpy is not installed')
+    weights = scoring.merge_weights({'DEF': {'bonus': 0.05}, 'FWD': {'xg': 0.35, 'ppg': 0.35}})
+    assert scoring.score_players(elements, weights=weights) == columnar.score_players(elements, weights=weights)
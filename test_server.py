@@ -0,0 +1,87 @@
+# --- Server Mode Tests ---
+import asyncio
+import json
+import os
+
+import pytest
+
+import create_ultimate_tool_v2 as tool
+import server
+from conftest import page_script
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture(scope='module')
+def snapshot():
+    with open(os.path.join(HERE, 'FPL_Bootstrap_static.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+async def wait_until(condition, timeout=20.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, 'timed out'
+        await asyncio.sleep(0.02)
+
+def test_reload_survives_a_wrongly_shaped_snapshot(snapshot, tmp_path, capsys):
+    path = tmp_path / 'bootstrap.json'
+    path.write_text(json.dumps(snapshot), encoding='utf-8')
+    smaller = dict(snapshot, elements=snapshot['elements'][:600])
+
+    async def scenario():
+        app = {'state': server.build_state(str(path)), 'engine': 'python', 'reloads': 0, 'requests': 0}
+        watcher = asyncio.create_task(server.watch_snapshot(app, 0.01))
+        try:
+            path.write_text('[]', encoding='utf-8')
+            await wait_until(lambda: 'Reload of' in capsys.readouterr().err)
+            assert not watcher.done() and len(app['state']['players']) == 670
+            path.write_text(json.dumps(smaller), encoding='utf-8')
+            await wait_until(lambda: app['reloads'] == 1)
+            assert json.loads(server.meta_response(app['state']))['count'] == 600
+        finally:
+            watcher.cancel()
+
+    asyncio.run(scenario())
+
+FOLD_PROBE = r"""
+const players = decodeColumns(PLAYER_DATA.payload);
+const result = {};
+for (const query of QUERIES) {
+  const q = normalizeText(query);
+  result[query] = { fold: q, ids: players.filter(p => normalizeText(p.name).includes(q)).map(p => p.id).sort((a, b) => a - b) };
+}
+console.log(JSON.stringify(result));
+"""
+
+def test_search_folds_match_the_page(snapshot, tmp_path, run_page):
+    # The server's fold and the page's search box must find the same players
+    data = json.loads(json.dumps(snapshot))
+    for element, (first, second) in zip(data['elements'], [('Martin', 'Ødegaard'), ('אברהם', 'צמח'), ('Þórður', 'Kılıç')]):
+        element['first_name'], element['second_name'], element['web_name'] = first, second, second
+    path = tmp_path / 'bootstrap.json'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    page = tmp_path / 'page.html'
+    assert tool.main(['--input', str(path), '--output', str(page)]) == 0
+    queries = ['Ødegaard', 'ODEGAARD', 'אברהמ', 'אברהם', 'צמח', 'thordur', 'KILIC']
+    page_results = json.loads(run_page(page_script(page.read_text(encoding='utf-8')),
+                                       f"const QUERIES = {json.dumps(queries)};" + FOLD_PROBE))
+
+    state = server.build_state(str(path))
+    for query in queries:
+        _, rows, _, _ = server.query_players(state, {'q': [query], 'limit': [str(server.MAX_LIMIT)]})
+        assert page_results[query]['fold'] == server.normalize_text(query)
+        assert page_results[query]['ids'] == sorted(json.loads(row)['id'] for row in rows)
+        assert page_results[query]['ids']
+    assert server.normalize_text('Ødegaard') == 'odegaard'
+    assert server.normalize_text('אברהם') == server.normalize_text('אברהמ')
+
+def test_page_etag_depends_on_the_encoding(snapshot, tmp_path):
+    path = tmp_path / 'bootstrap.json'
+    path.write_text(json.dumps(snapshot), encoding='utf-8')
+    app = {'state': server.build_state(str(path))}
+    _, _, _, identity = server.route(app, 'GET', '/', {})
+    _, _, body, gzipped = server.route(app, 'GET', '/', {'accept-encoding': 'gzip, br'})
+    assert gzipped['Content-Encoding'] == 'gzip' and body == app['state']['page_gzip']
+    assert identity['ETag'] != gzipped['ETag']
+    assert server.route(app, 'GET', '/', {'accept-encoding': 'gzip', 'if-none-match': gzipped['ETag']})[0] == 304
+    assert server.route(app, 'GET', '/', {'if-none-match': gzipped['ETag']})[0] == 200
+    assert server.route(app, 'GET', '/', {'if-none-match': f'"other", {identity["ETag"]}'})[0] == 304
@@ -0,0 +1,64 @@
+# --- Similarity Index Tests ---
+# The exact backend against a brute-force scan, the LSH backend's recall
+# against exact, and the exact fallback when a budget leaves too few
+# affordable players for hashing to find k of them.
+import json
+import os
+
+import pytest
+
+import similarity
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+K = 5
+
+@pytest.fixture(scope='module')
+def pools():
+    with open(os.path.join(HERE, 'FPL_Bootstrap_static.json'), 'r', encoding='utf-8') as f:
+        return similarity.position_vectors(json.load(f)['elements'])
+
+def brute_force(vectors, costs, row, k, max_cost):
+    # k smallest squared distances to other rows costing <= max_cost
+    return sorted(similarity._distance(vectors[row], vectors[i]) for i in range(len(vectors))
+                  if i != row and costs[i] <= max_cost)[:k]
+
+def test_exact_matches_brute_force(pools):
+    for ids, costs, vectors in pools.values():
+        index = similarity.ExactIndex(vectors, costs)
+        for row, cost in enumerate(costs):
+            found = index.neighbours(row, K, cost - 1)
+            # Rows tie on distance (identical vectors), so compare distances
+            assert [distance for distance, _ in found] == pytest.approx(brute_force(vectors, costs, row, K, cost - 1))
+            assert all(costs[i] < cost and i != row for _, i in found)
+
+def test_lsh_recall_against_exact(pools):
+    hits = total = 0
+    for ids, costs, vectors in pools.values():
+        exact = similarity.ExactIndex(vectors, costs)
+        lsh = similarity.LSHIndex(vectors, costs)
+        for row, cost in enumerate(costs):
+            expected = exact.neighbours(row, K, cost - 1)
+            if not expected:
+                continue
+            found = lsh.neighbours(row, K, cost - 1)
+            assert len(found) == len(expected)
+            # A hit is any neighbour no further than exact's k-th
+            hits += sum(distance <= expected[-1][0] + 1e-9 for distance, _ in found)
+            total += len(expected)
+    assert hits / total >= 0.9
+
+@pytest.mark.parametrize('tables', [2, similarity.LSH_TABLES, 2 * similarity.LSH_TABLES])
+def test_budget_cap_falls_back_to_exact(pools, tables):
+    _, _, vectors = pools['MID']
+    # Distinct costs, so max_cost c leaves exactly c + 1 affordable players
+    costs = list(range(len(vectors)))
+    lsh = similarity.LSHIndex(vectors, costs, tables=tables)
+    exact = similarity.ExactIndex(vectors, costs)
+    calls = []
+    fallback = lsh.exact.neighbours
+    lsh.exact.neighbours = lambda *args: calls.append(args) or fallback(*args)
+    max_cost = tables * K - 1
+    for row in range(0, len(vectors), 7):
+        calls.clear()
+        assert lsh.neighbours(row, K, max_cost) == exact.neighbours(row, K, max_cost)
+        assert calls == [(row, K, max_cost)]
@@ -0,0 +1,92 @@
+# --- Snapshot Cache Tests ---
+import json
+import math
+import os
+import shutil
+
+import pytest
+
+import ingest
+import snapshot_cache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHED_FIELDS = snapshot_cache.INT_FIELDS + snapshot_cache.FLOAT_FIELDS + snapshot_cache.STRING_FIELDS
+
+@pytest.fixture
+def source(tmp_path):
+    # The bundled snapshot with some fields dropped and some nulled
+    with open(os.path.join(HERE, 'FPL_Bootstrap_static.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for i, element in enumerate(data['elements'][:2 * len(CACHED_FIELDS)]):
+        field = CACHED_FIELDS[1 + i // 2 % (len(CACHED_FIELDS) - 1)]
+        if i % 2:
+            del element[field]
+        else:
+            element[field] = None
+    path = tmp_path / 'bootstrap.json'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return str(path), data
+
+def expected(element):
+    # What the cache keeps of a JSON element: decimal strings become floats
+    kept = {}
+    for field in CACHED_FIELDS:
+        if field in element:
+            value = element[field]
+            kept[field] = float(value) if field in snapshot_cache.FLOAT_FIELDS and value is not None else value
+    return kept
+
+def test_cache_round_trip(source):
+    path, data = source
+    first, hit = snapshot_cache.load_snapshot(path)
+    assert not hit
+    cached, hit = snapshot_cache.load_snapshot(path)
+    assert hit and isinstance(cached, snapshot_cache.CachedSnapshot)
+    try:
+        assert [element.to_dict() for element in cached.elements] == [expected(element) for element in data['elements']]
+        # Absent fields fall back to the caller's default, nulls stay None
+        assert [element.get('saves', 0) for element in cached.elements] == [element.get('saves', 0) for element in data['elements']]
+        assert cached.teams == first.teams and cached.event == first.event
+        # Nulls are INT_NULL / NaN in the raw columns
+        int_row = 2 * (snapshot_cache.INT_FIELDS.index('saves') - 1)
+        float_row = 2 * (CACHED_FIELDS.index('expected_goals') - 1)
+        assert cached.columns['saves'][int_row] == snapshot_cache.INT_NULL
+        assert math.isnan(cached.columns['expected_goals'][float_row])
+    finally:
+        cached.close()
+
+def test_stale_hash_rebuilds(source):
+    path, data = source
+    snapshot_cache.load_snapshot(path)
+    old_cache = snapshot_cache.cache_path(path, snapshot_cache.content_hash(path))
+    data['elements'][0]['now_cost'] += 5
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    snapshot, hit = snapshot_cache.load_snapshot(path)
+    assert not hit and snapshot.elements[0]['now_cost'] == data['elements'][0]['now_cost']
+    assert not os.path.exists(old_cache)
+    cached, hit = snapshot_cache.load_snapshot(path)
+    assert hit and cached.elements[0]['now_cost'] == data['elements'][0]['now_cost']
+    cached.close()
+    assert [os.path.basename(name) for name in os.listdir(os.path.dirname(path)) if name.endswith('.fplc')] == \
+        [os.path.basename(snapshot_cache.cache_path(path, snapshot_cache.content_hash(path)))]
+
+def test_unwritable_directory_runs_uncached(source, monkeypatch, capsys):
+    path, data = source
+    def refuse(target, data):
+        raise PermissionError(13, 'Permission denied', target)
+    monkeypatch.setattr(snapshot_cache, 'write_atomic', refuse)
+    snapshot, hit = snapshot_cache.load_snapshot(path)
+    assert not hit and isinstance(snapshot, ingest.Snapshot)
+    assert len(snapshot.elements) == len(data['elements'])
+    assert 'cannot write the snapshot cache' in capsys.readouterr().err
+
+def test_benchmark_closes_its_mappings(tmp_path, monkeypatch):
+    path = str(tmp_path / 'bootstrap.json')
+    shutil.copy(os.path.join(HERE, 'FPL_Bootstrap_static.json'), path)
+    opened = []
+    open_cache = snapshot_cache.open_cache
+    monkeypatch.setattr(snapshot_cache, 'open_cache', lambda target: opened.append(open_cache(target)) or opened[-1])
+    results = snapshot_cache.benchmark(path, repeat=2)
+    assert set(results) == {'json_load', 'stream_parse', 'mmap_columns', 'mmap_records'}
+    assert opened and all(snapshot._mm.closed for snapshot in opened)
@@ -0,0 +1,91 @@
+# --- Squad Solver Tests ---
+# Small random instances checked against brute-force enumeration, plus the
+# full snapshot and the input checks.
+import itertools
+import os
+import random
+
+import pytest
+
+import create_ultimate_tool_v2 as tool
+import squad_solver
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SMALL_RULES = {'budget': 300, 'squad_size': 6, 'team_limit': 2, 'quotas': {'GKP': 1, 'DEF': 2, 'MID': 2, 'FWD': 1}}
+
+def random_pool(rng):
+    players = []
+    for position, count in (('GKP', 3), ('DEF', 5), ('MID', 5), ('FWD', 4)):
+        for _ in range(count):
+            players.append({'id': len(players) + 1, 'name': f"P{len(players) + 1}", 'position': position,
+                            'team': f"T{rng.randint(1, 4)}", 'penalty_taker': False,
+                            'price': rng.randint(35, 80) / 10, 'draft_score': rng.randint(0, 60)})
+    return players
+
+def brute_force(players, rules, locked, excluded, top_k):
+    pools = [[p for p in players if p['position'] == pos and p['id'] not in excluded] for pos in rules['quotas']]
+    scores = []
+    for parts in itertools.product(*(itertools.combinations(pool, n) for pool, n in zip(pools, rules['quotas'].values()))):
+        squad = [p for part in parts for p in part]
+        ids = {p['id'] for p in squad}
+        teams = [p['team'] for p in squad]
+        if (locked <= ids and sum(round(p['price'] * 10) for p in squad) <= rules['budget']
+                and max(teams.count(t) for t in teams) <= rules['team_limit']):
+            scores.append(sum(p['draft_score'] for p in squad))
+    return sorted(scores, reverse=True)[:top_k]
+
+def is_legal(squad, by_id, rules):
+    members = [by_id[pid] for pid in squad['players']]
+    teams = [p['team'] for p in members]
+    return (squad['cost'] <= rules['budget'] and max(teams.count(t) for t in teams) <= rules['team_limit']
+            and all(sum(p['position'] == pos for p in members) == n for pos, n in rules['quotas'].items()))
+
+@pytest.mark.parametrize('method', ['exact', 'beam'])
+def test_matches_brute_force(method):
+    rng = random.Random(11)
+    for _ in range(60):
+        players = random_pool(rng)
+        by_id = {p['id']: p for p in players}
+        locked = set(rng.sample([p['id'] for p in players], rng.randint(0, 1)))
+        excluded = set(rng.sample([p['id'] for p in players if p['id'] not in locked], rng.randint(0, 2)))
+        top_k = rng.randint(1, 4)
+        expected = brute_force(players, SMALL_RULES, locked, excluded, top_k)
+        try:
+            result = squad_solver.solve_squads(players, SMALL_RULES, locked=locked, excluded=excluded, top_k=top_k, method=method)
+        except ValueError:
+            assert not expected
+            continue
+        if method == 'exact':
+            assert [s['score'] for s in result['squads']] == expected
+        elif result['squads']:
+            assert result['squads'][0]['score'] <= expected[0]
+        else:
+            assert not expected
+        assert len({tuple(sorted(s['players'])) for s in result['squads']}) == len(result['squads'])
+        for squad in result['squads']:
+            assert locked <= set(squad['players']) and not excluded & set(squad['players'])
+            assert is_legal(squad, by_id, SMALL_RULES)
+
+def test_full_snapshot_squad_is_legal():
+    data = tool.load_data(os.path.join(HERE, 'FPL_Bootstrap_static.json'))
+    players = tool.build_processed_players(data)
+    rules = squad_solver.squad_rules(data)
+    result = squad_solver.solve_squads(players, rules, top_k=3, method='exact')
+    by_id = {p['id']: p for p in players}
+    scores = [s['score'] for s in result['squads']]
+    assert result['exact'] and len(scores) == 3 and scores == sorted(scores, reverse=True)
+    assert all(is_legal(squad, by_id, rules) for squad in result['squads'])
+
+@pytest.mark.parametrize('objective', ['name', 'penalty_taker', 'no_such_column'])
+def test_rejects_non_numeric_objectives(objective):
+    with pytest.raises(ValueError, match='numeric' if objective != 'no_such_column' else 'not a player column'):
+        squad_solver.prepare(random_pool(random.Random(1)), SMALL_RULES, objective)
+
+def test_rejects_empty_top_k():
+    with pytest.raises(ValueError):
+        squad_solver.solve_squads(random_pool(random.Random(1)), SMALL_RULES, top_k=0)
+
+@pytest.mark.parametrize('argv', [['--objective', 'name'], ['--objective', 'no_such_column'], ['--top-k', '0']])
+def test_cli_rejects_bad_solver_options(argv, capsys):
+    assert tool.main(['--input', os.path.join(HERE, 'FPL_Bootstrap_static.json'), '--solve-squad'] + argv) == 2
+    assert capsys.readouterr().err